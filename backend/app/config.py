@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -6,3 +7,66 @@ load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Maximum concurrent OpenAI extraction calls per worker
+MAX_CONCURRENT_EXTRACTIONS = int(os.getenv("MAX_CONCURRENT_EXTRACTIONS", "4"))
+
+# OpenAI budget shared by all workers on this host (OPENAI_RPM=0 disables the
+# limiter, OPENAI_TPM=0 disables the token budget only)
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "200000"))
+RATE_LIMIT_DB = os.getenv(
+    "RATE_LIMIT_DB", os.path.join(tempfile.gettempdir(), "koncar-naljepnice", "openai_rate_limit.sqlite3")
+)
+
+# Background extraction jobs (/jobs/extract)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(MAX_CONCURRENT_EXTRACTIONS)))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))  # seconds
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+
+# Documents extracted at once per /extract/batch request
+EXTRACTION_BATCH_PARALLELISM = int(os.getenv("EXTRACTION_BATCH_PARALLELISM", str(MAX_CONCURRENT_EXTRACTIONS)))
+
+# Minimum pages per chunk for /extract?chunked=true
+EXTRACTION_CHUNK_PAGES = int(os.getenv("EXTRACTION_CHUNK_PAGES", "3"))
+
+# Extraction cache (set EXTRACTION_CACHE_DIR="" to keep it in memory only)
+EXTRACTION_CACHE_DIR = os.getenv(
+    "EXTRACTION_CACHE_DIR", os.path.join(tempfile.gettempdir(), "koncar-naljepnice")
+)
+EXTRACTION_CACHE_TTL = int(os.getenv("EXTRACTION_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+EXTRACTION_CACHE_MEMORY_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MEMORY_ENTRIES", "128"))
+EXTRACTION_CACHE_DISK_MB = int(os.getenv("EXTRACTION_CACHE_DISK_MB", "200"))
+
+# PDF rasterizer for PNG output: "pdfium" (in-process) or "pdf2image" (pdftoppm)
+RASTERIZER = os.getenv("RASTERIZER", "")
+
+# Render a throwaway label at startup so the first request isn't slow
+LABEL_WARMUP = os.getenv("LABEL_WARMUP", "1") != "0"
+
+# Font file for measuring label text (default: what fontconfig picks for LABEL_CSS)
+LABEL_FONT_PATH = os.getenv("LABEL_FONT_PATH", "")
+
+# Threads encoding rendered PDF pages (pdf_processor.iter_pdf_images)
+IMAGE_ENCODE_WORKERS = int(os.getenv("IMAGE_ENCODE_WORKERS", str(min(os.cpu_count() or 1, 4))))
+
+# Process pool for large label jobs, opt-in (0 or 1 = render in the request thread).
+# Every worker is a separate WeasyPrint process; os.cpu_count() reports the
+# host, not the container's CPU quota, so set this to what the container has.
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "0"))
+# Threads rendering /preview images, apart from the request threadpool so a
+# preview never queues behind a label job; each keeps its render state warm
+PREVIEW_WORKERS = int(os.getenv("PREVIEW_WORKERS", "2"))
+# Upper bound on labels per pool task; small jobs are never split
+RENDER_CHUNK_LABELS = int(os.getenv("RENDER_CHUNK_LABELS", "25"))
+
+# Rendered label pages (PDF and PNG) kept per worker for regeneration (0 disables)
+RENDER_CACHE_MB = int(os.getenv("RENDER_CACHE_MB", "64"))
+
+# Parse born-digital orders from their text layer before calling the model
+TEXT_LAYER_PARSER = os.getenv("TEXT_LAYER_PARSER", "1") != "0"
+
+# Send only the pages with order items to the model (drops terms and conditions, cover letters)
+PAGE_PRUNING = os.getenv("PAGE_PRUNING", "1") != "0"
+
+# Uploaded PDFs are spooled here instead of being held in memory
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "koncar-naljepnice-uploads"))
@@ -1,18 +1,43 @@
-import base64
+import asyncio
+import binascii
+import hashlib
 import json
 import logging
+import math
+import os
+import threading
 import time
-from typing import Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 import httpx
-from openai import APITimeoutError, OpenAI, RateLimitError, APIStatusError
-
-from .config import OPENAI_API_KEY
+from openai import APITimeoutError, AsyncOpenAI, OpenAI, RateLimitError, APIStatusError
+from pydantic import ValidationError
+
+from . import metrics
+from .cache import DiskCache, MemoryCache, TieredCache
+from .config import (
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_DISK_MB,
+    EXTRACTION_CACHE_MEMORY_ENTRIES,
+    EXTRACTION_BATCH_PARALLELISM,
+    EXTRACTION_CACHE_TTL,
+    EXTRACTION_CHUNK_PAGES,
+    MAX_CONCURRENT_EXTRACTIONS,
+    OPENAI_API_KEY,
+    PAGE_PRUNING,
+    TEXT_LAYER_PARSER,
+)
+from .json_stream import JsonArrayItems
 from .models import Artikl, NarudzbaData
+from . import rate_limit
+from .page_filter import prune_pages, prune_report
+from .pdf_processor import PdfSource, extract_pages, get_page_count, open_pdf, page_ranges, pdf_size
+from .text_parser import parse_order
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 4
+MODEL = "gpt-4.1-mini"
 
 
 class InsufficientQuotaError(Exception):
@@ -30,6 +55,23 @@ class OpenAIRateLimitError(Exception):
 class OpenAITimeoutError(Exception):
     """OpenAI API timeout."""
     pass
+
+
+def describe_extraction_error(e: Exception) -> Tuple[int, str]:
+    """Map an extraction exception to an HTTP status code and user-facing message."""
+    if isinstance(e, ValueError):
+        return 400, str(e)
+    if isinstance(e, InsufficientQuotaError):
+        return 402, str(e)
+    if isinstance(e, OpenAIRateLimitError):
+        return 429, str(e)
+    if isinstance(e, OpenAITimeoutError):
+        return 504, str(e)
+    if isinstance(e, RuntimeError):
+        return 502, str(e)
+    return 500, f"Greška pri obradi PDF-a: {str(e)}"
+
+
 API_TIMEOUT = 300  # seconds
 
 # Initialize client lazily
@@ -46,6 +88,28 @@ def get_client() -> OpenAI:
         )
     return _client
 
+_async_client: Optional[AsyncOpenAI] = None
+
+def get_async_client() -> AsyncOpenAI:
+    global _async_client
+    if _async_client is None:
+        if not OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY is not set. Please set it in .env file.")
+        _async_client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            timeout=httpx.Timeout(API_TIMEOUT, connect=10.0),
+        )
+    return _async_client
+
+# Bounds in-flight OpenAI calls per worker (created on first use)
+_semaphore: Optional[asyncio.Semaphore] = None
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXTRACTIONS)
+    return _semaphore
+
 EXTRACTION_PROMPT = """Ti si ekspert za ekstrakciju strukturiranih podataka iz poslovnih dokumenata.
 
 ZADATAK:
@@ -146,127 +210,635 @@ EXTRACTION_SCHEMA = {
     "additionalProperties": False
 }
 
+# Anything that changes the model output invalidates cached results, including
+# PAGE_PRUNING, which decides which pages the model gets to see
+EXTRACTION_FINGERPRINT = hashlib.sha256(
+    json.dumps([EXTRACTION_PROMPT, EXTRACTION_SCHEMA, MODEL, PAGE_PRUNING], sort_keys=True).encode("utf-8")
+).hexdigest()
+
+# Initialize cache lazily
+_cache: Optional[TieredCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> TieredCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                disk = None
+                if EXTRACTION_CACHE_DIR:
+                    disk = DiskCache(
+                        os.path.join(EXTRACTION_CACHE_DIR, "extraction_cache.sqlite3"),
+                        max_bytes=EXTRACTION_CACHE_DISK_MB * 1024 * 1024,
+                        ttl=EXTRACTION_CACHE_TTL,
+                    )
+                _cache = TieredCache(
+                    MemoryCache(max_entries=EXTRACTION_CACHE_MEMORY_ENTRIES, ttl=EXTRACTION_CACHE_TTL),
+                    disk,
+                )
+    return _cache
+
+
+def extraction_cache_key(pdf: PdfSource) -> str:
+    """SHA-256 of the PDF combined with the prompt/schema/model/pruning fingerprint."""
+    digest = hashlib.sha256()
+    with open_pdf(pdf) as f:
+        for block in iter(lambda: f.read(ENCODE_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest() + ":" + EXTRACTION_FINGERPRINT[:16]
+
+
+def extraction_cache_stats() -> Dict[str, float]:
+    return get_cache().stats()
+
+
+def parse_text_layer(pdf: PdfSource) -> Optional[NarudzbaData]:
+    """
+    Try the deterministic text-layer parser (milliseconds, no API call).
 
-def extract_data_from_pdf(pdf_bytes: bytes) -> NarudzbaData:
+    Returns:
+        NarudzbaData, or None when the document needs the model
     """
-    Extract order data from PDF using OpenAI native PDF input.
+    if not TEXT_LAYER_PARSER:
+        return None
+    try:
+        with metrics.timed("text_parse"):
+            data = parse_order(pdf)
+    except Exception:
+        logger.exception("Greška u parseru tekstualnog sloja")
+        data = None
+    metrics.TEXT_LAYER_RESULTS.labels("parsed" if data is not None else "fallback").inc()
+    return data
+
+
+def extract_data_from_pdf(pdf: PdfSource, use_cache: bool = True, use_text_layer: bool = True) -> NarudzbaData:
+    """
+    Extract order data from PDF, serving repeat uploads from the cache.
 
-    Sends the PDF directly to the API without converting to images first.
-    Uses gpt-4.1-mini for faster, cheaper processing.
+    Born-digital orders are read straight from their text layer; only
+    documents that fail its confidence check go to the model. The cache key
+    is the SHA-256 of the PDF bytes plus a hash of the prompt, schema and
+    model, so identical documents skip the OpenAI call entirely.
 
     Args:
-        pdf_bytes: Raw PDF file bytes
+        pdf: Raw PDF file bytes or the path of a spooled upload
+        use_cache: Look up and store the result in the extraction cache
+        use_text_layer: Try the text-layer parser before the model
 
     Returns:
         NarudzbaData with extracted information
-
-    Raises:
-        RuntimeError: If API call fails after retries
     """
-    client = get_client()
+    if use_text_layer:
+        data = parse_text_layer(pdf)
+        if data is not None:
+            return data
+
+    if not use_cache:
+        return request_extraction(pdf)
 
-    base64_pdf = base64.b64encode(pdf_bytes).decode("utf-8")
+    cache = get_cache()
+    key = extraction_cache_key(pdf)
+    cached = cache.get(key)
+    if cached is not None:
+        return NarudzbaData.model_validate_json(cached)
 
-    content = [
+    data = request_extraction(pdf)
+    cache.set(key, data.model_dump_json())
+    return data
+
+
+# Read size for hashing and base64 encoding; a multiple of 3 so chunks encode without padding
+ENCODE_CHUNK = 3 * 256 * 1024
+
+
+def encode_data_url(pdf: PdfSource, mime_type: str = "application/pdf") -> str:
+    """
+    Build a base64 data URL, reading the PDF in chunks.
+
+    The encoded text goes straight into one preallocated buffer, so the only
+    full-size copies are that buffer and the final string (no raw PDF bytes,
+    separate base64 bytes or f-string copies).
+    """
+    prefix = f"data:{mime_type};base64,".encode("ascii")
+    out = bytearray(len(prefix) + 4 * ((pdf_size(pdf) + 2) // 3))
+    out[:len(prefix)] = prefix
+    position = len(prefix)
+    with open_pdf(pdf) as f:
+        for block in iter(lambda: f.read(ENCODE_CHUNK), b""):
+            encoded = binascii.b2a_base64(block, newline=False)
+            out[position:position + len(encoded)] = encoded
+            position += len(encoded)
+    # Truncate in place; slicing would add another full-size copy
+    del out[position:]
+    return out.decode("ascii")
+
+
+def _content(file: dict) -> list:
+    return [
         {"type": "text", "text": EXTRACTION_PROMPT},
         {
             "type": "file",
-            "file": {
-                "filename": "narudzba.pdf",
-                "file_data": f"data:application/pdf;base64,{base64_pdf}"
-            }
+            "file": file
         }
     ]
 
+
+def _build_content(pdf: PdfSource) -> list:
+    with metrics.timed("base64_encode"):
+        data_url = encode_data_url(pdf)
+
+    return _content({
+        "filename": "narudzba.pdf",
+        "file_data": data_url
+    })
+
+
+def _upload_pdf(path: str) -> str:
+    """Upload a spooled PDF through the Files API, streamed from disk; returns the file id."""
+    with metrics.timed("file_upload"), open(path, "rb") as f:
+        return get_client().files.create(file=("narudzba.pdf", f, "application/pdf"), purpose="user_data").id
+
+
+def _delete_upload(file_id: str) -> None:
+    try:
+        get_client().files.delete(file_id)
+    except Exception:
+        logger.warning("Datoteka %s nije obrisana s OpenAI-ja", file_id, exc_info=True)
+
+
+def _prepare_content(pdf: PdfSource) -> Tuple[list, Optional[str]]:
+    """
+    Message content for the PDF.
+
+    PDFs in memory go inline as a data URL. Spooled uploads go through the
+    Files API and are referenced by id, so their base64 text is never built.
+
+    Returns:
+        (content, id of the uploaded file to delete afterwards, or None)
+    """
+    if isinstance(pdf, bytes):
+        return _build_content(pdf), None
+    file_id = _upload_pdf(pdf)
+    return _content({"file_id": file_id}), file_id
+
+
+def _completion_kwargs(content: list) -> dict:
+    return dict(
+        model=MODEL,
+        messages=[
+            {
+                "role": "user",
+                "content": content
+            }
+        ],
+        response_format={
+            "type": "json_schema",
+            "json_schema": {
+                "name": "narudzba_extraction",
+                "strict": True,
+                "schema": EXTRACTION_SCHEMA
+            }
+        },
+        max_tokens=16384
+    )
+
+
+def _retry_delay(e: Exception, attempt: int) -> float:
+    """
+    Decide how long to wait before retrying a failed OpenAI call.
+
+    Returns:
+        Seconds to wait before the next attempt
+
+    Raises:
+        The matching domain error when the call should not be retried
+    """
+    if isinstance(e, APITimeoutError):
+        metrics.OPENAI_TIMEOUTS.inc()
+        logger.warning("OpenAI API timeout (pokušaj %d/%d)", attempt + 1, MAX_RETRIES)
+        if attempt < MAX_RETRIES - 1:
+            metrics.OPENAI_RETRIES.inc()
+            return 2 ** attempt
+        raise OpenAITimeoutError(
+            "OpenAI API nije odgovorio na vrijeme. Pokušajte ponovo ili s manjim PDF-om."
+        ) from e
+
+    if isinstance(e, RateLimitError):
+        # Razlikuj insufficient_quota (trajno) od rate limit (privremeno)
+        error_type = None
+        if e.body and isinstance(e.body, dict):
+            error_type = e.body.get("error", {}).get("type")
+        if error_type == "insufficient_quota":
+            logger.error("OpenAI račun nema dovoljno kredita (insufficient_quota)")
+            raise InsufficientQuotaError(
+                "OpenAI račun nema dovoljno kredita. Dodajte sredstva na https://platform.openai.com/account/billing"
+            ) from e
+
+        # Privremeni rate limit — retry s backoff-om
+        metrics.OPENAI_RATE_LIMITED.inc()
+        retry_after = None
+        if hasattr(e, "response") and e.response is not None:
+            retry_after_str = e.response.headers.get("retry-after") or e.response.headers.get("Retry-After")
+            if retry_after_str:
+                try:
+                    retry_after = int(retry_after_str)
+                except ValueError:
+                    pass
+
+        backoff_times = [5, 15, 30, 60]
+        wait = retry_after if retry_after else backoff_times[min(attempt, len(backoff_times) - 1)]
+        logger.warning("OpenAI rate limit (pokušaj %d/%d), čekam %ds", attempt + 1, MAX_RETRIES, wait)
+        if attempt < MAX_RETRIES - 1:
+            metrics.OPENAI_RETRIES.inc()
+            return wait
+        raise OpenAIRateLimitError(
+            "Previše zahtjeva prema OpenAI API-u. Pričekajte minutu i pokušajte ponovo.",
+            retry_after=retry_after,
+        ) from e
+
+    if isinstance(e, APIStatusError):
+        logger.error("OpenAI APIStatusError %d: %s", e.status_code, e.message)
+        logger.error("Response body: %s", e.body)
+        if e.status_code in (500, 502, 503) and attempt < MAX_RETRIES - 1:
+            logger.warning("Retry nakon server greške (pokušaj %d/%d)", attempt + 1, MAX_RETRIES)
+            metrics.OPENAI_RETRIES.inc()
+            return 2 ** attempt
+        raise RuntimeError(
+            f"OpenAI API greška ({e.status_code}): {e.message}"
+        ) from e
+
+    raise e
+
+
+def _artikl(a: dict) -> Artikl:
+    return Artikl(
+        redni_broj=a["redni_broj"],
+        naziv=a["naziv"],
+        novi_broj_dijela=a.get("novi_broj_dijela", ""),
+        kolicina=a["kolicina"],
+        naziv_objekta=a["naziv_objekta"],
+        wbs=a["wbs"]
+    )
+
+
+def _parse_response(message_content: str) -> NarudzbaData:
+    with metrics.timed("json_parse"):
+        result = json.loads(message_content)
+
+        artikli = [_artikl(a) for a in result["artikli"]]
+
+        return NarudzbaData(
+            broj_narudzbe=result["broj_narudzbe"],
+            artikli=artikli
+        )
+
+
+RETRYABLE_ERRORS = (APITimeoutError, APIStatusError)
+
+
+def _total_tokens(response) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+def request_extraction(pdf: PdfSource) -> NarudzbaData:
+    """
+    Extract order data from PDF using OpenAI native PDF input.
+
+    Sends the PDF directly to the API without converting to images first.
+    Uses gpt-4.1-mini for faster, cheaper processing. Pages without order
+    items are dropped first (PAGE_PRUNING). Spooled uploads are sent through
+    the Files API and deleted there after the call.
+
+    Args:
+        pdf: Raw PDF file bytes or the path of a spooled upload
+
+    Returns:
+        NarudzbaData with extracted information
+
+    Raises:
+        RuntimeError: If API call fails after retries
+    """
+    client = get_client()
+    if PAGE_PRUNING:
+        pdf = prune_pages(pdf).pdf
+    content, file_id = _prepare_content(pdf)
+    kwargs = _completion_kwargs(content)
+    cost = rate_limit.estimate_tokens(pdf_size(pdf))
+
     # Retry with exponential backoff for transient errors
-    last_exception = None
-    for attempt in range(MAX_RETRIES):
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": content
-                    }
-                ],
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": "narudzba_extraction",
-                        "strict": True,
-                        "schema": EXTRACTION_SCHEMA
-                    }
-                },
-                max_tokens=16384
-            )
-            break
-        except APITimeoutError as e:
-            last_exception = e
-            logger.warning("OpenAI API timeout (pokušaj %d/%d)", attempt + 1, MAX_RETRIES)
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(2 ** attempt)
+    try:
+        with metrics.timed("openai_call"):
+            for attempt in range(MAX_RETRIES):
+                charged = rate_limit.admit(cost)
+                try:
+                    response = client.chat.completions.create(**kwargs)
+                    break
+                except Exception as e:
+                    # A failed attempt reports no usage; its tokens go back to the budget
+                    rate_limit.refund(charged)
+                    if not isinstance(e, RETRYABLE_ERRORS):
+                        raise
+                    wait = _retry_delay(e, attempt)
+                    # A shared 429 pause is waited out by the next admit()
+                    if not (isinstance(e, RateLimitError) and rate_limit.pause_all(wait)):
+                        time.sleep(wait)
+    finally:
+        if file_id is not None:
+            _delete_upload(file_id)
+
+    rate_limit.settle(charged, _total_tokens(response))
+    return _parse_response(response.choices[0].message.content)
+
+
+# Called with (stage, details), e.g. ("retry_after_429", {"wait": 15, "attempt": 1})
+ProgressCallback = Callable[[str, dict], None]
+# Called with every item of a streamed response as soon as it is complete
+ItemCallback = Callable[[Artikl], None]
+
+
+def _report(on_progress: Optional[ProgressCallback], stage: str, **details) -> None:
+    if on_progress is not None:
+        on_progress(stage, details)
+
+
+async def _stream_completion(client: AsyncOpenAI, kwargs: dict, on_item: ItemCallback) -> Tuple[str, Optional[int]]:
+    """
+    Run the completion as a stream, handing out `artikli` items as they close.
+
+    Items are validated one by one; the returned text is the complete
+    message, parsed exactly like a non-streamed response.
+
+    Returns:
+        (message content, total tokens or None)
+    """
+    items = JsonArrayItems("artikli")
+    tokens = None
+    start = time.perf_counter()
+    first_item = True
+    stream = await client.chat.completions.create(**kwargs, stream=True, stream_options={"include_usage": True})
+    async for chunk in stream:
+        if chunk.usage is not None:
+            tokens = chunk.usage.total_tokens
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        for item in items.feed(chunk.choices[0].delta.content):
+            try:
+                artikl = _artikl(item)
+            except (KeyError, TypeError, ValidationError):
+                # Left to the final parse, which reports the error
+                logger.warning("Neispravan artikl u odgovoru modela: %s", item)
                 continue
-            raise OpenAITimeoutError(
-                "OpenAI API nije odgovorio na vrijeme. Pokušajte ponovo ili s manjim PDF-om."
-            ) from e
-        except RateLimitError as e:
-            last_exception = e
-            # Razlikuj insufficient_quota (trajno) od rate limit (privremeno)
-            error_type = None
-            if e.body and isinstance(e.body, dict):
-                error_type = e.body.get("error", {}).get("type")
-            if error_type == "insufficient_quota":
-                logger.error("OpenAI račun nema dovoljno kredita (insufficient_quota)")
-                raise InsufficientQuotaError(
-                    "OpenAI račun nema dovoljno kredita. Dodajte sredstva na https://platform.openai.com/account/billing"
-                ) from e
-            # Privremeni rate limit — retry s backoff-om
-            retry_after = None
-            if hasattr(e, "response") and e.response is not None:
-                retry_after_str = e.response.headers.get("retry-after") or e.response.headers.get("Retry-After")
-                if retry_after_str:
+            if first_item:
+                metrics.observe("openai_first_item", time.perf_counter() - start)
+                first_item = False
+            on_item(artikl)
+    return items.getvalue(), tokens
+
+
+async def request_extraction_async(
+    pdf: PdfSource,
+    on_progress: Optional[ProgressCallback] = None,
+    prune: bool = True,
+    on_item: Optional[ItemCallback] = None,
+) -> NarudzbaData:
+    """
+    Async variant of request_extraction for use inside the event loop.
+
+    Uses AsyncOpenAI and asyncio.sleep for backoff, so waiting on the API
+    never blocks other requests. At most MAX_CONCURRENT_EXTRACTIONS calls
+    are in flight per worker; further callers wait for a free slot.
+
+    Args:
+        pdf: Raw PDF file bytes or the path of a spooled upload
+        on_progress: Optional callback receiving stage changes
+                     (uploading, model_running, retry_after_429, retrying);
+                     "uploading" also reports what page pruning saved
+        prune: Drop pages without order items first (with PAGE_PRUNING)
+        on_item: Stream the response and call this with every item as soon
+                 as it is complete; after a retry (model_running with a new
+                 attempt) items start over. The returned data is the same as
+                 without streaming.
+    """
+    client = get_async_client()
+    saved = {}
+    if prune and PAGE_PRUNING:
+        pruned = await asyncio.to_thread(prune_pages, pdf)
+        pdf, saved = pruned.pdf, prune_report(pruned)
+    size = pdf_size(pdf)
+    _report(on_progress, "uploading", bytes=size, **saved)
+    # The sync client uploads in a thread, so reading the file never blocks the loop
+    content, file_id = await asyncio.to_thread(_prepare_content, pdf)
+    kwargs = _completion_kwargs(content)
+    cost = rate_limit.estimate_tokens(size)
+
+    try:
+        async with _get_semaphore():
+            with metrics.timed("openai_call"):
+                for attempt in range(MAX_RETRIES):
+                    charged = await rate_limit.admit_async(cost)
                     try:
-                        retry_after = int(retry_after_str)
-                    except ValueError:
-                        pass
-            backoff_times = [5, 15, 30, 60]
-            wait = retry_after if retry_after else backoff_times[min(attempt, len(backoff_times) - 1)]
-            logger.warning("OpenAI rate limit (pokušaj %d/%d), čekam %ds", attempt + 1, MAX_RETRIES, wait)
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(wait)
-                continue
-            raise OpenAIRateLimitError(
-                "Previše zahtjeva prema OpenAI API-u. Pričekajte minutu i pokušajte ponovo.",
-                retry_after=retry_after,
-            ) from e
-        except APIStatusError as e:
-            last_exception = e
-            logger.error("OpenAI APIStatusError %d: %s", e.status_code, e.message)
-            logger.error("Response body: %s", e.body)
-            if e.status_code in (500, 502, 503) and attempt < MAX_RETRIES - 1:
-                logger.warning("Retry nakon server greške (pokušaj %d/%d)", attempt + 1, MAX_RETRIES)
-                time.sleep(2 ** attempt)
-                continue
-            raise RuntimeError(
-                f"OpenAI API greška ({e.status_code}): {e.message}"
-            ) from e
+                        _report(on_progress, "model_running", attempt=attempt + 1)
+                        if on_item is None:
+                            response = await client.chat.completions.create(**kwargs)
+                            content, tokens = response.choices[0].message.content, _total_tokens(response)
+                        else:
+                            content, tokens = await _stream_completion(client, kwargs, on_item)
+                        break
+                    except Exception as e:
+                        # A failed attempt reports no usage; its tokens go back to the budget
+                        await asyncio.to_thread(rate_limit.refund, charged)
+                        if not isinstance(e, RETRYABLE_ERRORS):
+                            raise
+                        wait = _retry_delay(e, attempt)
+                        stage = "retry_after_429" if isinstance(e, RateLimitError) else "retrying"
+                        _report(on_progress, stage, wait=wait, attempt=attempt + 1)
+                        # A shared 429 pause is waited out by the next admit_async()
+                        if not (isinstance(e, RateLimitError) and await asyncio.to_thread(rate_limit.pause_all, wait)):
+                            await asyncio.sleep(wait)
+    finally:
+        if file_id is not None:
+            await asyncio.to_thread(_delete_upload, file_id)
+
+    await asyncio.to_thread(rate_limit.settle, charged, tokens)
+    return _parse_response(content)
+
+
+async def extract_data_from_pdf_async(
+    pdf: PdfSource,
+    use_cache: bool = True,
+    on_progress: Optional[ProgressCallback] = None,
+    use_text_layer: bool = True,
+    on_item: Optional[ItemCallback] = None,
+) -> NarudzbaData:
+    """
+    Async variant of extract_data_from_pdf (same text-layer fast path and cache, non-blocking API call).
 
-    result = json.loads(response.choices[0].message.content)
+    With `on_item` the model response is streamed (see request_extraction_async);
+    results from the text layer or the cache are returned whole.
+    """
+    if use_text_layer:
+        data = await asyncio.to_thread(parse_text_layer, pdf)
+        if data is not None:
+            return data
+
+    if not use_cache:
+        return await request_extraction_async(pdf, on_progress, on_item=on_item)
+
+    cache = get_cache()
+    key = await asyncio.to_thread(extraction_cache_key, pdf)
+    # The disk tier is synchronous SQLite: keep it off the event loop
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        return NarudzbaData.model_validate_json(cached)
+
+    data = await request_extraction_async(pdf, on_progress, on_item=on_item)
+    await asyncio.to_thread(cache.set, key, data.model_dump_json())
+    return data
+
+
+def _merge_artikl(candidates: List[Artikl]) -> Artikl:
+    """Pick the most complete reading of one position and fill its gaps from the others."""
+    def completeness(a: Artikl):
+        filled = sum(1 for value in a.model_dump().values() if value not in ("", None))
+        return filled, len(a.naziv)
+
+    best = max(candidates, key=completeness)
+    merged = best.model_dump()
+    for other in candidates:
+        for field, value in other.model_dump().items():
+            if merged[field] in ("", None) and value not in ("", None):
+                merged[field] = value
+    return Artikl(**merged)
+
+
+def merge_chunk_results(results: List[NarudzbaData]) -> NarudzbaData:
+    """
+    Merge per-chunk extractions into one order.
 
-    artikli = [
-        Artikl(
-            redni_broj=a["redni_broj"],
-            naziv=a["naziv"],
-            novi_broj_dijela=a.get("novi_broj_dijela", ""),
-            kolicina=a["kolicina"],
-            naziv_objekta=a["naziv_objekta"],
-            wbs=a["wbs"]
-        )
-        for a in result["artikli"]
-    ]
+    The header comes from the first chunk (falling back to the first non-empty
+    one). Items are grouped by redni_broj: a position that straddles a chunk
+    boundary is seen by both chunks and collapses into a single, most complete
+    entry. Items are returned in redni_broj order.
+    """
+    broj_narudzbe = results[0].broj_narudzbe if results else ""
+    if not broj_narudzbe:
+        broj_narudzbe = next((r.broj_narudzbe for r in results if r.broj_narudzbe), "")
+
+    by_position: Dict[int, List[Artikl]] = {}
+    for result in results:
+        for artikl in result.artikli:
+            by_position.setdefault(artikl.redni_broj, []).append(artikl)
 
     return NarudzbaData(
-        broj_narudzbe=result["broj_narudzbe"],
-        artikli=artikli
+        broj_narudzbe=broj_narudzbe,
+        artikli=[_merge_artikl(by_position[pos]) for pos in sorted(by_position)]
     )
+
+
+async def request_extraction_chunked_async(
+    pdf: PdfSource,
+    pages_per_chunk: int = EXTRACTION_CHUNK_PAGES,
+    on_progress: Optional[ProgressCallback] = None,
+) -> NarudzbaData:
+    """
+    Extract a long order by sending page ranges to the model concurrently.
+
+    Ranges overlap by one page so items crossing a page break are seen whole.
+    The chunk size is raised if needed so the number of chunks never exceeds
+    MAX_CONCURRENT_EXTRACTIONS; all chunks then run in parallel and the wall
+    time is roughly that of the slowest chunk. Pages without order items
+    are dropped before the document is split.
+
+    Args:
+        pdf: Raw PDF file bytes or the path of a spooled upload
+        pages_per_chunk: Minimum number of new pages per chunk
+        on_progress: Optional callback receiving stage changes of every chunk
+
+    Returns:
+        Merged NarudzbaData
+    """
+    if PAGE_PRUNING:
+        pdf = (await asyncio.to_thread(prune_pages, pdf)).pdf
+    page_count = await asyncio.to_thread(get_page_count, pdf)
+    pages_per_chunk = max(pages_per_chunk, math.ceil(page_count / MAX_CONCURRENT_EXTRACTIONS))
+    ranges = page_ranges(page_count, pages_per_chunk)
+    if len(ranges) <= 1:
+        return await request_extraction_async(pdf, on_progress, prune=False)
+
+    logger.info("Ekstrakcija u %d dijelova (%d stranica)", len(ranges), page_count)
+    chunks = await asyncio.gather(*(
+        asyncio.to_thread(extract_pages, pdf, range(start, end)) for start, end in ranges
+    ))
+    results = await asyncio.gather(*(request_extraction_async(chunk, on_progress, prune=False) for chunk in chunks))
+    return merge_chunk_results(list(results))
+
+
+async def extract_data_from_pdf_chunked_async(
+    pdf: PdfSource,
+    use_cache: bool = True,
+    on_progress: Optional[ProgressCallback] = None,
+    use_text_layer: bool = True,
+) -> NarudzbaData:
+    """Cached variant of request_extraction_chunked_async, with the text-layer fast path."""
+    if use_text_layer:
+        data = await asyncio.to_thread(parse_text_layer, pdf)
+        if data is not None:
+            return data
+
+    if not use_cache:
+        return await request_extraction_chunked_async(pdf, on_progress=on_progress)
+
+    cache = get_cache()
+    key = await asyncio.to_thread(extraction_cache_key, pdf)
+    # Chunk boundaries depend on both settings, and the model sees each chunk alone
+    key += f":chunked:{EXTRACTION_CHUNK_PAGES}:{MAX_CONCURRENT_EXTRACTIONS}"
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        return NarudzbaData.model_validate_json(cached)
+
+    data = await request_extraction_chunked_async(pdf, on_progress=on_progress)
+    await asyncio.to_thread(cache.set, key, data.model_dump_json())
+    return data
+
+
+async def extract_batch_async(
+    documents: List[PdfSource],
+    parallelism: int = EXTRACTION_BATCH_PARALLELISM,
+    chunked: bool = False,
+    use_text_layer: bool = True,
+) -> AsyncIterator[Tuple[int, Optional[NarudzbaData], Optional[Exception]]]:
+    """
+    Extract several documents concurrently, reporting each as it finishes.
+
+    A failed document does not stop the others. Model calls still share the
+    worker-wide MAX_CONCURRENT_EXTRACTIONS slots and the OpenAI rate limiter.
+
+    Args:
+        documents: PDF bytes or paths
+        parallelism: Documents extracted at the same time
+        chunked: Split long documents into page ranges (as /extract?chunked=true)
+        use_text_layer: Try the text-layer parser first
+
+    Yields:
+        (index in documents, data, None) or (index, None, exception), in
+        completion order
+    """
+    semaphore = asyncio.Semaphore(max(parallelism, 1))
+    extract = extract_data_from_pdf_chunked_async if chunked else extract_data_from_pdf_async
+
+    async def run(index: int, pdf: PdfSource):
+        async with semaphore:
+            try:
+                return index, await extract(pdf, use_text_layer=use_text_layer), None
+            except Exception as e:
+                return index, None, e
+
+    tasks = [asyncio.create_task(run(index, pdf)) for index, pdf in enumerate(documents)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # The consumer went away (client disconnected): stop what is still running
+        for task in tasks:
+            task.cancel()
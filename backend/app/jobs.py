@@ -0,0 +1,190 @@
+"""
+Background extraction jobs.
+
+POST /jobs/extract enqueues a PDF and returns immediately; a bounded pool of
+asyncio workers runs the extraction. Every stage change is recorded as a
+JobEvent so clients can poll GET /jobs/{id} or follow the SSE stream;
+streamed jobs also record every item as soon as the model has written it.
+Finished jobs are kept for JOB_RESULT_TTL seconds.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional
+
+from .config import JOB_MAX_QUEUED, JOB_RESULT_TTL, JOB_WORKERS
+from .extraction import (
+    describe_extraction_error,
+    extract_data_from_pdf_async,
+    extract_data_from_pdf_chunked_async,
+)
+from .models import Artikl, JobEvent, JobInfo, JobStatus, NarudzbaData
+from .uploads import discard_upload
+
+logger = logging.getLogger(__name__)
+
+TERMINAL = (JobStatus.DONE, JobStatus.FAILED)
+
+
+class QueueFullError(Exception):
+    """Too many extraction jobs are waiting."""
+    pass
+
+
+class Job:
+    def __init__(self, pdf_path: str, filename: str = "", chunked: bool = False, stream: bool = False):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.chunked = chunked
+        self.stream = stream
+        # Spooled upload, removed once the job has run
+        self.pdf_path: Optional[str] = pdf_path
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.status = JobStatus.QUEUED
+        self.events: List[JobEvent] = [JobEvent(status=JobStatus.QUEUED, at=self.created_at)]
+        self.result: Optional[NarudzbaData] = None
+        self.error: Optional[str] = None
+        self.error_status: Optional[int] = None
+        self.retry_after: Optional[int] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL
+
+    def update(self, status: JobStatus, **details) -> None:
+        self.status = status
+        self._record(JobEvent(status=status, at=time.time(), details=details))
+
+    def add_item(self, artikl: Artikl) -> None:
+        """Record one streamed item (the status stays model_running)."""
+        self._record(JobEvent(status=self.status, at=time.time(), artikl=artikl))
+
+    def _record(self, event: JobEvent) -> None:
+        self.updated_at = event.at
+        self.events.append(event)
+        # Wake everyone waiting on this job, then arm a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def info(self) -> JobInfo:
+        return JobInfo(
+            id=self.id,
+            status=self.status,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            filename=self.filename,
+            result=self.result,
+            error=self.error,
+            error_status=self.error_status,
+            retry_after=self.retry_after,
+        )
+
+
+class JobManager:
+    """
+    In-process job queue served by a fixed number of asyncio workers.
+
+    Args:
+        workers: Jobs processed concurrently
+        ttl: Seconds a finished job (and its result) is retained
+        max_queued: Jobs allowed to wait before submit() is refused
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, ttl: float = JOB_RESULT_TTL, max_queued: int = JOB_MAX_QUEUED):
+        self.workers = workers
+        self.ttl = ttl
+        self.max_queued = max_queued
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _ensure_started(self) -> None:
+        # Workers are started on first use, inside the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, pdf_path: str, filename: str = "", chunked: bool = False, stream: bool = False) -> Job:
+        self._ensure_started()
+        self._purge()
+        if self._queue.qsize() >= self.max_queued:
+            raise QueueFullError("Previše zahtjeva u redu čekanja. Pokušajte ponovo za minutu.")
+        job = Job(pdf_path, filename, chunked, stream)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    async def events(self, job: Job, keepalive: float = 15.0) -> AsyncIterator[Optional[JobEvent]]:
+        """
+        Yield the job's events from the beginning until it finishes.
+
+        Yields None every `keepalive` seconds without news, so the caller can
+        send a heartbeat through proxies.
+        """
+        sent = 0
+        while True:
+            changed = job._changed
+            while sent < len(job.events):
+                yield job.events[sent]
+                sent += 1
+            if job.finished:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), keepalive)
+            except asyncio.TimeoutError:
+                yield None
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        def on_progress(stage: str, details: dict) -> None:
+            job.update(JobStatus(stage), **details)
+
+        try:
+            if job.chunked:
+                # Chunks overlap, so items are only final after merging; not streamed
+                job.result = await extract_data_from_pdf_chunked_async(job.pdf_path, on_progress=on_progress)
+            else:
+                job.result = await extract_data_from_pdf_async(
+                    job.pdf_path, on_progress=on_progress, on_item=job.add_item if job.stream else None
+                )
+            job.update(JobStatus.DONE, artikli=len(job.result.artikli))
+        except Exception as e:
+            job.error_status, job.error = describe_extraction_error(e)
+            job.retry_after = getattr(e, "retry_after", None)
+            if job.error_status == 500:
+                logger.exception("Extraction job %s failed", job.id)
+            job.update(JobStatus.FAILED, error=job.error, status_code=job.error_status)
+        finally:
+            discard_upload(job.pdf_path)
+            job.pdf_path = None
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.updated_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+# Initialize manager lazily
+_manager: Optional[JobManager] = None
+
+def get_job_manager() -> JobManager:
+    global _manager
+    if _manager is None:
+        _manager = JobManager()
+    return _manager
@@ -0,0 +1,94 @@
+"""
+Incremental reader for the items of a streamed JSON response.
+
+The model answers with one JSON object ({"broj_narudzbe": ..., "artikli":
+[...]}) token by token. JsonArrayItems scans the text as it arrives, tracking
+strings, escapes and nesting, and hands out every element of the top-level
+array under `key` as soon as its closing brace is seen. Only the scanner
+state is kept besides the text itself; each character is looked at once.
+"""
+
+import json
+from typing import Any, List, Optional
+
+
+class JsonArrayItems:
+    """
+    Collect the streamed text and yield completed elements of one array.
+
+    Args:
+        key: Name of the array in the top-level object (e.g. "artikli")
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.text: List[str] = []
+        self._buffer = ""       # text since the start of the current element
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None  # last top-level string (the key before a value)
+        self._in_array = False
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Add streamed text.
+
+        Returns:
+            Elements of the array completed by this chunk, parsed with json.loads
+        """
+        self.text.append(chunk)
+        items = []
+        offset = len(self._buffer)
+        self._buffer += chunk
+        buffer = self._buffer
+        stack = self._stack
+
+        for i in range(offset, len(buffer)):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(stack) == 1:
+                        self._last_string = buffer[self._string_start + 1:i]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                if ch == "[" and len(stack) == 1 and self._last_string == self.key:
+                    self._in_array = True
+                elif ch == "{" and self._in_array and len(stack) == 2:
+                    self._item_start = i
+                stack.append(ch)
+            elif ch in "}]":
+                stack.pop()
+                if ch == "}" and self._in_array and len(stack) == 2 and self._item_start is not None:
+                    items.append(json.loads(buffer[self._item_start:i + 1]))
+                    self._item_start = None
+                elif ch == "]" and self._in_array and len(stack) == 1:
+                    self._in_array = False
+
+        # Keep only the unfinished element (or nothing) for the next chunk
+        if self._item_start is not None:
+            self._buffer = buffer[self._item_start:]
+            self._string_start -= self._item_start
+            self._item_start = 0
+        else:
+            self._buffer = ""
+            # A key string still open at the chunk boundary stays in the buffer
+            if self._in_string:
+                self._buffer = buffer[self._string_start:]
+                self._string_start = 0
+        return items
+
+    def getvalue(self) -> str:
+        """The complete text received so far."""
+        return "".join(self.text)
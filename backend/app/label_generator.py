@@ -1,14 +1,34 @@
+import hashlib
 import html
 import io
+import json
+import math
+import multiprocessing
+import os
+import logging
+import threading
+import time
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import List, Literal
+from functools import lru_cache
+from itertools import repeat
+from typing import Callable, Dict, Iterator, List, Literal, Optional, Tuple
 
-import pdf2image
 from PIL import Image
-from weasyprint import HTML
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
 
+from . import metrics
+from .cache import ByteLRUCache
+from .config import PREVIEW_WORKERS, RENDER_CACHE_MB, RENDER_CHUNK_LABELS, RENDER_WORKERS
 from .models import LabelData
+from .pdf_processor import extract_pages, merge_pdfs, split_pages
+from .rasterizer import get_rasterizer
+from .text_fit import fit_font_size, get_glyph_advances
+
+logger = logging.getLogger(__name__)
 
 
 def calculate_font_size(text: str, max_chars: int, base_font_pt: float = 9.0, min_font_pt: float = 5.0) -> float:
@@ -39,21 +59,19 @@ def calculate_font_size(text: str, max_chars: int, base_font_pt: float = 9.0, mi
     return max(new_size, min_font_pt)
 
 
-def get_dynamic_style(text: str, max_chars: int, base_font_pt: float = 9.0, min_font_pt: float = 5.0) -> str:
+def get_fitted_style(text: str, field: str) -> str:
     """
-    Get inline style for dynamic font sizing (single line fields).
-    
+    Get inline style sizing a single-line field to its cell, measured with
+    the label font's metrics (see text_fit).
+
     Args:
         text: The text content
-        max_chars: Maximum characters that fit at base font size
-        base_font_pt: Base font size in points
-        min_font_pt: Minimum font size in points
-    
+        field: LabelData attribute of the cell
+
     Returns:
-        Inline style string with calculated font size
+        Inline style string with the fitted font size
     """
-    font_size = calculate_font_size(text, max_chars, base_font_pt, min_font_pt)
-    return f'style="font-size: {font_size:.1f}pt;"'
+    return f'style="font-size: {fit_font_size(text, field):.1f}pt;"'
 
 
 def generate_label_html(label: LabelData) -> str:
@@ -71,14 +89,14 @@ def generate_label_html(label: LabelData) -> str:
     datum = esc(label.datum)
 
     # Dynamic styles for all fields except Naziv (which can wrap)
-    novi_broj_style = get_dynamic_style(label.novi_broj_dijela, 22, 9.0, 5.0)
-    stari_broj_style = get_dynamic_style(label.stari_broj_dijela, 8, 7.0, 4.5)
-    kolicina_style = get_dynamic_style(label.kolicina, 45, 9.0, 6.0)
-    narudzba_style = get_dynamic_style(label.narudzba, 22, 9.0, 5.0)
-    account_style = get_dynamic_style(label.account_category, 8, 7.0, 4.5)
-    naziv_objekta_style = get_dynamic_style(label.naziv_objekta, 45, 9.0, 5.0)
-    wbs_style = get_dynamic_style(label.wbs, 45, 9.0, 5.0)
-    datum_style = get_dynamic_style(label.datum, 20, 9.0, 6.0)
+    novi_broj_style = get_fitted_style(label.novi_broj_dijela, "novi_broj_dijela")
+    stari_broj_style = get_fitted_style(label.stari_broj_dijela, "stari_broj_dijela")
+    kolicina_style = get_fitted_style(label.kolicina, "kolicina")
+    narudzba_style = get_fitted_style(label.narudzba, "narudzba")
+    account_style = get_fitted_style(label.account_category, "account_category")
+    naziv_objekta_style = get_fitted_style(label.naziv_objekta, "naziv_objekta")
+    wbs_style = get_fitted_style(label.wbs, "wbs")
+    datum_style = get_fitted_style(label.datum, "datum")
 
     return f'''
     <div class="label">
@@ -283,8 +301,36 @@ body {
 '''
 
 
-def generate_html_content(labels: List[LabelData]) -> str:
-    """Generate complete HTML document for labels."""
+# Per-thread render state, built lazily on a thread's first render. WeasyPrint
+# objects are not documented as thread-safe, so threads never share them and
+# renders in different threads never wait for each other. The process-wide
+# parts (fontconfig cache, glyph advances) are loaded once by warm_up(); a new
+# thread only pays for its own font configuration and stylesheet.
+_render_state = threading.local()
+
+
+def get_font_config() -> FontConfiguration:
+    """Font configuration shared by all renders in the current thread."""
+    if getattr(_render_state, "font_config", None) is None:
+        _render_state.font_config = FontConfiguration()
+    return _render_state.font_config
+
+
+def get_label_stylesheet() -> CSS:
+    """LABEL_CSS parsed once per thread and reused for every render."""
+    if getattr(_render_state, "stylesheet", None) is None:
+        _render_state.stylesheet = CSS(string=LABEL_CSS, font_config=get_font_config())
+    return _render_state.stylesheet
+
+
+def generate_html_content(labels: List[LabelData], inline_css: bool = True) -> str:
+    """
+    Generate complete HTML document for labels.
+
+    With inline_css=False the <style> block is left out; the caller then
+    passes the pre-parsed stylesheet from get_label_stylesheet().
+    """
+    style = f"<style>{LABEL_CSS}</style>" if inline_css else ""
     return f'''
     <!DOCTYPE html>
     <html lang="hr">
@@ -295,7 +341,7 @@ def generate_html_content(labels: List[LabelData]) -> str:
         <meta name="generator" content="WeasyPrint">
         <meta name="keywords" content="QA, identifikacija, naljepnice, Končar">
         <meta name="description" content="QA identifikacijske kartice za {len(labels)} artikala">
-        <style>{LABEL_CSS}</style>
+        {style}
     </head>
     <body>
         {''.join(generate_label_html(label) for label in labels)}
@@ -304,23 +350,115 @@ def generate_html_content(labels: List[LabelData]) -> str:
     '''
 
 
-def generate_labels_pdf(labels: List[LabelData]) -> bytes:
+def label_key(label: LabelData) -> tuple:
+    """Identity of a label's printed content (everything except copies)."""
+    return tuple(label.model_dump(exclude={"copies"}).values())
+
+
+def dedupe_labels(labels: List[LabelData]) -> Tuple[List[LabelData], List[int]]:
     """
-    Generate a PDF with all labels.
+    Collapse identical labels and expand copies.
+
+    Returns:
+        (unique labels in first-seen order, output sequence of unique indexes)
+        e.g. [A(copies=2), B, A] -> ([A, B], [0, 0, 1, 0])
+    """
+    index: Dict[tuple, int] = {}
+    unique: List[LabelData] = []
+    sequence: List[int] = []
+    for label in labels:
+        key = label_key(label)
+        if key not in index:
+            index[key] = len(unique)
+            unique.append(label)
+        sequence.extend([index[key]] * label.copies)
+    return unique, sequence
+
+
+# Initialize render cache lazily
+_render_cache: Optional[ByteLRUCache] = None
+
+def get_render_cache() -> Optional[ByteLRUCache]:
+    """Per-process cache of rendered single-label PDFs and PNGs, None when disabled."""
+    global _render_cache
+    if _render_cache is None and RENDER_CACHE_MB > 0:
+        _render_cache = ByteLRUCache(RENDER_CACHE_MB * 1024 * 1024)
+    return _render_cache
+
+
+@lru_cache(maxsize=1)
+def template_version() -> str:
+    """Fingerprint of everything besides the label data that shapes a rendered label."""
+    reference = LabelData(
+        naziv="Naziv", novi_broj_dijela="3TBT000008", stari_broj_dijela="0", kolicina="1 KOM",
+        narudzba="0", account_category="K", naziv_objekta="Objekt", wbs="WBS", datum="1.1.2026.",
+    )
+    advances = get_glyph_advances()
+    parts = [LABEL_CSS, generate_html_content([reference]), advances.path if advances else ""]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def render_cache_key(label: LabelData, kind: str) -> str:
+    """Stable key of a label's rendering: template version, output kind and label content."""
+    content = json.dumps(label.model_dump(exclude={"copies"}), sort_keys=True, ensure_ascii=False)
+    return f"{template_version()}:{kind}:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+
+
+def cached_render(
+    labels: List[LabelData],
+    kind: str,
+    render: Callable[[List[LabelData]], Iterator[bytes]],
+) -> Iterator[bytes]:
+    """
+    Yield one rendered artifact per label, rendering only labels not in the render cache.
+
+    Args:
+        labels: Distinct labels
+        kind: Artifact kind, part of the cache key (e.g. "pdf", "png:300:pdfium")
+        render: Renders the missing labels, yielding one artifact per label in order
+
+    Yields:
+        Artifact bytes in label order
+    """
+    cache = get_render_cache()
+    if cache is None:
+        yield from render(labels)
+        return
+    keys = [render_cache_key(label, kind) for label in labels]
+    # Hold on to hits now; they could be evicted while the misses render
+    found = [cache.get(key) for key in keys]
+    missing = [label for label, value in zip(labels, found) if value is None]
+    metrics.RENDER_CACHE.labels("hit").inc(len(labels) - len(missing))
+    metrics.RENDER_CACHE.labels("miss").inc(len(missing))
+    rendered = render(missing) if missing else iter(())
+    for key, value in zip(keys, found):
+        if value is None:
+            value = next(rendered)
+            cache.set(key, value)
+        yield value
+
+
+def _render_pdf_pages(labels: List[LabelData]) -> Iterator[bytes]:
+    yield from split_pages(render_labels_pdf_parallel(labels))
+
+
+def render_labels_pdf(labels: List[LabelData]) -> bytes:
+    """
+    Lay out and render labels with WeasyPrint, one page per label as given.
     
     Args:
-        labels: List of label data
+        labels: List of label data (copies are ignored)
     
     Returns:
-        PDF file as bytes (compatible with macOS Preview, Windows, and browsers)
+        PDF file as bytes
     """
-    html_content = generate_html_content(labels)
+    with metrics.timed("html_build"):
+        html_content = generate_html_content(labels, inline_css=False)
     
     pdf_buffer = io.BytesIO()
     
     # Generate PDF with compatibility options
-    HTML(string=html_content).write_pdf(
-        pdf_buffer,
+    options = dict(
         # Use PDF 1.7 for maximum compatibility (macOS Preview, Windows, browsers)
         pdf_version='1.7',
         # Include sRGB color profile for consistent colors
@@ -330,50 +468,310 @@ def generate_labels_pdf(labels: List[LabelData]) -> bytes:
         # JPEG quality (85 is good balance)
         jpeg_quality=85,
     )
+    # Same as HTML.write_pdf, split so layout and PDF writing are timed separately
+    with metrics.timed("weasyprint_layout"):
+        document = HTML(string=html_content).render(
+            # Pre-parsed label CSS and warm font configuration, reused across renders
+            stylesheets=[get_label_stylesheet()],
+            font_config=get_font_config(),
+            **options,
+        )
+    with metrics.timed("pdf_write"):
+        document.write_pdf(pdf_buffer, **options)
     
     pdf_buffer.seek(0)
     
     return pdf_buffer.getvalue()
 
 
-def generate_labels_png(labels: List[LabelData], dpi: int = 300) -> bytes:
+def generate_labels_pdf(labels: List[LabelData]) -> bytes:
     """
-    Generate PNG images of all labels as a ZIP file.
+    Generate a PDF with all labels.
     
-    Each label is rendered as a separate PNG file at 300 DPI,
-    perfect for thermal label printers (100mm x 100mm = ~1181x1181 pixels at 300 DPI).
+    Identical labels are laid out once; repeated pages (copies or duplicate
+    entries) reference the same page content instead of being re-rendered.
+    Pages of labels rendered before come from the render cache, so after an
+    edit only the changed labels are rendered again. When none of them was
+    rendered before, the rendered document is used as is and its pages are
+    cached once the result is built.
     
     Args:
         labels: List of label data
-        dpi: Resolution in dots per inch (default: 300 for thermal printers)
     
     Returns:
-        ZIP file containing PNG images as bytes
+        PDF file as bytes (compatible with macOS Preview, Windows, and browsers)
+    """
+    unique, sequence = dedupe_labels(labels)
+    cache = get_render_cache()
+    keys = [render_cache_key(label, "pdf") for label in unique] if cache is not None else []
+    reuse = any(cache.get(key) is not None for key in keys)
+    if reuse:
+        pages = list(cached_render(unique, "pdf", _render_pdf_pages))
+        pdf_bytes = pages[0] if len(pages) == 1 else merge_pdfs(pages)
+    else:
+        # Nothing to reuse: skip the split and merge of a cached render
+        pdf_bytes = render_labels_pdf_parallel(unique)
+    
+    result = pdf_bytes if sequence == list(range(len(unique))) else extract_pages(pdf_bytes, sequence)
+    
+    if cache is not None and not reuse:
+        metrics.RENDER_CACHE.labels("miss").inc(len(unique))
+        for key, page in zip(keys, split_pages(pdf_bytes)):
+            cache.set(key, page)
+    return result
+
+
+def warm_up() -> float:
+    """
+    Render one throwaway label so fontconfig and Pango are loaded before the
+    first real request, along with the calling thread's render state.
+
+    Returns:
+        Warm-up duration in seconds
+    """
+    start = time.perf_counter()
+    get_glyph_advances()
+    render_labels_pdf([LabelData(
+        naziv="Končar ČĆŽŠĐ čćžšđ", kolicina="1 KOM", narudzba="0", naziv_objekta="", wbs=""
+    )])
+    elapsed = time.perf_counter() - start
+    logger.info("Label renderer warmed up in %.2fs", elapsed)
+    return elapsed
+
+
+# Minimum labels per pool task; below twice this a job is rendered in-process
+MIN_CHUNK_LABELS = 10
+
+# Initialize pool lazily
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def _init_render_worker() -> None:
+    metrics.start_buffering()
+    warm_up()
+    metrics.drain_buffer()
+
+
+def get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """Process pool for large label jobs, or None when RENDER_WORKERS <= 1."""
+    global _render_pool
+    if RENDER_WORKERS <= 1:
+        return None
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn: forking a process that runs uvicorn/asyncio threads is unsafe
+            _render_pool = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_render_worker,
+            )
+        return _render_pool
+
+
+def warm_render_pool() -> None:
+    """Start every pool worker now (each warms its own renderer)."""
+    pool = get_render_pool()
+    if pool is not None:
+        # With no idle worker, every submit spawns a new process
+        for future in [pool.submit(os.getpid) for _ in range(RENDER_WORKERS)]:
+            future.result()
+
+
+def shutdown_render_pool() -> None:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(cancel_futures=True)
+            _render_pool = None
+
+
+def _reset_broken_pool(pool: ProcessPoolExecutor) -> None:
+    global _render_pool
+    logger.exception("Render pool failed, rendering in-process")
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def split_labels(labels: List[LabelData], workers: int = RENDER_WORKERS) -> List[List[LabelData]]:
+    """
+    Split labels into ordered chunks: one per worker, between MIN_CHUNK_LABELS
+    and RENDER_CHUNK_LABELS labels each.
+    """
+    size = max(MIN_CHUNK_LABELS, min(RENDER_CHUNK_LABELS, math.ceil(len(labels) / max(workers, 1))))
+    return [labels[i:i + size] for i in range(0, len(labels), size)]
+
+
+def _render_pdf_chunk(labels: List[LabelData]) -> Tuple[bytes, list]:
+    return render_labels_pdf(labels), metrics.drain_buffer()
+
+
+def render_labels_pdf_parallel(labels: List[LabelData]) -> bytes:
+    """
+    Render labels like render_labels_pdf, spreading large jobs over the
+    process pool and merging the chunk PDFs in order.
+    """
+    chunks = split_labels(labels)
+    pool = get_render_pool() if len(chunks) > 1 else None
+    if pool is None:
+        return render_labels_pdf(labels)
+    try:
+        parts = []
+        for part, samples in pool.map(_render_pdf_chunk, chunks):
+            metrics.replay(samples)
+            parts.append(part)
+        return merge_pdfs(parts)
+    except BrokenProcessPool:
+        _reset_broken_pool(pool)
+        return render_labels_pdf(labels)
+
+
+def iter_labels_png(labels: List[LabelData], dpi: int = 300, rasterizer: Optional[str] = None) -> Iterator[bytes]:
+    """
+    Render labels to PNG bytes, one page at a time, in the calling process.
+    
+    Args:
+        labels: List of label data (copies are ignored)
+        dpi: Resolution in dots per inch
+        rasterizer: Rasterizer backend, None for the configured default
+    
+    Yields:
+        PNG file bytes, one per label
     """
-    # First generate PDF
-    pdf_bytes = generate_labels_pdf(labels)
+    pdf_bytes = render_labels_pdf(labels)
     
-    # Convert PDF pages to images at specified DPI
+    # Convert PDF pages to images at specified DPI, page by page
     # 100mm at 300 DPI = 1181 pixels
-    images = pdf2image.convert_from_bytes(
+    images = get_rasterizer(rasterizer).render(
         pdf_bytes,
         dpi=dpi,
-        fmt='png',
         # Use exact 100mm x 100mm size
-        size=(int(100 * dpi / 25.4), int(100 * dpi / 25.4))
+        size=(int(100 * dpi / 25.4), int(100 * dpi / 25.4)),
+        pages=range(len(labels)),
     )
+    for _ in range(len(labels)):
+        with metrics.timed("rasterize"):
+            image = next(images)
+        yield encode_png(image)
+
+
+def encode_png(image: Image.Image) -> bytes:
+    with metrics.timed("png_encode"):
+        img_buffer = io.BytesIO()
+        image.save(img_buffer, format='PNG', optimize=True)
+        return img_buffer.getvalue()
+
+
+def _render_png_chunk(labels: List[LabelData], dpi: int, rasterizer: Optional[str]) -> Tuple[List[bytes], list]:
+    return list(iter_labels_png(labels, dpi, rasterizer)), metrics.drain_buffer()
+
+
+def iter_labels_png_parallel(labels: List[LabelData], dpi: int = 300, rasterizer: Optional[str] = None) -> Iterator[bytes]:
+    """Like iter_labels_png, rendering and rasterizing large jobs in the process pool."""
+    chunks = split_labels(labels)
+    pool = get_render_pool() if len(chunks) > 1 else None
+    if pool is None:
+        yield from iter_labels_png(labels, dpi, rasterizer)
+        return
+    done = 0
+    try:
+        # Results come back in chunk order while later chunks are still rendering
+        for pngs, samples in pool.map(_render_png_chunk, chunks, repeat(dpi), repeat(rasterizer)):
+            metrics.replay(samples)
+            yield from pngs
+            done += len(pngs)
+    except BrokenProcessPool:
+        _reset_broken_pool(pool)
+        yield from iter_labels_png(labels[done:], dpi, rasterizer)
+
+
+class _ZipStream:
+    """
+    Write-only, non-seekable sink for zipfile.ZipFile.
+    
+    Without seek()/tell() ZipFile writes each entry with a data descriptor, so
+    bytes can be handed out as soon as an entry is finished.
+    """
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_labels_png_zip(labels: List[LabelData], dpi: int = 300, rasterizer: Optional[str] = None) -> Iterator[bytes]:
+    """
+    Stream a ZIP of label PNGs, one chunk per finished entry.
+    
+    Small jobs render the label PDF up front and then rasterize and encode one
+    page at a time, so only one label image is held in memory; large jobs are
+    rendered in chunks by the process pool and stream out in chunk order.
+    An encoded PNG is only kept while copies of its label are still to be
+    written, and dropped after its last entry.
+    
+    Args:
+        labels: List of label data
+        dpi: Resolution in dots per inch
+        rasterizer: Rasterizer backend ("pdfium" or "pdf2image"), None for the configured default
+    
+    Yields:
+        ZIP file bytes; the concatenation is a complete archive
+    """
+    # Render each distinct label once, and only if it is not cached yet
+    unique, sequence = dedupe_labels(labels)
+    encoded = cached_render(
+        unique,
+        f"png:{dpi}:{get_rasterizer(rasterizer).name}",
+        lambda missing: iter_labels_png_parallel(missing, dpi, rasterizer),
+    )
+    
+    last_entry = {unique_index: i for i, unique_index in enumerate(sequence)}
+    pngs: Dict[int, bytes] = {}
+    stream = _ZipStream()
+    # PNG is already compressed, so store it
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED) as zip_file:
+        for i, unique_index in enumerate(sequence):
+            # Unique indexes first appear in order, so the next page is always the one needed
+            png = pngs.pop(unique_index, None)
+            if png is None:
+                png = next(encoded)
+            with metrics.timed("zip"):
+                zip_file.writestr(f'naljepnica_{i + 1:03d}.png', png)
+            if last_entry[unique_index] > i:
+                pngs[unique_index] = png
+            yield stream.take()
+    # Central directory
+    yield stream.take()
+
+
+def generate_labels_png(labels: List[LabelData], dpi: int = 300, rasterizer: Optional[str] = None) -> bytes:
+    """
+    Generate PNG images of all labels as a ZIP file.
+    
+    Each label is rendered as a separate PNG file at 300 DPI,
+    perfect for thermal label printers (100mm x 100mm = ~1181x1181 pixels at 300 DPI).
     
-    # Create ZIP file with all PNG images
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for i, image in enumerate(images, 1):
-            img_buffer = io.BytesIO()
-            image.save(img_buffer, format='PNG', optimize=True)
-            img_buffer.seek(0)
-            zip_file.writestr(f'naljepnica_{i:03d}.png', img_buffer.getvalue())
+    Args:
+        labels: List of label data
+        dpi: Resolution in dots per inch (default: 300 for thermal printers)
+        rasterizer: Rasterizer backend ("pdfium" or "pdf2image"), None for the configured default
     
-    zip_buffer.seek(0)
-    return zip_buffer.getvalue()
+    Returns:
+        ZIP file containing PNG images as bytes
+    """
+    return b"".join(iter_labels_png_zip(labels, dpi, rasterizer))
 
 
 def generate_single_label_png(labels: List[LabelData], index: int = 0, dpi: int = 300) -> bytes:
@@ -391,22 +789,86 @@ def generate_single_label_png(labels: List[LabelData], index: int = 0, dpi: int
     if index >= len(labels):
         raise ValueError(f"Label index {index} out of range (0-{len(labels)-1})")
     
-    # Generate HTML for single label
-    single_label = [labels[index]]
-    pdf_bytes = generate_labels_pdf(single_label)
+    # Served from the render cache when this label was rendered at this DPI before
+    return next(cached_render(
+        [labels[index]],
+        f"png:{dpi}:{get_rasterizer().name}",
+        lambda missing: iter_labels_png(missing, dpi),
+    ))
+
+
+def preview_kind(dpi: int, image_format: str) -> str:
+    return f"preview:{image_format}:{dpi}:{get_rasterizer().name}"
+
+
+def preview_etag(label: LabelData, dpi: int = 96, image_format: str = "png") -> str:
+    """ETag of a label preview; computed without rendering."""
+    key = render_cache_key(label, preview_kind(dpi, image_format))
+    return hashlib.sha256(key.encode("ascii")).hexdigest()[:32]
+
+
+def encode_preview(image: Image.Image, image_format: str) -> bytes:
+    with metrics.timed("png_encode"):
+        buffer = io.BytesIO()
+        if image_format == "webp":
+            # Lossless keeps text edges sharp; method 1 is ~5 ms and a third of the PNG size
+            image.save(buffer, format="WEBP", lossless=True, method=1)
+        else:
+            # Speed over size: previews are small and short-lived
+            image.save(buffer, format="PNG", compress_level=1)
+        return buffer.getvalue()
+
+
+def _render_previews(labels: List[LabelData], dpi: int, image_format: str) -> Iterator[bytes]:
+    size = int(100 * dpi / 25.4)
+    for label in labels:
+        # The label's PDF page is shared with /generate-pdf through the render cache
+        pdf_bytes = next(cached_render([label], "pdf", _render_pdf_pages))
+        with metrics.timed("rasterize"):
+            image = next(get_rasterizer().render(pdf_bytes, dpi=dpi, size=(size, size)))
+        yield encode_preview(image, image_format)
+
+
+# Initialize preview pool lazily
+_preview_pool: Optional[ThreadPoolExecutor] = None
+_preview_pool_lock = threading.Lock()
+
+
+def get_preview_pool() -> ThreadPoolExecutor:
+    """Threads reserved for previews; they never wait behind /generate-pdf renders."""
+    global _preview_pool
+    if _preview_pool is None:
+        with _preview_pool_lock:
+            if _preview_pool is None:
+                _preview_pool = ThreadPoolExecutor(max_workers=max(PREVIEW_WORKERS, 1), thread_name_prefix="preview")
+    return _preview_pool
+
+
+def warm_preview_pool() -> None:
+    """Start every preview thread now, each warming its own render state."""
+    pool = get_preview_pool()
+    # Each submit finds no idle thread and starts a new one
+    for future in [pool.submit(warm_up) for _ in range(max(PREVIEW_WORKERS, 1))]:
+        future.result()
+
+
+def generate_label_preview(label: LabelData, dpi: int = 96, image_format: str = "png") -> bytes:
+    """
+    Low-resolution image of one label for on-screen previews.
     
-    # Convert to PNG
-    images = pdf2image.convert_from_bytes(
-        pdf_bytes,
-        dpi=dpi,
-        fmt='png',
-        size=(int(100 * dpi / 25.4), int(100 * dpi / 25.4))
-    )
+    Callers run it in get_preview_pool(), whose threads stay warm and are
+    not shared with batch renders.
     
-    if images:
-        img_buffer = io.BytesIO()
-        images[0].save(img_buffer, format='PNG', optimize=True)
-        img_buffer.seek(0)
-        return img_buffer.getvalue()
+    Args:
+        label: Label data
+        dpi: Resolution in dots per inch (default: 96, 378 x 378 px)
+        image_format: "png" or "webp"
     
-    raise ValueError("Failed to generate PNG image")
+    Returns:
+        Image bytes, from the render cache when this label was previewed before
+    """
+    return next(cached_render(
+        [label],
+        preview_kind(dpi, image_format),
+        lambda missing: _render_previews(missing, dpi, image_format),
+    ))
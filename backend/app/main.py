@@ -1,23 +1,66 @@
+import asyncio
+import logging
 import os
 import traceback
+from contextlib import asynccontextmanager
+from typing import Iterator, List, Optional
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import FastAPI, File, Header, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 
+from . import metrics
+from .config import EXTRACTION_BATCH_PARALLELISM, LABEL_WARMUP, MAX_CONCURRENT_EXTRACTIONS, RENDER_WORKERS
 from .extraction import (
-    extract_data_from_pdf,
+    describe_extraction_error,
+    extract_batch_async,
+    extract_data_from_pdf_async,
+    extract_data_from_pdf_chunked_async,
+    extraction_cache_stats,
     InsufficientQuotaError,
     OpenAIRateLimitError,
     OpenAITimeoutError,
 )
-from .label_generator import generate_labels_pdf, generate_labels_png
-from .models import GenerateLabelsRequest, NarudzbaData, OutputFormat
+from .jobs import Job, QueueFullError, get_job_manager
+from .label_generator import (
+    generate_label_preview,
+    generate_labels_pdf,
+    generate_labels_png,
+    get_preview_pool,
+    iter_labels_png_zip,
+    preview_etag,
+    shutdown_render_pool,
+    warm_preview_pool,
+    warm_render_pool,
+    warm_up,
+)
+from .models import BatchResult, GenerateLabelsRequest, JobInfo, NarudzbaData, OutputFormat, PreviewRequest
+from .uploads import UploadLimitMiddleware, discard_upload, save_batch_upload, save_pdf_upload
+from .zpl_label import generate_labels_text_zpl
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if LABEL_WARMUP:
+        try:
+            await run_in_threadpool(warm_up)
+            await run_in_threadpool(warm_preview_pool)
+            await run_in_threadpool(warm_render_pool)
+        except Exception:
+            logger.exception("Label renderer warm-up failed")
+    yield
+    shutdown_render_pool()
+
 
 app = FastAPI(
     title="Končar Naljepnice API",
     description="API za ekstrakciju podataka iz narudžbenica i generiranje QA naljepnica",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware - allow frontend origins
@@ -33,13 +76,23 @@ if frontend_url:
     if frontend_url.startswith("https://"):
         allowed_origins.append(frontend_url.rstrip("/"))
 
+MAX_FILE_SIZE = 30 * 1024 * 1024  # 30MB
+# /extract/batch: PDFs per request (ZIP members included) and total upload size
+MAX_BATCH_FILES = 50
+MAX_BATCH_SIZE = 200 * 1024 * 1024
+
+# Reject oversized uploads before the multipart body is parsed (added first,
+# so CORS headers still wrap the 413)
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_FILE_SIZE, paths=("/extract", "/jobs/extract"))
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_BATCH_SIZE, paths=("/extract/batch",))
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition", "Content-Length"],
+    expose_headers=["Content-Disposition", "Content-Length", "ETag"],
 )
 
 
@@ -53,33 +106,44 @@ async def health_check():
     return {"status": "healthy"}
 
 
-MAX_FILE_SIZE = 30 * 1024 * 1024  # 30MB
-MAX_LABELS = 100
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics (stage latency histograms, OpenAI and output counters)."""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+# Large jobs need the render process pool (RENDER_WORKERS); without it a job
+# is rendered in one in-process pass, so the original limit applies
+MAX_LABELS = 1000 if RENDER_WORKERS > 1 else 100
+# Printed labels including copies; copies are rendered once, so this can be much higher
+MAX_TOTAL_LABELS = 5000
+
+
+async def read_pdf_upload(file: UploadFile) -> str:
+    """Spool an uploaded PDF to disk, rejecting other file types and oversized files."""
+    with metrics.timed("upload_read"):
+        return await save_pdf_upload(file, MAX_FILE_SIZE)
 
 
 @app.post("/extract", response_model=NarudzbaData)
-async def extract_from_pdf(file: UploadFile = File(...)):
+async def extract_from_pdf(file: UploadFile = File(...), chunked: bool = False):
     """
     Extract order data from a PDF file.
 
     Sends the PDF directly to OpenAI API (native PDF input) to extract
-    structured data about items in the order.
+    structured data about items in the order. With `chunked=true` long
+    orders are split into page ranges that are extracted in parallel.
     """
-    if not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Samo PDF datoteke su podržane")
-
+    pdf_path = None
     try:
-        # Read PDF content
-        pdf_bytes = await file.read()
-
-        if len(pdf_bytes) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail=f"Datoteka je prevelika ({len(pdf_bytes) // (1024*1024)}MB). Maksimum je 30MB."
-            )
+        pdf_path = await read_pdf_upload(file)
 
-        # Extract data using OpenAI native PDF input
-        data = extract_data_from_pdf(pdf_bytes)
+        # Extract data using OpenAI native PDF input (async, doesn't block the event loop)
+        if chunked:
+            data = await extract_data_from_pdf_chunked_async(pdf_path)
+        else:
+            data = await extract_data_from_pdf_async(pdf_path)
 
         return data
 
@@ -99,6 +163,168 @@ async def extract_from_pdf(file: UploadFile = File(...)):
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Greška pri obradi PDF-a: {str(e)}")
+    finally:
+        if pdf_path:
+            discard_upload(pdf_path)
+
+
+@app.post("/extract/batch")
+async def extract_batch(
+    files: List[UploadFile] = File(...),
+    parallelism: int = Query(
+        default=EXTRACTION_BATCH_PARALLELISM,
+        ge=1,
+        le=16,
+        description=f"Documents in progress at once; at most {MAX_CONCURRENT_EXTRACTIONS} of them "
+                    "call the model at a time (MAX_CONCURRENT_EXTRACTIONS)",
+    ),
+    chunked: bool = False,
+):
+    """
+    Extract many orders at once: PDF files and/or ZIP archives of PDFs.
+
+    Documents are extracted `parallelism` at a time. Model calls are still
+    capped per worker by MAX_CONCURRENT_EXTRACTIONS, so a higher value only
+    helps documents the text-layer parser or the cache can answer. The
+    response is NDJSON, one BatchResult line per document as soon as it
+    finishes (completion order, `index` gives the upload order); a failed
+    document is reported on its line and does not stop the batch.
+    """
+    with metrics.timed("upload_read"):
+        documents = await save_batch_upload(files, MAX_FILE_SIZE, MAX_BATCH_FILES)
+
+    async def results():
+        async for index, data, error in extract_batch_async(
+            [path for _, path in documents], parallelism=parallelism, chunked=chunked
+        ):
+            filename, path = documents[index]
+            discard_upload(path)
+            line = BatchResult(index=index, filename=filename, result=data)
+            if error is not None:
+                line.error_status, line.error = describe_extraction_error(error)
+                if line.error_status == 500:
+                    logger.error("Batch extraction of %s failed", filename, exc_info=error)
+            yield line.model_dump_json() + "\n"
+
+    def discard_documents() -> None:
+        for _, path in documents:
+            discard_upload(path)
+
+    # Runs once the response is over, also when the stream was never started
+    return StreamingResponse(
+        results(), media_type="application/x-ndjson", background=BackgroundTask(discard_documents)
+    )
+
+
+@app.post("/jobs/extract", response_model=JobInfo, status_code=202)
+async def create_extraction_job(file: UploadFile = File(...), chunked: bool = False, stream: bool = False):
+    """
+    Queue a PDF for extraction and return the job immediately.
+
+    Follow progress with GET /jobs/{id} (polling) or GET /jobs/{id}/events (SSE).
+    With `stream=true` the events also carry every item as soon as the model
+    has written it (not combined with `chunked`).
+    """
+    pdf_path = await read_pdf_upload(file)
+    try:
+        job = get_job_manager().submit(pdf_path, filename=file.filename, chunked=chunked, stream=stream)
+    except QueueFullError as e:
+        discard_upload(pdf_path)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    return job.info()
+
+
+def _get_job(job_id: str) -> Job:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Posao ne postoji ili je istekao")
+    return job
+
+
+@app.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_extraction_job(job_id: str):
+    """Current status of an extraction job, with the result once done."""
+    return _get_job(job_id).info()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_extraction_job(job_id: str):
+    """
+    Server-Sent Events stream of job stages.
+
+    Emits one event per stage (queued, uploading, model_running,
+    retry_after_429, retrying, done, failed) and a final `result` event
+    with the full job info. Streamed jobs add an `artikl` event per item;
+    a model_running event with a new attempt means the items start over.
+    """
+    job = _get_job(job_id)
+    manager = get_job_manager()
+
+    async def event_stream():
+        async for event in manager.events(job):
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            name = "artikl" if event.artikl is not None else event.status.value
+            yield f"event: {name}\ndata: {event.model_dump_json()}\n\n"
+        yield f"event: result\ndata: {job.info().model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/extract/cache-stats")
+async def extract_cache_stats():
+    """Hit/miss counters of the extraction cache."""
+    return extraction_cache_stats()
+
+
+def count_output(output_format: OutputFormat, labels: int, size: int) -> None:
+    metrics.LABELS_RENDERED.labels(output_format.value).inc(labels)
+    metrics.RESPONSE_BYTES.labels(output_format.value).inc(size)
+
+
+def stream_chunks(first: bytes, rest: Iterator[bytes], output_format: OutputFormat, labels: int) -> Iterator[bytes]:
+    """Yield an already computed first chunk, then the rest of the stream."""
+    size = len(first)
+    yield first
+    try:
+        for chunk in rest:
+            size += len(chunk)
+            yield chunk
+    except Exception:
+        # Headers are already sent; the client sees a truncated archive
+        logger.exception("Label ZIP stream failed")
+        raise
+    count_output(output_format, labels, size)
+
+
+@app.post("/preview")
+async def preview_label(request: PreviewRequest, if_none_match: Optional[str] = Header(default=None)):
+    """
+    Low-DPI image of one label, as it will be printed.
+
+    The ETag identifies the label content and template; send it back in
+    If-None-Match to get 304 Not Modified without any rendering.
+    """
+    fmt = request.format.value
+    etag = f'"{preview_etag(request.label, request.dpi, fmt)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        # Own threads: a preview never queues behind a /generate-pdf job in the threadpool
+        image = await asyncio.get_running_loop().run_in_executor(
+            get_preview_pool(), generate_label_preview, request.label, request.dpi, fmt
+        )
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Greška pri izradi pregleda: {str(e)}")
+    return Response(content=image, media_type=f"image/{fmt}", headers=headers)
 
 
 @app.post("/generate-pdf")
@@ -109,6 +335,7 @@ async def generate_labels(request: GenerateLabelsRequest):
     Supports:
     - PDF: Single PDF file with one label per page (100mm x 100mm)
     - PNG: ZIP file containing PNG images at 300 DPI (optimized for thermal label printers)
+    - ZPL: Native ZPL for the Citizen CL-E321 (optionally as a printer-stored format)
     """
     try:
         if not request.labels:
@@ -120,9 +347,48 @@ async def generate_labels(request: GenerateLabelsRequest):
                 detail=f"Previše naljepnica ({len(request.labels)}). Maksimum je {MAX_LABELS}."
             )
 
-        if request.format == OutputFormat.PNG:
+        total_labels = sum(label.copies for label in request.labels)
+        if total_labels > MAX_TOTAL_LABELS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Previše kopija ({total_labels}). Maksimum je {MAX_TOTAL_LABELS} naljepnica."
+            )
+
+        if request.format == OutputFormat.ZPL:
+            # Text ZPL is built in microseconds, no threadpool needed
+            zpl = "\n".join(generate_labels_text_zpl(request.labels, stored_format=request.zpl_stored_format))
+            zpl_bytes = zpl.encode("utf-8")
+            count_output(request.format, total_labels, len(zpl_bytes))
+            return Response(
+                content=zpl_bytes,
+                media_type="application/octet-stream",
+                headers={
+                    "Content-Disposition": 'attachment; filename="naljepnice.zpl"',
+                    "Content-Length": str(len(zpl_bytes)),
+                    "Cache-Control": "no-cache, no-store, must-revalidate",
+                    "Pragma": "no-cache",
+                    "Expires": "0",
+                }
+            )
+        elif request.format == OutputFormat.PNG and request.stream:
+            # Stream the PNG ZIP as labels are rasterized; render the PDF and the
+            # first entry before answering so rendering errors still return 500
+            chunks = iter_labels_png_zip(request.labels, dpi=300)
+            first = await run_in_threadpool(next, chunks)
+            return StreamingResponse(
+                stream_chunks(first, chunks, request.format, total_labels),
+                media_type="application/zip",
+                headers={
+                    "Content-Disposition": 'attachment; filename="naljepnice.zip"',
+                    "Cache-Control": "no-cache, no-store, must-revalidate",
+                    "Pragma": "no-cache",
+                    "Expires": "0",
+                }
+            )
+        elif request.format == OutputFormat.PNG:
             # Generate PNG ZIP for label printers
-            zip_bytes = generate_labels_png(request.labels, dpi=300)
+            zip_bytes = await run_in_threadpool(generate_labels_png, request.labels, dpi=300)
+            count_output(request.format, total_labels, len(zip_bytes))
             return Response(
                 content=zip_bytes,
                 media_type="application/zip",
@@ -136,7 +402,8 @@ async def generate_labels(request: GenerateLabelsRequest):
             )
         else:
             # Generate PDF (default)
-            pdf_bytes = generate_labels_pdf(request.labels)
+            pdf_bytes = await run_in_threadpool(generate_labels_pdf, request.labels)
+            count_output(request.format, total_labels, len(pdf_bytes))
             return Response(
                 content=pdf_bytes,
                 media_type="application/pdf",
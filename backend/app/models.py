@@ -1,12 +1,18 @@
 from enum import Enum
-from typing import List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class OutputFormat(str, Enum):
     PDF = "pdf"
     PNG = "png"  # Returns ZIP with PNG files at 300 DPI
+    ZPL = "zpl"  # Native printer ZPL (text, fonts and boxes), 203 DPI
+
+
+class PreviewFormat(str, Enum):
+    PNG = "png"
+    WEBP = "webp"
 
 
 class Artikl(BaseModel):
@@ -24,6 +30,15 @@ class NarudzbaData(BaseModel):
     artikli: List[Artikl]
 
 
+class BatchResult(BaseModel):
+    """One line of the /extract/batch NDJSON stream."""
+    index: int  # position of the document in the upload (ZIP members in archive order)
+    filename: str
+    result: Optional[NarudzbaData] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+
+
 class LabelData(BaseModel):
     naziv: str
     novi_broj_dijela: str = ""
@@ -34,9 +49,46 @@ class LabelData(BaseModel):
     naziv_objekta: str
     wbs: str
     datum: str = ""
+    copies: int = Field(default=1, ge=1, le=1000)  # identical labels, rendered once
 
 
 class GenerateLabelsRequest(BaseModel):
     labels: List[LabelData]
     format: OutputFormat = OutputFormat.PDF  # Default to PDF for backwards compatibility
+    stream: bool = False  # PNG: opt in to streaming the ZIP entry by entry instead of building it in memory
+    zpl_stored_format: bool = False  # ZPL: download the layout once (^DF) and recall it per label (^XF)
+
+
+class PreviewRequest(BaseModel):
+    label: LabelData
+    dpi: int = Field(default=96, ge=48, le=300)  # 96 DPI = 378 x 378 px
+    format: PreviewFormat = PreviewFormat.PNG
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    UPLOADING = "uploading"
+    MODEL_RUNNING = "model_running"
+    RETRY_AFTER_429 = "retry_after_429"
+    RETRYING = "retrying"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class JobEvent(BaseModel):
+    status: JobStatus
+    at: float
+    details: Dict[str, Any] = {}
+    artikl: Optional[Artikl] = None  # streamed jobs: one extracted item, status unchanged
+
 
+class JobInfo(BaseModel):
+    id: str
+    status: JobStatus
+    created_at: float
+    updated_at: float
+    filename: str = ""
+    result: Optional[NarudzbaData] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+    retry_after: Optional[int] = None
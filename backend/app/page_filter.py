@@ -0,0 +1,162 @@
+"""
+Drop pages without order items before a PDF goes to the model.
+
+Končar orders often end with pages of general terms and conditions, a cover
+letter or signatures. Every page is paid for in tokens and prefill time, so
+each page is scored by the item markers of the order layout (the same ones
+text_parser reads): the "Poz" table header, part codes, quantities with a
+unit and "Proj:" / "WBS :" lines. Only the first page (order header), pages
+that look like they carry items and the page right after an item page (it
+may hold the end of the last item) are rebuilt into a smaller PDF.
+
+The check errs on the side of keeping pages: a page without a usable text
+layer (scanned) is always kept, and if no page qualifies the document is
+sent unchanged.
+"""
+
+import logging
+import re
+from typing import Dict, List, NamedTuple
+
+from . import metrics
+from .pdf_processor import PdfSource, extract_pages, get_page_count, pdf_size
+from .text_parser import (
+    MIN_TEXT_CHARS,
+    PART_CODE_RE,
+    PROJ_RE,
+    QUANTITY_RE,
+    TABLE_HEADER_RE,
+    WBS_RE,
+    pdfium,
+    read_lines,
+)
+
+logger = logging.getLogger(__name__)
+
+# Marker hits a page needs to be sent; an item line usually has a part code
+# and a quantity, so one stray "2 KOM" in running text is not enough
+MIN_PAGE_SCORE = 2
+# Page numbers do not make a page worth sending
+FOOTER_RE = re.compile(r"^(Stranica|Strana)\b")
+# The model gets every page as extracted text plus a page image; rough input
+# cost per page and prefill throughput, only used to estimate what was saved
+TOKENS_PER_PAGE = 1500
+MODEL_INPUT_TOKENS_PER_SECOND = 5000
+
+
+class PageScore(NamedTuple):
+    score: int       # item-marker hits; -1 without a usable text layer
+    text_chars: int  # characters outside footer lines
+
+
+class PrunedPdf(NamedTuple):
+    pdf: PdfSource          # the PDF to send (the original when nothing was dropped)
+    page_count: int         # pages in the original
+    kept: List[int]         # 0-based indexes of the pages sent
+    bytes_saved: int
+
+    @property
+    def pages_dropped(self) -> int:
+        return self.page_count - len(self.kept)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.pages_dropped * TOKENS_PER_PAGE
+
+    @property
+    def seconds_saved(self) -> float:
+        """Estimated model latency saved (prefill of the dropped input)."""
+        return self.tokens_saved / MODEL_INPUT_TOKENS_PER_SECOND
+
+
+def _line_score(text: str) -> int:
+    score = len(PART_CODE_RE.findall(text)) + len(QUANTITY_RE.findall(text))
+    if TABLE_HEADER_RE.match(text) or PROJ_RE.match(text) or WBS_RE.match(text):
+        score += 1
+    return score
+
+
+def score_pages(pdf: PdfSource, page_count: int) -> List[PageScore]:
+    """
+    Item-marker score and footer-free text length of every page.
+
+    Args:
+        pdf: Raw PDF file bytes or path
+        page_count: Number of pages in the PDF
+    """
+    scores = [0] * page_count
+    chars = [0] * page_count
+    text_chars = [0] * page_count
+    for line in read_lines(pdf):
+        text = line.text
+        chars[line.page] += len(text)
+        scores[line.page] += _line_score(text)
+        if not FOOTER_RE.match(text):
+            text_chars[line.page] += len(text)
+    return [
+        PageScore(score if chars[page] >= MIN_TEXT_CHARS else -1, text_chars[page])
+        for page, score in enumerate(scores)
+    ]
+
+
+def relevant_pages(pages: List[PageScore]) -> List[int]:
+    """
+    Pages to send: the header page, pages with items, pages that cannot be
+    judged, and any page with text after an item page (a lone "Proj:" line
+    or the rest of a description belongs to the last item).
+    """
+    kept = []
+    for page, (score, text_chars) in enumerate(pages):
+        follows_items = page > 0 and pages[page - 1].score >= MIN_PAGE_SCORE
+        if page == 0 or score < 0 or score >= MIN_PAGE_SCORE or (follows_items and text_chars > 0):
+            kept.append(page)
+    return kept
+
+
+def prune_pages(pdf: PdfSource) -> PrunedPdf:
+    """
+    Rebuild the PDF from its relevant pages.
+
+    Args:
+        pdf: Raw PDF file bytes or the path of a spooled upload
+
+    Returns:
+        PrunedPdf; its `pdf` is the original when no page was dropped or
+        the pages could not be read
+    """
+    size = pdf_size(pdf)
+    try:
+        with metrics.timed("page_prune"):
+            page_count = get_page_count(pdf)
+            if pdfium is None or page_count <= 1:
+                return PrunedPdf(pdf, page_count, list(range(page_count)), 0)
+            pages = score_pages(pdf, page_count)
+            kept = relevant_pages(pages)
+            # Nothing but the header qualified: unknown layout, send everything
+            if len(kept) == page_count or not any(page.score >= MIN_PAGE_SCORE for page in pages):
+                return PrunedPdf(pdf, page_count, list(range(page_count)), 0)
+            pruned = extract_pages(pdf, kept)
+    except Exception:
+        logger.warning("Odabir stranica nije uspio, šaljem cijeli PDF", exc_info=True)
+        return PrunedPdf(pdf, 0, [], 0)
+
+    # Shared resources can keep the bytes up, but every dropped page still saves tokens
+    result = PrunedPdf(pruned, page_count, kept, max(size - len(pruned), 0))
+    metrics.PAGES_DROPPED.inc(result.pages_dropped)
+    metrics.PRUNED_BYTES.inc(result.bytes_saved)
+    metrics.PRUNED_SECONDS.inc(result.seconds_saved)
+    logger.info(
+        "Izbačeno %d od %d stranica bez stavki: -%d KB (~%d tokena, ~%.1f s)",
+        result.pages_dropped, page_count, result.bytes_saved // 1024, result.tokens_saved, result.seconds_saved,
+    )
+    return result
+
+
+def prune_report(result: PrunedPdf) -> Dict[str, float]:
+    """Progress details for the model call (pages dropped, bytes, tokens and seconds saved)."""
+    return {
+        "pages_dropped": result.pages_dropped,
+        "bytes_saved": result.bytes_saved,
+        "tokens_saved": result.tokens_saved,
+        "seconds_saved": round(result.seconds_saved, 2),
+    }
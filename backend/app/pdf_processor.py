@@ -1,42 +1,281 @@
 import io
-from typing import List
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-from pdf2image import convert_from_bytes
 from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+from .config import IMAGE_ENCODE_WORKERS
+from .rasterizer import get_rasterizer
 
 # Increase the decompression bomb limit for large PDFs
 # Default is ~89M pixels, we increase to 300M
 Image.MAX_IMAGE_PIXELS = 300_000_000
 
+# A PDF held in memory, or the path of an upload spooled to disk
+PdfSource = Union[bytes, str]
+
+
+def open_pdf(pdf: PdfSource) -> BinaryIO:
+    """Binary file object for a PdfSource (use as a context manager)."""
+    return io.BytesIO(pdf) if isinstance(pdf, (bytes, bytearray)) else open(pdf, "rb")
+
+
+def pdf_size(pdf: PdfSource) -> int:
+    return len(pdf) if isinstance(pdf, (bytes, bytearray)) else os.path.getsize(pdf)
+
+
+MAX_IMAGE_DIMENSION = 4096  # OpenAI Vision works well up to 4096px
+
+# Image formats for rendered pages: PIL format name and save options
+# (quality applies to the lossy formats; PNG skips optimize=True, which
+# doubles the encode time for a few percent)
+IMAGE_FORMATS = {
+    "png": ("PNG", lambda quality: {"compress_level": 6}),
+    "jpeg": ("JPEG", lambda quality: {"quality": quality}),
+    "webp": ("WEBP", lambda quality: {"quality": quality, "method": 4}),
+}
+
+# Initialize encode pool lazily
+_encode_pool: Optional[ThreadPoolExecutor] = None
+_encode_pool_lock = threading.Lock()
+
+
+def get_encode_pool() -> ThreadPoolExecutor:
+    """Threads for page image encoding (PIL releases the GIL while compressing)."""
+    global _encode_pool
+    if _encode_pool is None:
+        with _encode_pool_lock:
+            if _encode_pool is None:
+                _encode_pool = ThreadPoolExecutor(max_workers=max(IMAGE_ENCODE_WORKERS, 1), thread_name_prefix="encode")
+    return _encode_pool
+
+
+def encode_image(image: Image.Image, fmt: str = "png", quality: int = 85) -> bytes:
+    """
+    Encode one page image.
+
+    Args:
+        image: RGB page image
+        fmt: Key of IMAGE_FORMATS (png, jpeg, webp)
+        quality: 1-100 for jpeg and webp
+
+    Returns:
+        Encoded image bytes
+    """
+    pil_format, options = IMAGE_FORMATS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, **options(quality))
+    return buffer.getvalue()
+
+
+def _page_dpi(reader: PdfReader, index: int, dpi: int, max_dimension: int) -> float:
+    """`dpi`, lowered so the page renders within max_dimension pixels (no full-size render and resize)."""
+    box = reader.pages[index].cropbox
+    longest_pt = max(float(box.width), float(box.height))
+    if longest_pt <= 0:
+        return dpi
+    # Stay a little under the limit; renderers round the pixel size up
+    return min(dpi, (max_dimension - 1) * 72 / longest_pt)
+
+
+def render_pdf_pages(
+    pdf: PdfSource,
+    dpi: int = 150,
+    pages: Optional[Sequence[int]] = None,
+    max_dimension: int = MAX_IMAGE_DIMENSION,
+) -> Iterator[Image.Image]:
+    """
+    Render PDF pages one at a time.
+
+    Each page is rendered on its own (a one-page range for pdf2image), at a
+    resolution that keeps it within `max_dimension`, so only the page being
+    handed out is held in memory.
+
+    Args:
+        pdf: Raw PDF file bytes or path
+        dpi: Resolution for conversion
+        pages: 0-based page indexes (default all)
+        max_dimension: Longest side in pixels
+
+    Yields:
+        One RGB image per page, in order
+    """
+    pdf_bytes = pdf if isinstance(pdf, (bytes, bytearray)) else Path(pdf).read_bytes()
+    rasterizer = get_rasterizer()
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    for index in (range(len(reader.pages)) if pages is None else pages):
+        page_dpi = _page_dpi(reader, index, dpi, max_dimension)
+        for image in rasterizer.render(pdf_bytes, page_dpi, pages=[index]):
+            if image.width > max_dimension or image.height > max_dimension:
+                ratio = min(max_dimension / image.width, max_dimension / image.height)
+                image = image.resize((int(image.width * ratio), int(image.height * ratio)), Image.Resampling.LANCZOS)
+            yield image
+
+
+def iter_pdf_images(
+    pdf: PdfSource,
+    dpi: int = 150,
+    fmt: str = "png",
+    quality: int = 85,
+    pages: Optional[Sequence[int]] = None,
+    max_dimension: int = MAX_IMAGE_DIMENSION,
+    workers: int = IMAGE_ENCODE_WORKERS,
+) -> Iterator[bytes]:
+    """
+    Convert PDF pages to encoded images, yielding them one by one.
+
+    Pages are rendered in the calling thread while up to `workers` earlier
+    pages are encoded on the encode pool, so at most workers + 1 page images
+    are alive at a time, whatever the document length.
+
+    Args:
+        pdf: Raw PDF file bytes or path
+        dpi: Resolution for conversion (150 is sufficient for text extraction with Vision API)
+        fmt: png, jpeg or webp
+        quality: 1-100 for jpeg and webp
+        pages: 0-based page indexes (default all)
+        max_dimension: Longest side in pixels
+        workers: Pages encoded concurrently (0 encodes in the calling thread)
+
+    Yields:
+        Encoded image bytes, one per page, in order
+    """
+    if fmt not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {fmt}")
+    images = render_pdf_pages(pdf, dpi, pages, max_dimension)
+    if workers <= 0:
+        for image in images:
+            yield encode_image(image, fmt, quality)
+        return
+
+    pool = get_encode_pool()
+    pending: Deque[Future] = deque()
+    try:
+        for image in images:
+            pending.append(pool.submit(encode_image, image, fmt, quality))
+            del image
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Consumer stopped early: drop what has not started
+        for future in pending:
+            future.cancel()
+
 
-def convert_pdf_to_images(pdf_bytes: bytes, dpi: int = 150) -> List[bytes]:
+def convert_pdf_to_images(pdf_bytes: bytes, dpi: int = 150, fmt: str = "png", quality: int = 85) -> List[bytes]:
     """
-    Convert PDF pages to PNG images.
-    
+    Convert PDF pages to images.
+
     Args:
         pdf_bytes: Raw PDF file bytes
         dpi: Resolution for conversion (default 150 - good balance for OCR/Vision)
              Lower DPI = smaller images = faster processing
              150 DPI is sufficient for text extraction with Vision API
-    
+        fmt: png, jpeg or webp
+        quality: 1-100 for jpeg and webp
+
+    Returns:
+        List of encoded image bytes, one per page (prefer iter_pdf_images()
+        for long documents)
+    """
+    return list(iter_pdf_images(pdf_bytes, dpi, fmt, quality))
+
+
+def get_page_count(pdf: PdfSource) -> int:
+    """Return the number of pages in a PDF."""
+    with open_pdf(pdf) as f:
+        return len(PdfReader(f).pages)
+
+
+def page_ranges(page_count: int, pages_per_chunk: int, overlap: int = 1) -> List[Tuple[int, int]]:
+    """
+    Split pages into consecutive [start, end) ranges.
+
+    Args:
+        page_count: Total number of pages
+        pages_per_chunk: New pages per range
+        overlap: Pages repeated from the end of the previous range, so an item
+                 that continues onto the next page is seen whole at least once
+
+    Returns:
+        List of (start, end) page index tuples, 0-based, end exclusive
+    """
+    ranges = []
+    start = 0
+    while start < page_count:
+        end = min(start + pages_per_chunk, page_count)
+        ranges.append((max(start - overlap, 0), end))
+        start = end
+    return ranges
+
+
+def extract_pages(pdf: PdfSource, pages: Iterable[int]) -> bytes:
+    """
+    Build a new PDF containing only the given pages (0-based), in order.
+
+    Args:
+        pdf: Raw PDF file bytes or path
+        pages: Page indexes to keep
+
     Returns:
-        List of PNG image bytes, one per page
-    """
-    # Convert PDF to PIL Images
-    images = convert_from_bytes(pdf_bytes, dpi=dpi)
-    
-    # Convert each PIL Image to PNG bytes
-    result = []
-    for img in images:
-        # Optionally resize very large images
-        max_dimension = 4096  # OpenAI Vision works well up to 4096px
-        if img.width > max_dimension or img.height > max_dimension:
-            ratio = min(max_dimension / img.width, max_dimension / img.height)
-            new_size = (int(img.width * ratio), int(img.height * ratio))
-            img = img.resize(new_size, Image.Resampling.LANCZOS)
-        
+        PDF file as bytes
+    """
+    with open_pdf(pdf) as f:
+        reader = PdfReader(f)
+        writer = PdfWriter()
+        for index in pages:
+            writer.add_page(reader.pages[index])
+
         buffer = io.BytesIO()
-        img.save(buffer, format="PNG", optimize=True)
-        result.append(buffer.getvalue())
-    
-    return result
+        writer.write(buffer)
+    return buffer.getvalue()
+
+
+def merge_pdfs(parts: Iterable[bytes]) -> bytes:
+    """
+    Concatenate PDFs in order.
+
+    Args:
+        parts: Raw PDF file bytes, one per part
+
+    Returns:
+        PDF file as bytes
+    """
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(io.BytesIO(part)))
+    # Parts rendered separately repeat the same resources (ICC profile, fonts)
+    writer.compress_identical_objects()
+
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def split_pages(pdf: PdfSource) -> List[bytes]:
+    """
+    Split a PDF into single-page PDFs.
+
+    Args:
+        pdf: Raw PDF file bytes or path
+
+    Returns:
+        One PDF file as bytes per page, in order
+    """
+    pages = []
+    with open_pdf(pdf) as f:
+        reader = PdfReader(f)
+        for page in reader.pages:
+            writer = PdfWriter()
+            writer.add_page(page)
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            pages.append(buffer.getvalue())
+    return pages
@@ -2,18 +2,38 @@
 """
 Print PDF labels directly to Citizen CL-E321 thermal printer.
 Converts PDF pages to ZPL image format and sends via TCP.
+
+PDFs are printed through a three-stage pipeline: a render thread rasterizes
+page N+1 while an encode thread turns page N into ZPL and the spooler sends
+page N-1. The stages are connected by small bounded queues, so the printer
+starts on the first label right away and memory holds a few pages at most.
 """
 
-import socket
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, List, Optional
 
-import pdf2image
 from PIL import Image
 
+try:
+    from .rasterizer import get_rasterizer
+    from .spooler import PrinterError, PrintSpooler, get_session
+    from .zpl import COMPRESSIONS, Compression, encode_graphic_field
+except ImportError:  # run as a script: python print_to_citizen.py
+    from rasterizer import get_rasterizer
+    from spooler import PrinterError, PrintSpooler, get_session
+    from zpl import COMPRESSIONS, Compression, encode_graphic_field
+
 
-def image_to_zpl(image: Image.Image, label_width_mm: int = 100, label_height_mm: int = 100) -> str:
+def image_to_zpl(
+    image: Image.Image,
+    label_width_mm: int = 100,
+    label_height_mm: int = 100,
+    compression: Compression = "none"
+) -> str:
     """
     Convert PIL Image to ZPL format using ^GFA (Graphic Field ASCII).
     
@@ -21,37 +41,13 @@ def image_to_zpl(image: Image.Image, label_width_mm: int = 100, label_height_mm:
         image: PIL Image object
         label_width_mm: Label width in mm
         label_height_mm: Label height in mm
+        compression: Graphic payload form - "none" (plain hex), "acs" (ZPL ASCII
+                     compression) or "z64" (zlib + base64)
     
     Returns:
         ZPL string ready to send to printer
     """
-    # Convert to 1-bit black and white
-    img_bw = image.convert('1')
-    
-    # Get image dimensions
-    width, height = img_bw.size
-    
-    # ZPL requires width to be multiple of 8
-    bytes_per_row = (width + 7) // 8
-    
-    # Build graphic data
-    graphic_data = []
-    for y in range(height):
-        row_data = []
-        for x_byte in range(bytes_per_row):
-            byte_val = 0
-            for bit in range(8):
-                x = x_byte * 8 + bit
-                if x < width:
-                    pixel = img_bw.getpixel((x, y))
-                    # In ZPL, 1 = black, 0 = white (inverted from PIL)
-                    if pixel == 0:  # PIL: 0 = black
-                        byte_val |= (1 << (7 - bit))
-            row_data.append(f'{byte_val:02X}')
-        graphic_data.append(''.join(row_data))
-    
-    total_bytes = bytes_per_row * height
-    data_string = ''.join(graphic_data)
+    total_bytes, bytes_per_row, data_string = encode_graphic_field(image, compression)
     
     # Build ZPL command
     zpl = f'''
@@ -65,81 +61,244 @@ def image_to_zpl(image: Image.Image, label_width_mm: int = 100, label_height_mm:
     return zpl
 
 
+# Items buffered between two pipeline stages
+PIPELINE_DEPTH = 2
+
+_DONE = object()
+
+
+class _StageFailed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class PipelineStageError(Exception):
+    """A render or encode stage failed; the original error is its __cause__."""
+    def __init__(self, message: str, printed: int = 0):
+        super().__init__(message)
+        self.printed = printed
+
+
+def _run_stage(items: Iterator, output: "queue.Queue", stop: threading.Event, count: Callable[[], None]) -> None:
+    """Move items from a (lazy) source into a bounded queue until done or stopped."""
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                output.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for item in items:
+            if not put(item):
+                return
+            count()
+        put(_DONE)
+    except BaseException as e:
+        put(_StageFailed(e))
+
+
+def _drain(source: "queue.Queue", stop: threading.Event) -> Iterator:
+    """Items of a stage queue until the stage is done or stopped; raises PipelineStageError for a stage error."""
+    while True:
+        try:
+            item = source.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                return
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, _StageFailed):
+            if isinstance(item.error, PipelineStageError):
+                raise item.error
+            raise PipelineStageError(str(item.error)) from item.error
+        yield item
+
+
+class PipelineStats:
+    """Progress of the render, encode and print stages."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.rendered = 0
+        self.encoded = 0
+        self.printed = 0
+        self.start = time.perf_counter()
+        self.first_label: Optional[float] = None  # seconds until the first confirmed label
+
+    def readout(self) -> str:
+        elapsed = time.perf_counter() - self.start
+        rate = self.printed / elapsed if elapsed > 0 else 0.0
+        return (f"🖨️  Printed {self.printed}/{self.total} "
+                f"(rendered {self.rendered}, encoded {self.encoded}, {rate:.1f} labels/s)")
+
+
+def print_pages_pipelined(
+    spooler: PrintSpooler,
+    images: Iterator[Image.Image],
+    total: int,
+    compression: Compression = "none",
+    depth: int = PIPELINE_DEPTH,
+    on_progress: Optional[Callable[[PipelineStats], None]] = None,
+):
+    """
+    Render, encode and send labels concurrently.
+
+    The render and encode stages run in their own threads and hand over
+    through queues of `depth` items; the spooler sends from the calling
+    thread. If printing fails, both stages are stopped; if a stage fails,
+    the labels already sent are still drained before the error is raised.
+
+    Args:
+        spooler: Print spooler (batch_size 1 sends each label as soon as it is encoded)
+        images: Page images in print order (lazy, e.g. Rasterizer.render)
+        total: Number of pages, for the progress readout
+        compression: ZPL graphic compression
+        depth: Bounded queue size between stages
+        on_progress: Called with the stats whenever the printer confirms labels
+
+    Returns:
+        (SpoolResult, PipelineStats)
+
+    Raises:
+        PrinterError: As PrintSpooler.print_labels
+        PipelineStageError: Rendering or encoding failed; `printed` holds the
+                            number of labels confirmed before it
+    """
+    stats = PipelineStats(total)
+    stop = threading.Event()
+    rendered: "queue.Queue" = queue.Queue(maxsize=depth)
+    encoded: "queue.Queue" = queue.Queue(maxsize=depth)
+
+    def count_rendered() -> None:
+        stats.rendered += 1
+
+    def count_encoded() -> None:
+        stats.encoded += 1
+
+    zpl_labels = (image_to_zpl(image, compression=compression) for image in _drain(rendered, stop))
+    threads = [
+        threading.Thread(target=_run_stage, args=(images, rendered, stop, count_rendered), daemon=True),
+        threading.Thread(target=_run_stage, args=(zpl_labels, encoded, stop, count_encoded), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    def confirmed(count: int) -> None:
+        if stats.first_label is None:
+            stats.first_label = time.perf_counter() - stats.start
+        stats.printed = count
+        if on_progress:
+            on_progress(stats)
+
+    failed: List[PipelineStageError] = []
+
+    def labels() -> Iterator[str]:
+        # A failed stage ends the input here, not inside the spooler, so the
+        # labels already sent are drained and confirmed as usual
+        try:
+            yield from _drain(encoded, stop)
+        except PipelineStageError as e:
+            failed.append(e)
+
+    try:
+        result = spooler.print_labels(labels(), on_progress=confirmed)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if failed:
+        failed[0].printed = stats.printed
+        raise failed[0]
+    return result, stats
+
+
 def print_pdf_to_citizen(
     pdf_path: str,
     printer_ip: str = "192.168.48.67",
     printer_port: int = 9100,
     dpi: int = 203,  # Citizen CL-E321 is 203 DPI
-    page_index: Optional[int] = None
+    page_index: Optional[int] = None,
+    compression: Compression = "none",
+    use_status: bool = True,
+    depth: int = PIPELINE_DEPTH,
 ) -> int:
     """
     Print a PDF file to Citizen thermal printer.
-    
+
+    Pages are rasterized, encoded and sent in a pipeline
+    (see print_pages_pipelined), so printing starts with the first page.
+
     Args:
         pdf_path: Path to PDF file
         printer_ip: Printer IP address
         printer_port: Printer port (default 9100)
         dpi: Printer DPI (203 for CL-E321)
         page_index: Specific page to print (0-based), None for all pages
-    
+        compression: ZPL graphic compression ("none", "acs" or "z64")
+        use_status: Pace sends and confirm printed labels with ~HS
+        depth: Pages buffered between pipeline stages
+
     Returns:
-        Number of pages printed
+        Number of pages printed (confirmed by the printer)
     """
     pdf_path = Path(pdf_path)
     if not pdf_path.exists():
         raise FileNotFoundError(f"PDF not found: {pdf_path}")
-    
+
     print(f"📄 Loading PDF: {pdf_path}")
-    
-    # Convert PDF to images at printer DPI
+
     # 100mm at 203 DPI = 800 pixels
     target_size = int(100 * dpi / 25.4)
-    
-    images = pdf2image.convert_from_path(
-        str(pdf_path),
-        dpi=dpi,
-        size=(target_size, target_size)
-    )
-    
-    print(f"📊 Found {len(images)} page(s)")
-    
+
+    # Label PDFs are small; the rasterizer renders from bytes, one page at a time
+    pdf_bytes = pdf_path.read_bytes()
+    rasterizer = get_rasterizer()
+    page_count = rasterizer.page_count(pdf_bytes)
+    print(f"📊 Found {page_count} page(s)")
+
+    pages: List[int] = list(range(page_count))
     # Filter to specific page if requested
     if page_index is not None:
-        if page_index >= len(images):
-            raise ValueError(f"Page {page_index} not found (PDF has {len(images)} pages)")
-        images = [images[page_index]]
+        if page_index >= page_count:
+            raise ValueError(f"Page {page_index} not found (PDF has {page_count} pages)")
+        pages = [page_index]
         print(f"🎯 Printing only page {page_index + 1}")
-    
-    # Connect to printer
+
+    # Stream all pages over one connection
     print(f"🔌 Connecting to {printer_ip}:{printer_port}...")
-    
-    printed = 0
-    for i, img in enumerate(images):
-        print(f"🖨️  Printing page {i + 1}/{len(images)}...")
-        
-        # Convert to ZPL
-        zpl = image_to_zpl(img)
-        
-        # Send to printer
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(10)
-                sock.connect((printer_ip, printer_port))
-                sock.sendall(zpl.encode('utf-8'))
-                printed += 1
-        except socket.error as e:
-            print(f"❌ Error printing page {i + 1}: {e}")
-            continue
-    
-    print(f"✅ Done! Printed {printed} page(s)")
-    return printed
+
+    total = len(pages)
+    spooler = PrintSpooler(get_session(printer_ip, printer_port), batch_size=1, use_status=use_status)
+    images = rasterizer.render(pdf_bytes, dpi, (target_size, target_size), pages)
+
+    def on_progress(stats: PipelineStats) -> None:
+        print(stats.readout())
+
+    try:
+        result, stats = print_pages_pipelined(spooler, images, total, compression, depth, on_progress)
+    except PrinterError as e:
+        print(f"❌ Printing stopped after {e.confirmed}/{total} page(s): {e}")
+        return e.confirmed
+    except PipelineStageError as e:
+        print(f"❌ Printing stopped after {e.printed}/{total} page(s), rendering failed: {e}")
+        return e.printed
+
+    print(f"✅ Done! Printed {result.labels} page(s) in {result.seconds:.1f}s "
+          f"({result.labels_per_second:.1f} labels/s, first label after {stats.first_label or 0:.1f}s)")
+    return result.labels
 
 
 def print_image_to_citizen(
     image_path: str,
     printer_ip: str = "192.168.48.67",
     printer_port: int = 9100,
-    dpi: int = 203
+    dpi: int = 203,
+    compression: Compression = "none",
+    use_status: bool = True
 ) -> bool:
     """
     Print a PNG/JPG image to Citizen thermal printer.
@@ -149,6 +308,8 @@ def print_image_to_citizen(
         printer_ip: Printer IP address
         printer_port: Printer port
         dpi: Printer DPI
+        compression: ZPL graphic compression ("none", "acs" or "z64")
+        use_status: Confirm the label with ~HS
     
     Returns:
         True if successful
@@ -167,19 +328,17 @@ def print_image_to_citizen(
     print(f"📐 Resized to {target_size}x{target_size} pixels")
     
     # Convert to ZPL
-    zpl = image_to_zpl(img)
+    zpl = image_to_zpl(img, compression=compression)
     
     # Send to printer
     print(f"🔌 Sending to {printer_ip}:{printer_port}...")
     
+    spooler = PrintSpooler(get_session(printer_ip, printer_port), use_status=use_status)
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.settimeout(10)
-            sock.connect((printer_ip, printer_port))
-            sock.sendall(zpl.encode('utf-8'))
+        spooler.print_labels([zpl])
         print("✅ Done!")
         return True
-    except socket.error as e:
+    except PrinterError as e:
         print(f"❌ Error: {e}")
         return False
 
@@ -194,6 +353,8 @@ if __name__ == "__main__":
         print("Options:")
         print("  PRINTER_IP=192.168.48.67  (default)")
         print("  PRINTER_PORT=9100         (default)")
+        print("  ZPL_COMPRESSION=none      (none | acs | z64)")
+        print("  PRINTER_STATUS=1          (0 = don't query ~HS)")
         sys.exit(1)
     
     import os
@@ -202,13 +363,20 @@ if __name__ == "__main__":
     
     printer_ip = os.environ.get("PRINTER_IP", "192.168.48.67")
     printer_port = int(os.environ.get("PRINTER_PORT", "9100"))
+    compression = os.environ.get("ZPL_COMPRESSION", "none")
+    if compression not in COMPRESSIONS:
+        print(f"❌ Unsupported ZPL_COMPRESSION: {compression}")
+        sys.exit(1)
+    use_status = os.environ.get("PRINTER_STATUS", "1") != "0"
     
     ext = Path(file_path).suffix.lower()
     
     if ext == '.pdf':
-        print_pdf_to_citizen(file_path, printer_ip, printer_port, page_index=page_idx)
+        print_pdf_to_citizen(file_path, printer_ip, printer_port, page_index=page_idx,
+                             compression=compression, use_status=use_status)
     elif ext in ('.png', '.jpg', '.jpeg'):
-        print_image_to_citizen(file_path, printer_ip, printer_port)
+        print_image_to_citizen(file_path, printer_ip, printer_port,
+                               compression=compression, use_status=use_status)
     else:
         print(f"❌ Unsupported file type: {ext}")
         sys.exit(1)
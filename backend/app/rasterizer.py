@@ -0,0 +1,117 @@
+"""
+PDF → PIL image rasterization backends.
+
+- "pdfium":    in-process rendering with pypdfium2, straight from the PDF bytes
+               in memory (no subprocess, no temporary files)
+- "pdf2image": the original path, pdftoppm (poppler) in a subprocess
+
+The backend is selected with the RASTERIZER environment variable; "pdfium" is
+used by default when pypdfium2 is installed.
+"""
+
+import threading
+from typing import Iterator, Optional, Protocol, Sequence, Tuple
+
+import pdf2image
+from PIL import Image
+
+try:
+    from .config import RASTERIZER
+except ImportError:  # run as a script from app/ (print_to_citizen.py)
+    from config import RASTERIZER
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # optional dependency
+    pdfium = None
+
+# pdfium is not thread-safe; serialize access to the library
+_pdfium_lock = threading.Lock()
+
+
+class Rasterizer(Protocol):
+    name: str
+
+    def page_count(self, pdf_bytes: bytes) -> int:
+        """Number of pages in the PDF."""
+        ...
+
+    def render(
+        self,
+        pdf_bytes: bytes,
+        dpi: int,
+        size: Optional[Tuple[int, int]] = None,
+        pages: Optional[Sequence[int]] = None,
+    ) -> Iterator[Image.Image]:
+        """Yield one RGB image per page (0-based `pages`, default all), optionally resized to `size`."""
+        ...
+
+
+class Pdf2ImageRasterizer:
+    name = "pdf2image"
+
+    def page_count(self, pdf_bytes):
+        return int(pdf2image.pdfinfo_from_bytes(pdf_bytes)["Pages"])
+
+    def render(self, pdf_bytes, dpi, size=None, pages=None):
+        if pages is None:
+            yield from pdf2image.convert_from_bytes(pdf_bytes, dpi=dpi, fmt='png', size=size)
+            return
+        for index in pages:
+            yield from pdf2image.convert_from_bytes(
+                pdf_bytes, dpi=dpi, fmt='png', size=size,
+                first_page=index + 1, last_page=index + 1,
+            )
+
+
+class PdfiumRasterizer:
+    name = "pdfium"
+
+    def page_count(self, pdf_bytes):
+        with _pdfium_lock:
+            document = pdfium.PdfDocument(pdf_bytes)
+            try:
+                return len(document)
+            finally:
+                document.close()
+
+    def render(self, pdf_bytes, dpi, size=None, pages=None):
+        scale = dpi / 72
+        with _pdfium_lock:
+            document = pdfium.PdfDocument(pdf_bytes)
+            page_count = len(document)
+        try:
+            for index in (range(page_count) if pages is None else pages):
+                with _pdfium_lock:
+                    page = document[index]
+                    bitmap = page.render(scale=scale, rev_byteorder=True)
+                    image = bitmap.to_pil()
+                    page.close()
+                if image.mode != 'RGB':
+                    image = image.convert('RGB')
+                if size is not None and image.size != tuple(size):
+                    image = image.resize(size, Image.Resampling.LANCZOS)
+                yield image
+        finally:
+            with _pdfium_lock:
+                document.close()
+
+
+RASTERIZERS = {
+    Pdf2ImageRasterizer.name: Pdf2ImageRasterizer,
+    PdfiumRasterizer.name: PdfiumRasterizer,
+}
+
+
+def get_rasterizer(name: Optional[str] = None) -> Rasterizer:
+    """
+    Return a rasterizer by name, or the configured default.
+
+    Falls back to pdf2image when pypdfium2 is not installed.
+    """
+    name = name or RASTERIZER or ("pdfium" if pdfium is not None else "pdf2image")
+    if name not in RASTERIZERS:
+        raise ValueError(f"Unknown rasterizer: {name}")
+    if name == "pdfium" and pdfium is None:
+        raise ValueError("pypdfium2 is not installed")
+    return RASTERIZERS[name]()
@@ -0,0 +1,307 @@
+"""
+OpenAI admission control shared by all uvicorn workers.
+
+A token bucket for requests per minute and one for tokens per minute live in
+a small SQLite file (like the extraction cache, no external service). Callers
+take a ticket and are admitted strictly in ticket order across workers, so a
+burst queues up instead of colliding on the API. A 429 pauses the bucket for
+the Retry-After, which holds back every caller, not just the one that was
+rejected.
+
+Token costs are estimated from the PDF size before the call and corrected
+with the reported usage afterwards (settle()); an attempt that fails gets its
+tokens back (refund()).
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from typing import Optional, Tuple
+
+from . import metrics
+from .config import OPENAI_RPM, OPENAI_TPM, RATE_LIMIT_DB
+
+logger = logging.getLogger(__name__)
+
+# OpenAI enforces per-minute limits over short windows (e.g. 600 RPM as 10 per
+# second), so requests are paced evenly rather than let through in bursts,
+# slightly below the budget. Tokens come in large lumps per request and may
+# burst up to this many seconds' worth.
+HEADROOM = 0.95
+TOKEN_BURST_SECONDS = 10.0
+# Longest sleep between checks, so pauses and queue moves are noticed quickly
+MAX_POLL = 1.0
+# A ticket not checked for this long belongs to a dead caller and is dropped
+STALE_AFTER = 15.0
+
+# Request cost estimate: prompt and schema + PDF content + answer
+PROMPT_TOKENS = 2500
+TOKENS_PER_PDF_KB = 20
+EXPECTED_OUTPUT_TOKENS = 4000
+
+
+def estimate_tokens(pdf_size: int) -> int:
+    """Tokens one extraction request is expected to use, from the PDF size in bytes."""
+    return PROMPT_TOKENS + (pdf_size // 1024) * TOKENS_PER_PDF_KB + EXPECTED_OUTPUT_TOKENS
+
+
+class SharedRateLimiter:
+    """
+    Fair requests/tokens-per-minute limiter stored in SQLite.
+
+    Args:
+        path: SQLite file shared by the workers
+        rpm: Requests per minute
+        tpm: Tokens per minute
+    """
+
+    def __init__(self, path: str, rpm: int, tpm: int):
+        self.path = path
+        self.request_rate = rpm * HEADROOM / 60.0
+        self.token_rate = tpm * HEADROOM / 60.0
+        self.request_capacity = 1.0
+        self.token_capacity = self.token_rate * TOKEN_BURST_SECONDS
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS bucket ("
+                " id INTEGER PRIMARY KEY CHECK (id = 0), requests REAL NOT NULL, tokens REAL NOT NULL,"
+                " updated REAL NOT NULL, paused_until REAL NOT NULL)"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS waiters (ticket INTEGER PRIMARY KEY AUTOINCREMENT, seen REAL NOT NULL)")
+            db.execute(
+                "INSERT OR IGNORE INTO bucket (id, requests, tokens, updated, paused_until) VALUES (0, ?, ?, ?, 0)",
+                (self.request_capacity, self.token_capacity, time.time()),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; every operation opens its own BEGIN IMMEDIATE
+        db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _transaction(self, db: sqlite3.Connection, now: float):
+        """Lock the bucket and refill it up to `now`; returns (requests, tokens, paused_until)."""
+        db.execute("BEGIN IMMEDIATE")
+        requests, tokens, updated, paused_until = db.execute(
+            "SELECT requests, tokens, updated, paused_until FROM bucket WHERE id = 0"
+        ).fetchone()
+        # Nothing accrues while paused, so a pause is not followed by a burst
+        elapsed = max(now - max(updated, paused_until), 0.0)
+        requests = min(requests + elapsed * self.request_rate, self.request_capacity)
+        tokens = min(tokens + elapsed * self.token_rate, self.token_capacity)
+        return requests, tokens, paused_until
+
+    def charge(self, cost: float) -> float:
+        """Tokens taken from the budget when a request of `cost` is admitted (at most a full bucket)."""
+        return min(cost, self.token_capacity)
+
+    def enqueue(self) -> int:
+        """Take a ticket; callers are admitted in ticket order."""
+        with self._connect() as db:
+            return db.execute("INSERT INTO waiters (seen) VALUES (?)", (time.time(),)).lastrowid
+
+    def leave(self, ticket: int) -> None:
+        """Give up a ticket that was not admitted (cancelled caller)."""
+        with self._connect() as db:
+            db.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+
+    def try_acquire(self, ticket: int, cost: float) -> float:
+        """
+        Admit the ticket if the budget allows it and every earlier ticket.
+
+        Returns:
+            0 when admitted (the ticket is consumed), otherwise seconds to
+            wait before asking again
+        """
+        now = time.time()
+        db = self._connect()
+        try:
+            requests, tokens, paused_until = self._transaction(db, now)
+            db.execute("DELETE FROM waiters WHERE seen < ?", (now - STALE_AFTER,))
+            db.execute("UPDATE waiters SET seen = ? WHERE ticket = ?", (now, ticket))
+            ahead = db.execute("SELECT COUNT(*) FROM waiters WHERE ticket < ?", (ticket,)).fetchone()[0]
+
+            if now < paused_until:
+                wait = paused_until - now
+            else:
+                # Admitted once the budget covers everyone ahead as well (assuming
+                # similar costs), so later tickets never take a slot from earlier ones.
+                # A request larger than the burst budget waits for a full bucket.
+                needed_requests = ahead + 1.0
+                needed_tokens = cost * (ahead + 1) if ahead else self.charge(cost)
+                wait = max(
+                    (needed_requests - requests) / self.request_rate if self.request_rate else 0.0,
+                    (needed_tokens - tokens) / self.token_rate if self.token_rate else 0.0,
+                    0.0,
+                )
+                if wait == 0.0:
+                    requests -= 1.0
+                    tokens -= self.charge(cost)
+                    db.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+
+            db.execute(
+                "UPDATE bucket SET requests = ?, tokens = ?, updated = ? WHERE id = 0",
+                (requests, tokens, now),
+            )
+            db.execute("COMMIT")
+            return wait
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def acquire(self, cost: float) -> Tuple[float, float]:
+        """
+        Block until admitted.
+
+        Returns:
+            (seconds spent waiting, tokens charged)
+        """
+        start = time.monotonic()
+        ticket = self.enqueue()
+        try:
+            while True:
+                wait = self.try_acquire(ticket, cost)
+                if wait == 0.0:
+                    ticket = None
+                    return time.monotonic() - start, self.charge(cost)
+                time.sleep(min(wait, MAX_POLL))
+        finally:
+            if ticket is not None:
+                self.leave(ticket)
+
+    async def acquire_async(self, cost: float) -> Tuple[float, float]:
+        """Async variant of acquire(); the SQLite work runs in a thread."""
+        start = time.monotonic()
+        ticket = await asyncio.to_thread(self.enqueue)
+        try:
+            while True:
+                wait = await asyncio.to_thread(self.try_acquire, ticket, cost)
+                if wait == 0.0:
+                    ticket = None
+                    return time.monotonic() - start, self.charge(cost)
+                await asyncio.sleep(min(wait, MAX_POLL))
+        finally:
+            if ticket is not None:
+                self.leave(ticket)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds` (Retry-After of a 429) and empty the request bucket."""
+        now = time.time()
+        db = self._connect()
+        try:
+            _, tokens, _ = self._transaction(db, now)
+            db.execute(
+                "UPDATE bucket SET requests = 0, tokens = ?, updated = ?, paused_until = MAX(paused_until, ?) WHERE id = 0",
+                (tokens, now, now + seconds),
+            )
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def settle(self, charged: float, actual: float) -> None:
+        """Return (or charge) the difference between the charged and the reported token usage."""
+        now = time.time()
+        db = self._connect()
+        try:
+            requests, tokens, _ = self._transaction(db, now)
+            tokens = min(tokens + charged - actual, self.token_capacity)
+            db.execute(
+                "UPDATE bucket SET requests = ?, tokens = ?, updated = ? WHERE id = 0",
+                (requests, tokens, now),
+            )
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+
+# Initialize limiter lazily
+_limiter: Optional[SharedRateLimiter] = None
+_limiter_failed = False
+
+
+def get_rate_limiter() -> Optional[SharedRateLimiter]:
+    """The shared limiter, or None when disabled (OPENAI_RPM=0) or the database is unusable."""
+    global _limiter, _limiter_failed
+    if _limiter is None and not _limiter_failed and OPENAI_RPM > 0:
+        try:
+            _limiter = SharedRateLimiter(RATE_LIMIT_DB, OPENAI_RPM, OPENAI_TPM)
+        except (OSError, sqlite3.Error):
+            logger.exception("Ograničavanje OpenAI zahtjeva nije dostupno (%s)", RATE_LIMIT_DB)
+            _limiter_failed = True
+    return _limiter
+
+
+# The limiter fails open: if the database is unusable, calls go through unthrottled
+
+def admit(cost: float) -> float:
+    """
+    Wait for the shared budget before one OpenAI call attempt.
+
+    Returns:
+        Tokens charged, to be passed to settle() or refund() once the attempt
+        is over (0 when the limiter is disabled or unusable)
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return 0.0
+    try:
+        waited, charged = limiter.acquire(cost)
+    except sqlite3.Error:
+        logger.warning("Greška baze za ograničavanje zahtjeva, nastavljam bez čekanja", exc_info=True)
+        return 0.0
+    metrics.observe("rate_limit_wait", waited)
+    return charged
+
+
+async def admit_async(cost: float) -> float:
+    """Async variant of admit()."""
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return 0.0
+    try:
+        waited, charged = await limiter.acquire_async(cost)
+    except sqlite3.Error:
+        logger.warning("Greška baze za ograničavanje zahtjeva, nastavljam bez čekanja", exc_info=True)
+        return 0.0
+    metrics.observe("rate_limit_wait", waited)
+    return charged
+
+
+def pause_all(seconds: float) -> bool:
+    """
+    Pause every caller after a 429.
+
+    Returns:
+        True when the pause is shared (the next admit() waits it out), False
+        when the caller has to sleep itself
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return False
+    try:
+        limiter.pause(seconds)
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def settle(charged: float, actual: Optional[int]) -> None:
+    """Correct the tokens charged by admit() with the usage reported by the API."""
+    limiter = get_rate_limiter()
+    if limiter is None or actual is None or not charged:
+        return
+    try:
+        limiter.settle(charged, actual)
+    except sqlite3.Error:
+        pass
+
+
+def refund(charged: float) -> None:
+    """Give back the tokens charged by admit() for an attempt that failed."""
+    settle(charged, 0)
@@ -0,0 +1,310 @@
+"""
+Persistent print spooler for the Citizen CL-E321 (ZPL over raw TCP port 9100).
+
+One connection is kept per printer and labels are streamed as consecutive
+^XA...^XZ blocks. Between batches the printer is asked for its host status
+(~HS) so we never have more than `max_in_flight` labels queued in its buffer,
+and so we know which labels it has actually taken. A format still sitting in
+the printer's raw receive buffer is not in the ~HS counts yet, so a label is
+only confirmed once a later ~HS has had the chance to count it. If the
+connection drops, the spooler reconnects and resends everything after the
+last confirmed label (at-least-once: a label in flight during the failure may
+print twice).
+"""
+
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple
+
+STX = b"\x02"
+ETX = b"\x03"
+HOST_STATUS = b"~HS"
+
+
+class PrinterError(Exception):
+    """Printer is unreachable or reports an error state."""
+    def __init__(self, message: str, confirmed: int = 0):
+        super().__init__(message)
+        self.confirmed = confirmed
+
+
+@dataclass
+class PrinterStatus:
+    """Parsed ~HS (host status) response."""
+    paper_out: bool
+    paused: bool
+    buffer_full: bool
+    formats_in_buffer: int
+    head_up: bool
+    labels_remaining: int
+
+    @property
+    def labels_in_printer(self) -> int:
+        """Labels received but not yet printed."""
+        return self.formats_in_buffer + self.labels_remaining
+
+    @property
+    def error(self) -> Optional[str]:
+        if self.paper_out:
+            return "paper out"
+        if self.head_up:
+            return "head open"
+        return None
+
+
+def parse_host_status(raw: bytes) -> PrinterStatus:
+    """
+    Parse the three STX...ETX strings returned by ~HS.
+
+    String 1: aaa,b,c,dddd,eee,f,...  (b = paper out, c = pause, eee = formats in buffer, f = buffer full)
+    String 2: mmm,n,o,p,q,r,s,t,uuuuuuuu,...  (o = head up, uuuuuuuu = labels remaining in batch)
+    """
+    strings = []
+    for chunk in raw.split(STX)[1:]:
+        strings.append(chunk.split(ETX, 1)[0].decode("ascii", "replace").split(","))
+    if len(strings) < 2 or len(strings[0]) < 6 or len(strings[1]) < 9:
+        raise ValueError(f"Invalid ~HS response: {raw!r}")
+
+    first, second = strings[0], strings[1]
+    return PrinterStatus(
+        paper_out=first[1].strip() == "1",
+        paused=first[2].strip() == "1",
+        buffer_full=first[5].strip() == "1",
+        formats_in_buffer=int(first[4]),
+        head_up=second[2].strip() == "1",
+        labels_remaining=int(second[8]),
+    )
+
+
+class PrinterSession:
+    """A single persistent TCP connection to one printer."""
+
+    def __init__(self, host: str, port: int = 9100, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def connect(self) -> None:
+        if self._sock is None:
+            self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+    def send(self, data: bytes) -> None:
+        self.connect()
+        try:
+            self._sock.sendall(data)
+        except OSError:
+            self.close()
+            raise
+
+    def query_status(self) -> PrinterStatus:
+        """Send ~HS and read the three-line response."""
+        self.send(HOST_STATUS)
+        buffer = b""
+        try:
+            while buffer.count(ETX) < 3:
+                chunk = self._sock.recv(1024)
+                if not chunk:
+                    raise ConnectionError("Printer closed the connection")
+                buffer += chunk
+        except OSError:
+            self.close()
+            raise
+        return parse_host_status(buffer)
+
+    def __enter__(self) -> "PrinterSession":
+        self.connect()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# One session per printer, reused across jobs
+_sessions: Dict[Tuple[str, int], PrinterSession] = {}
+
+
+def get_session(host: str, port: int = 9100) -> PrinterSession:
+    key = (host, port)
+    if key not in _sessions:
+        _sessions[key] = PrinterSession(host, port)
+    return _sessions[key]
+
+
+@dataclass
+class SpoolResult:
+    labels: int
+    seconds: float
+    reconnects: int
+
+    @property
+    def labels_per_second(self) -> float:
+        return self.labels / self.seconds if self.seconds > 0 else float("inf")
+
+
+class PrintSpooler:
+    """
+    Stream ZPL labels to one printer over a persistent session.
+
+    Args:
+        session: Printer session (see get_session)
+        batch_size: Labels written per sendall()
+        max_in_flight: Maximum labels sent but not yet printed
+        use_status: Pace and confirm with ~HS; if False, a label counts as
+                    confirmed once it has been written to the socket
+        max_retries: Reconnect attempts in a row without a newly confirmed
+                     label before giving up
+        poll_interval: Seconds between ~HS polls while the printer buffer is full
+    """
+
+    def __init__(
+        self,
+        session: PrinterSession,
+        batch_size: int = 10,
+        max_in_flight: int = 30,
+        use_status: bool = True,
+        max_retries: int = 3,
+        poll_interval: float = 0.2,
+        drain_timeout: float = 300.0,
+    ):
+        self.session = session
+        self.batch_size = batch_size
+        self.max_in_flight = max(max_in_flight, batch_size)
+        self.use_status = use_status
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+        self.drain_timeout = drain_timeout
+
+    def print_labels(
+        self,
+        labels: Iterable[str],
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> SpoolResult:
+        """
+        Send labels in order and wait until the printer has taken all of them.
+
+        Args:
+            labels: ZPL strings, one ^XA...^XZ block each (may be a generator)
+            on_progress: Called with the number of confirmed labels
+
+        Returns:
+            SpoolResult with label count, elapsed time and reconnect count
+
+        Raises:
+            PrinterError: Printer unreachable or in an error state after retries;
+                          `confirmed` holds the number of labels known to be printed
+        """
+        start = time.perf_counter()
+        source = iter(labels)
+        pending: Deque[bytes] = deque()  # sent, not yet confirmed
+        resend: Deque[bytes] = deque()   # to be sent again after a reconnect
+        confirmed = 0
+        reconnects = 0
+        # Reconnects since a label was last confirmed, and the count at the last one
+        failures = 0
+        confirmed_at_failure = 0
+        exhausted = False
+        # Labels sent after the last ~HS: the printer may not have parsed them
+        # when it answered, so its counts say nothing about them yet
+        unparsed = 0
+
+        def confirm(count: int) -> None:
+            nonlocal confirmed
+            for _ in range(min(count, len(pending))):
+                pending.popleft()
+            confirmed += count
+            if on_progress and count:
+                on_progress(confirmed)
+
+        def sync_status() -> PrinterStatus:
+            nonlocal unparsed
+            status = self.session.query_status()
+            if status.error:
+                raise PrinterError(f"Printer {self.session.host}: {status.error}", confirmed)
+            # Whatever the printer holds, or may not have parsed yet, is not printed
+            confirm(max(len(pending) - status.labels_in_printer - unparsed, 0))
+            unparsed = 0
+            return status
+
+        while True:
+            try:
+                # Pace against the printer buffer
+                while self.use_status and len(pending) + self.batch_size > self.max_in_flight:
+                    sync_status()
+                    if len(pending) + self.batch_size > self.max_in_flight:
+                        time.sleep(self.poll_interval)
+
+                batch = []
+                while len(batch) < self.batch_size:
+                    if resend:
+                        batch.append(resend.popleft())
+                        continue
+                    label = next(source, None)
+                    if label is None:
+                        exhausted = True
+                        break
+                    batch.append(label.encode("utf-8"))
+
+                if batch:
+                    pending.extend(batch)
+                    unparsed += len(batch)
+                    self.session.send(b"".join(batch))
+                    if not self.use_status:
+                        confirm(len(batch))
+
+                if exhausted and not resend:
+                    self._drain(sync_status, pending, lambda: confirmed)
+                    break
+
+            except PrinterError:
+                raise
+            except (OSError, ValueError) as e:
+                self.session.close()
+                reconnects += 1
+                # Progress since the last reconnect means the printer came back
+                failures = failures + 1 if confirmed == confirmed_at_failure else 1
+                confirmed_at_failure = confirmed
+                if failures > self.max_retries:
+                    raise PrinterError(
+                        f"Printer {self.session.host}:{self.session.port} unreachable: {e}", confirmed
+                    ) from e
+                # Everything not confirmed goes out again, in order
+                resend.extendleft(reversed(pending))
+                pending.clear()
+                unparsed = 0
+                time.sleep(min(2 ** (failures - 1), 5))
+
+        return SpoolResult(confirmed, time.perf_counter() - start, reconnects)
+
+    def _drain(
+        self,
+        sync_status: Callable[[], PrinterStatus],
+        pending: Deque[bytes],
+        confirmed: Callable[[], int],
+    ) -> None:
+        if not self.use_status:
+            return
+        deadline = time.monotonic() + self.drain_timeout
+        while pending:
+            sync_status()
+            if not pending:
+                break
+            if time.monotonic() > deadline:
+                raise PrinterError(
+                    f"Printer {self.session.host} still has {len(pending)} label(s) queued", confirmed()
+                )
+            time.sleep(self.poll_interval)
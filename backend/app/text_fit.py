@@ -0,0 +1,162 @@
+"""
+Font-metric text fitting for the single-line label cells.
+
+The text width is the sum of the glyph advances of the font WeasyPrint
+actually uses for the labels (LABEL_CSS: bold Arial/Helvetica/sans-serif,
+resolved by fontconfig, or LABEL_FONT_PATH). Width scales linearly with the
+font size, so the fitted size follows from one measurement at 1 pt.
+
+Advance tables are read once per process with fontTools; fitted sizes are
+memoized per (text, field). Without fontTools or a usable font file the
+character-count heuristic of calculate_font_size() is used instead.
+"""
+
+import logging
+import math
+import shutil
+import subprocess
+import threading
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+from .config import LABEL_FONT_PATH
+
+try:
+    from fontTools.ttLib import TTFont
+except ImportError:  # optional dependency (installed with WeasyPrint)
+    TTFont = None
+
+logger = logging.getLogger(__name__)
+
+MM_PER_PT = 25.4 / 72
+
+# Geometry in mm, mirroring LABEL_CSS (100 x 100 mm, 4 mm padding)
+CONTENT_MM = 100.0 - 2 * 4.0
+# The 18/36/14/14 mm colgroup stretched to the 92 mm table width
+COLUMN_MM = [w * CONTENT_MM / 82.0 for w in (18.0, 36.0, 14.0, 14.0)]
+# .value-cell padding (2 mm each side) plus the collapsed borders
+CELL_INSET_MM = 2 * 2.0 + 0.4
+# Kerning and hinting are ignored; keep a little slack so text never clips
+SAFETY = 0.97
+
+
+class Cell(NamedTuple):
+    width_mm: float   # usable text width
+    base_pt: float    # size from LABEL_CSS
+    min_pt: float     # never shrink below this
+    max_chars: int    # fallback heuristic: characters that fit at base_pt
+
+
+_MEDIUM_MM = COLUMN_MM[1] - CELL_INSET_MM
+_SMALL_MM = COLUMN_MM[3] - CELL_INSET_MM
+_WIDE_MM = sum(COLUMN_MM[1:]) - CELL_INSET_MM
+
+FIELDS: Dict[str, Cell] = {
+    "novi_broj_dijela": Cell(_MEDIUM_MM, 9.0, 5.0, 22),
+    "stari_broj_dijela": Cell(_SMALL_MM, 7.0, 4.5, 8),
+    "kolicina": Cell(_WIDE_MM, 9.0, 6.0, 45),
+    "narudzba": Cell(_MEDIUM_MM, 9.0, 5.0, 22),
+    "account_category": Cell(_SMALL_MM, 7.0, 4.5, 8),
+    "naziv_objekta": Cell(_WIDE_MM, 9.0, 5.0, 45),
+    "wbs": Cell(_WIDE_MM, 9.0, 5.0, 45),
+    "datum": Cell(_MEDIUM_MM, 9.0, 6.0, 20),
+}
+
+
+class GlyphAdvances:
+    """
+    Horizontal advances of one font, in em units, keyed by character.
+
+    Args:
+        path: TrueType/OpenType font file
+    """
+
+    def __init__(self, path: str):
+        font = TTFont(path, lazy=True)
+        try:
+            units = font["head"].unitsPerEm
+            metrics = font["hmtx"].metrics
+            self.advances: Dict[str, float] = {
+                chr(codepoint): metrics[glyph][0] / units
+                for codepoint, glyph in font.getBestCmap().items()
+                if glyph in metrics
+            }
+            # Missing characters are drawn from a fallback font; assume a wide glyph
+            self.default = self.advances.get("M", 1.0)
+        finally:
+            font.close()
+        self.path = path
+
+    def width_em(self, text: str) -> float:
+        advances, default = self.advances, self.default
+        return sum(advances.get(ch, default) for ch in text)
+
+
+def _find_label_font() -> Optional[str]:
+    """Font file fontconfig picks for the label text (bold Arial/Helvetica/sans-serif)."""
+    if LABEL_FONT_PATH:
+        return LABEL_FONT_PATH
+    if shutil.which("fc-match") is None:
+        return None
+    try:
+        out = subprocess.run(
+            ["fc-match", "--format=%{file}", "Arial,Helvetica,sans-serif:bold"],
+            capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+# Initialize advances lazily
+_advances: Optional[GlyphAdvances] = None
+_advances_loaded = False
+_advances_lock = threading.Lock()
+
+
+def get_glyph_advances() -> Optional[GlyphAdvances]:
+    """Advance table of the label font, or None when it cannot be loaded."""
+    global _advances, _advances_loaded
+    if not _advances_loaded:
+        with _advances_lock:
+            if not _advances_loaded:
+                path = _find_label_font() if TTFont is not None else None
+                if path:
+                    try:
+                        _advances = GlyphAdvances(path)
+                        logger.info("Label font metrics loaded from %s", path)
+                    except Exception:
+                        logger.warning("Ne mogu učitati metriku fonta %s, koristim procjenu po broju znakova", path)
+                else:
+                    logger.warning("Font naljepnica nije pronađen, koristim procjenu po broju znakova")
+                _advances_loaded = True
+    return _advances
+
+
+@lru_cache(maxsize=16384)
+def fit_font_size(text: str, field: str) -> float:
+    """
+    Largest font size (pt) at which `text` fits on one line of the field's cell.
+
+    Args:
+        text: The text content
+        field: LabelData attribute, a key of FIELDS
+
+    Returns:
+        Font size between the cell's minimum and base size
+    """
+    cell = FIELDS[field]
+    if not text:
+        return cell.base_pt
+    advances = get_glyph_advances()
+    if advances is None:
+        # Imported here: label_generator imports this module
+        from .label_generator import calculate_font_size
+        return calculate_font_size(text, cell.max_chars, cell.base_pt, cell.min_pt)
+    # Text width in mm at 1 pt
+    width_per_pt = advances.width_em(text) * MM_PER_PT
+    if width_per_pt <= 0:
+        return cell.base_pt
+    # Round down to the 0.1 pt the inline style is written with
+    fitted = math.floor(cell.width_mm * SAFETY / width_per_pt * 10) / 10
+    return max(min(fitted, cell.base_pt), cell.min_pt)
@@ -0,0 +1,306 @@
+"""
+Deterministic parser for born-digital Končar purchase orders.
+
+ERP-generated orders carry a real text layer with a fixed layout (the one
+EXTRACTION_PROMPT describes): "Narudžba Br.:" in the header, items starting
+with positions 10/20/30 in the left column, the part code, description,
+quantity with unit, and optional "Proj:" / "WBS :" lines under the item.
+
+The text layer is read with positions through pdfium, grouped into lines and
+parsed by column. The result is only trusted when a strict confidence check
+passes; otherwise parse_order() returns None and the caller falls back to
+the model.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .models import Artikl, NarudzbaData
+from .pdf_processor import PdfSource
+from .rasterizer import _pdfium_lock, pdfium
+
+logger = logging.getLogger(__name__)
+
+ORDER_NUMBER_RE = re.compile(r"Narud[žz]ba\s*Br\.?\s*:?\s*(\d{6,12})", re.IGNORECASE)
+POSITION_RE = re.compile(r"^(\d{1,4})(?:\s+(.+))?$")
+PART_CODE_RE = re.compile(r"\b\d[A-Z]{2,5}\d{4,8}\b")
+QUANTITY_RE = re.compile(
+    r"\b(\d{1,3}(?:\.\d{3})*(?:,\d+)?|\d+(?:,\d+)?)\s*(KOM|KG|KPL|PAR|SET|ROL|M|M2|M3|L)\b"
+)
+DATE_RE = re.compile(r"\b\d{1,2}\.\d{1,2}\.\d{4}\.?")
+PRICE_RE = re.compile(r"\b\d{1,3}(?:\.\d{3})*,\d{2}\b")
+PROJ_RE = re.compile(r"^Proj\s*:\s*(.*)$")
+WBS_RE = re.compile(r"^WBS\s*:\s*(.*)$")
+# "Something:" at the start of a line ends the multi-line description
+LABEL_RE = re.compile(r"^[A-Za-zČĆŽŠĐčćžšđ][\w .čćžšđČĆŽŠĐ/-]{0,30}:")
+TABLE_HEADER_RE = re.compile(r"^Poz\b")
+# Header of the description column; everything between "Poz" and it is the code column
+DESCRIPTION_HEADER_RE = re.compile(r"^(Opis|Naziv)\b", re.IGNORECASE)
+TABLE_END_RE = re.compile(r"^(Ukupno|UKUPNO|Sveukupno|Stranica|Strana|Napomena)\b")
+
+LINE_TOLERANCE = 2.5   # pt; segments whose tops differ less are on one line
+COLUMN_TOLERANCE = 20  # pt; description text must start near the "Opis" header
+MIN_TEXT_CHARS = 50    # less than this means a scanned PDF without a text layer
+
+
+@dataclass
+class Segment:
+    x: float
+    top: float
+    text: str
+
+
+@dataclass
+class Line:
+    page: int
+    top: float
+    segments: List[Segment] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return " ".join(s.text for s in self.segments)
+
+
+@dataclass
+class _Item:
+    position: int
+    naziv: List[str] = field(default_factory=list)
+    code: str = ""
+    kolicina: str = ""
+    naziv_objekta: str = ""
+    wbs: str = ""
+    naziv_closed: bool = False
+
+
+def read_lines(pdf: PdfSource) -> List[Line]:
+    """Text runs with positions, grouped into lines, top to bottom, page by page."""
+    lines: List[Line] = []
+    with _pdfium_lock:
+        document = pdfium.PdfDocument(pdf)
+        try:
+            for page_index in range(len(document)):
+                page = document[page_index]
+                textpage = page.get_textpage()
+                segments = []
+                for i in range(textpage.count_rects()):
+                    left, bottom, right, top = textpage.get_rect(i)
+                    text = " ".join(textpage.get_text_bounded(left, bottom, right, top).split())
+                    if text:
+                        segments.append(Segment(left, top, text))
+                textpage.close()
+                page.close()
+
+                # PDF y grows upwards: sort by descending top, then by x
+                page_lines: List[Line] = []
+                for segment in sorted(segments, key=lambda s: (-s.top, s.x)):
+                    if page_lines and abs(page_lines[-1].top - segment.top) <= LINE_TOLERANCE:
+                        page_lines[-1].segments.append(segment)
+                    else:
+                        page_lines.append(Line(page_index, segment.top, [segment]))
+                for line in page_lines:
+                    line.segments.sort(key=lambda s: s.x)
+                lines.extend(page_lines)
+        finally:
+            document.close()
+    return lines
+
+
+def _position(line: Line) -> Optional[Tuple[int, List[Segment]]]:
+    """Item position at the start of the line and the rest of the line's segments."""
+    first = line.segments[0]
+    match = POSITION_RE.match(first.text)
+    if not match:
+        return None
+    rest = line.segments[1:]
+    if match.group(2):
+        # Position and the following text came as one run
+        rest = [Segment(first.x + 1, first.top, match.group(2))] + rest
+    if not rest:
+        return None
+    return int(match.group(1)), rest
+
+
+def _item_start(line: Line, position_x: float) -> Optional[Tuple[int, List[Segment]]]:
+    found = _position(line)
+    if found and abs(line.segments[0].x - position_x) <= COLUMN_TOLERANCE / 2:
+        value, rest = found
+        if value % 10 == 0 and value > 0:
+            return value, rest
+    return None
+
+
+def _take(pattern: re.Pattern, text: str) -> Tuple[str, str]:
+    """Return (first match, text with it removed)."""
+    match = pattern.search(text)
+    if not match:
+        return "", text
+    return match.group(0), (text[:match.start()] + " " + text[match.end():])
+
+
+def _description_x(lines: List[Line]) -> Optional[float]:
+    """
+    x of the description column, read from the first "Poz" header line.
+
+    Returns:
+        None when there is no header, no "Opis" column or no code column
+        between the position and the description
+    """
+    for line in lines:
+        if not TABLE_HEADER_RE.match(line.text):
+            continue
+        for index, segment in enumerate(line.segments):
+            if DESCRIPTION_HEADER_RE.match(segment.text):
+                return segment.x if index >= 2 else None
+        return None
+    return None
+
+
+def _absorb(item: _Item, segment: Segment, description_x: float, first_line: bool) -> None:
+    text = segment.text
+    if not item.kolicina:
+        quantity, text = _take(QUANTITY_RE, text)
+        if quantity:
+            match = QUANTITY_RE.match(quantity)
+            item.kolicina = f"{match.group(1)} {match.group(2)}"
+    text = PRICE_RE.sub(" ", DATE_RE.sub(" ", text))
+    text = " ".join(text.split())
+    if not text:
+        return
+    if segment.x < description_x - COLUMN_TOLERANCE:
+        # Code column: whatever token stands there is the part code, digits only or not
+        if not first_line or item.code:
+            return
+        item.code, _, text = text.partition(" ")
+        if not text:
+            return
+        # The code and the description came as one run
+    elif abs(segment.x - description_x) > COLUMN_TOLERANCE:
+        return
+    if not item.naziv_closed:
+        item.naziv.append(text)
+
+
+def _table_lines(lines: List[Line]) -> List[Line]:
+    """Lines inside the item table on each page (after "Poz", before totals / footer)."""
+    pages_with_header = {line.page for line in lines if TABLE_HEADER_RE.match(line.text)}
+    table: List[Line] = []
+    inside = False
+    page = None
+    for line in lines:
+        if line.page != page:
+            page = line.page
+            inside = page not in pages_with_header
+        if TABLE_HEADER_RE.match(line.text):
+            inside = True
+            continue
+        if TABLE_END_RE.match(line.text):
+            inside = False
+            continue
+        if inside:
+            table.append(line)
+    return table
+
+
+def parse_lines(lines: List[Line]) -> Tuple[Optional[NarudzbaData], str]:
+    """
+    Build NarudzbaData from positioned lines.
+
+    Returns:
+        (data, "") when the confidence check passes, otherwise (None, reason)
+    """
+    full_text = "\n".join(line.text for line in lines)
+    if len(full_text) < MIN_TEXT_CHARS:
+        return None, "no text layer"
+
+    order = ORDER_NUMBER_RE.search(full_text)
+    if not order:
+        return None, "order number not found"
+
+    description_x = _description_x(lines)
+    if description_x is None:
+        return None, "table columns not recognised"
+
+    table = _table_lines(lines)
+    candidates = [line.segments[0].x for line in table if _position(line)]
+    if not candidates:
+        return None, "no item positions"
+    position_x = min(candidates)
+
+    items: List[_Item] = []
+    quantities_seen = 0
+    for line in table:
+        quantities_seen += len(QUANTITY_RE.findall(line.text))
+        start = _item_start(line, position_x)
+        if start is not None:
+            position, rest = start
+            if items and position <= items[-1].position:
+                return None, f"positions out of order ({items[-1].position} -> {position})"
+            items.append(_Item(position))
+            for segment in rest:
+                _absorb(items[-1], segment, description_x, first_line=True)
+            continue
+        if not items:
+            continue
+
+        item = items[-1]
+        text = line.text
+        proj = PROJ_RE.match(text)
+        wbs = WBS_RE.match(text)
+        if proj:
+            item.naziv_objekta = proj.group(1).strip()
+            item.naziv_closed = True
+        elif wbs:
+            item.wbs = wbs.group(1).strip()
+            item.naziv_closed = True
+        else:
+            if LABEL_RE.match(text):
+                item.naziv_closed = True
+            for segment in line.segments:
+                _absorb(item, segment, description_x, first_line=False)
+
+    if not items:
+        return None, "no items"
+    for item in items:
+        if not item.code:
+            return None, f"item {item.position}: no part code"
+        if not item.naziv:
+            return None, f"item {item.position}: no description"
+        if not item.kolicina:
+            return None, f"item {item.position}: no quantity"
+    # Every quantity in the table must belong to exactly one parsed item
+    if quantities_seen != len(items):
+        return None, f"{quantities_seen} quantities for {len(items)} items"
+
+    artikli = [
+        Artikl(
+            redni_broj=item.position,
+            naziv=" ".join(item.naziv),
+            novi_broj_dijela=item.code,
+            kolicina=item.kolicina,
+            naziv_objekta=item.naziv_objekta,
+            wbs=item.wbs,
+        )
+        for item in items
+    ]
+    return NarudzbaData(broj_narudzbe=order.group(1), artikli=artikli), ""
+
+
+def parse_order(pdf: PdfSource) -> Optional[NarudzbaData]:
+    """
+    Parse an order from its text layer.
+
+    Args:
+        pdf: Raw PDF file bytes or path
+
+    Returns:
+        NarudzbaData, or None when pdfium is unavailable or the document
+        does not pass the confidence check (scanned, unknown layout, ...)
+    """
+    if pdfium is None:
+        return None
+    data, reason = parse_lines(read_lines(pdf))
+    if data is None:
+        logger.info("Tekstualni sloj nije prepoznat (%s), koristim model", reason)
+    return data
@@ -0,0 +1,195 @@
+"""
+Bounded-memory PDF uploads.
+
+UploadLimitMiddleware rejects oversized request bodies before they are
+parsed: from Content-Length when the client sends it, otherwise as soon as
+the streamed body passes the limit. Accepted uploads are copied to a
+temporary file in chunks, and extraction works from that path, so a 30 MB
+order never sits in memory as a whole.
+"""
+
+import json
+import os
+import tempfile
+import zipfile
+from typing import Iterable, List, Tuple
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from .config import UPLOAD_SPOOL_DIR
+
+COPY_CHUNK = 1024 * 1024
+# Multipart boundaries and headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def too_large_detail(max_bytes: int) -> str:
+    return f"Datoteka je prevelika. Maksimum je {max_bytes // (1024 * 1024)}MB."
+
+
+class UploadLimitMiddleware:
+    """
+    Pure ASGI middleware limiting the request body size on upload paths.
+
+    Args:
+        app: ASGI application
+        max_bytes: Largest accepted file
+        paths: Request paths the limit applies to
+    """
+
+    def __init__(self, app, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.max_body = max_bytes + MULTIPART_OVERHEAD
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_body:
+                await self._reject(send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    # Raised while the form is parsed; handled like any HTTPException
+                    raise HTTPException(status_code=413, detail=too_large_detail(self.max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send) -> None:
+        body = json.dumps({"detail": too_large_detail(self.max_bytes)}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def _copy_to_disk(file: UploadFile, max_bytes: int) -> str:
+    os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=UPLOAD_SPOOL_DIR)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            file.file.seek(0)
+            for block in iter(lambda: file.file.read(COPY_CHUNK), b""):
+                size += len(block)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=too_large_detail(max_bytes))
+                out.write(block)
+    except BaseException:
+        discard_upload(path)
+        raise
+    return path
+
+
+async def save_pdf_upload(file: UploadFile, max_bytes: int) -> str:
+    """
+    Copy an uploaded PDF to a temporary file in chunks.
+
+    Args:
+        file: Uploaded file
+        max_bytes: Largest accepted file
+
+    Returns:
+        Path of the temporary file; the caller removes it with discard_upload()
+
+    Raises:
+        HTTPException: 400 for non-PDF files, 413 for oversized ones
+    """
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Samo PDF datoteke su podržane")
+    return await run_in_threadpool(_copy_to_disk, file, max_bytes)
+
+
+def _extract_zip(file: UploadFile, max_bytes: int, max_files: int) -> List[Tuple[str, str]]:
+    file.file.seek(0)
+    try:
+        archive = zipfile.ZipFile(file.file)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail=f"Neispravna ZIP datoteka: {file.filename}")
+
+    members = [
+        info for info in archive.infolist()
+        if not info.is_dir() and info.filename.lower().endswith(".pdf")
+        and not os.path.basename(info.filename).startswith(".")  # macOS resource forks
+    ]
+    if not members:
+        raise HTTPException(status_code=400, detail=f"ZIP ne sadrži PDF datoteke: {file.filename}")
+    if len(members) > max_files:
+        raise HTTPException(status_code=400, detail=f"Previše datoteka ({len(members)}). Maksimum je {max_files}.")
+
+    os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+    saved: List[Tuple[str, str]] = []
+    try:
+        for info in members:
+            # Sizes in the header can lie; the copy is limited as it goes
+            if info.file_size > max_bytes:
+                raise HTTPException(status_code=413, detail=too_large_detail(max_bytes))
+            fd, path = tempfile.mkstemp(suffix=".pdf", dir=UPLOAD_SPOOL_DIR)
+            saved.append((os.path.basename(info.filename), path))
+            size = 0
+            with os.fdopen(fd, "wb") as out, archive.open(info) as src:
+                for block in iter(lambda: src.read(COPY_CHUNK), b""):
+                    size += len(block)
+                    if size > max_bytes:
+                        raise HTTPException(status_code=413, detail=too_large_detail(max_bytes))
+                    out.write(block)
+    except BaseException:
+        for _, path in saved:
+            discard_upload(path)
+        raise
+    return saved
+
+
+async def save_batch_upload(files: List[UploadFile], max_bytes: int, max_files: int) -> List[Tuple[str, str]]:
+    """
+    Spool the PDFs of a batch upload: PDF files and the PDFs inside ZIP files.
+
+    Args:
+        files: Uploaded files
+        max_bytes: Largest accepted PDF
+        max_files: Most PDFs accepted in total
+
+    Returns:
+        (filename, temporary path) per PDF, in upload order; the caller
+        removes the files with discard_upload()
+
+    Raises:
+        HTTPException: 400 for other file types, bad ZIPs or too many files,
+                       413 for oversized PDFs
+    """
+    documents: List[Tuple[str, str]] = []
+    try:
+        for file in files:
+            if file.filename.lower().endswith(".zip"):
+                documents.extend(await run_in_threadpool(_extract_zip, file, max_bytes, max_files))
+            else:
+                documents.append((file.filename, await save_pdf_upload(file, max_bytes)))
+            if len(documents) > max_files:
+                raise HTTPException(status_code=400, detail=f"Previše datoteka ({len(documents)}). Maksimum je {max_files}.")
+    except BaseException:
+        for _, path in documents:
+            discard_upload(path)
+        raise
+    return documents
+
+
+def discard_upload(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
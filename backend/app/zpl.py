@@ -0,0 +1,163 @@
+"""
+ZPL ^GF graphic field encoding for the Citizen CL-E321 (ZPL-compatible) printer.
+
+The bitmap is packed by Pillow in C (mode "1" with inverted raw mode), so no
+per-pixel Python work is done. Three payload forms are supported:
+
+- "none": plain ASCII hex, identical to the historical output
+- "acs":  ZPL ASCII compression (repeat counts, ',' / '!' row fills, ':' row repeat)
+- "z64":  zlib-deflated bitmap, base64 encoded, with a CRC-16 trailer
+"""
+
+import base64
+import binascii
+import zlib
+from typing import Literal, NamedTuple
+
+from PIL import Image
+
+Compression = Literal["none", "acs", "z64"]
+
+COMPRESSIONS = ("none", "acs", "z64")
+
+
+class GraphicField(NamedTuple):
+    """Encoded ^GFA payload and the parameters that go in front of it."""
+    total_bytes: int
+    bytes_per_row: int
+    data: str
+
+
+def pack_bitmap(image: Image.Image) -> tuple[bytes, int, int]:
+    """
+    Pack an image into a 1-bit ZPL bitmap.
+
+    Args:
+        image: PIL Image object (any mode)
+
+    Returns:
+        Tuple of (packed rows, bytes per row, height). In ZPL 1 = black, so the
+        bits are inverted compared to PIL; row padding bits are always 0.
+    """
+    img_bw = image.convert('1')
+    width, height = img_bw.size
+    bytes_per_row = (width + 7) // 8
+
+    # "1;I" packs inverted (black = 1) with zero padding at the end of each row
+    packed = img_bw.tobytes('raw', '1;I')
+    return packed, bytes_per_row, height
+
+
+# ZPL ASCII compression repeat counts: G..Y = 1..19, g..z = 20, 40, ... 400
+_LOW_COUNTS = "GHIJKLMNOPQRSTUVWXY"
+_HIGH_COUNTS = "ghijklmnopqrstuvwxyz"
+
+
+def _repeat_prefix(count: int) -> str:
+    prefix = ""
+    while count > 400:
+        prefix += "z"
+        count -= 400
+    if count >= 20:
+        prefix += _HIGH_COUNTS[count // 20 - 1]
+        count %= 20
+    if count:
+        prefix += _LOW_COUNTS[count - 1]
+    return prefix
+
+
+def _compress_row(row: str) -> str:
+    # Trailing zeros / ones are replaced by a single fill character
+    fill = ""
+    stripped = row.rstrip("0")
+    if len(stripped) < len(row):
+        fill = ","
+    else:
+        stripped = row.rstrip("F")
+        if len(stripped) < len(row):
+            fill = "!"
+
+    out = []
+    i = 0
+    n = len(stripped)
+    while i < n:
+        char = stripped[i]
+        j = i + 1
+        while j < n and stripped[j] == char:
+            j += 1
+        run = j - i
+        if run == 1:
+            out.append(char)
+        elif run == 2:
+            out.append(char * 2)
+        else:
+            out.append(_repeat_prefix(run) + char)
+        i = j
+    out.append(fill)
+    return "".join(out)
+
+
+def compress_ascii(hex_data: str, bytes_per_row: int) -> str:
+    """
+    Apply ZPL ASCII compression to a hex graphic payload.
+
+    Args:
+        hex_data: Uppercase hex string, 2 * bytes_per_row characters per row
+        bytes_per_row: Number of bitmap bytes in a single row
+
+    Returns:
+        Compressed payload for ^GFA
+    """
+    row_len = bytes_per_row * 2
+    out = []
+    previous = None
+    for start in range(0, len(hex_data), row_len):
+        row = hex_data[start:start + row_len]
+        if row == previous:
+            out.append(":")
+        else:
+            out.append(_compress_row(row))
+        previous = row
+    return "".join(out)
+
+
+def compress_z64(packed: bytes) -> str:
+    """
+    Encode a packed bitmap in ZPL :Z64: form (zlib + base64 + CRC-16/XMODEM).
+
+    Args:
+        packed: Raw bitmap bytes
+
+    Returns:
+        Payload for ^GFA, e.g. ":Z64:eJzt...:1A2B"
+    """
+    encoded = base64.b64encode(zlib.compress(packed, 9))
+    crc = binascii.crc_hqx(encoded, 0)
+    return f":Z64:{encoded.decode('ascii')}:{crc:04X}"
+
+
+def encode_graphic_field(image: Image.Image, compression: Compression = "none") -> GraphicField:
+    """
+    Encode an image as a ^GFA graphic field payload.
+
+    Args:
+        image: PIL Image object
+        compression: "none" (plain hex), "acs" (ASCII compression) or "z64"
+
+    Returns:
+        GraphicField with total byte count, bytes per row and payload string
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown ZPL compression: {compression}")
+
+    packed, bytes_per_row, height = pack_bitmap(image)
+    total_bytes = bytes_per_row * height
+
+    if compression == "z64":
+        data = compress_z64(packed)
+    else:
+        data = packed.hex().upper()
+        if compression == "acs":
+            data = compress_ascii(data, bytes_per_row)
+
+    return GraphicField(total_bytes, bytes_per_row, data)
@@ -0,0 +1,213 @@
+"""
+Native (text) ZPL labels, laid out like generate_label_html.
+
+Instead of a full-page bitmap the printer draws the label itself: scalable
+font 0 (^A0) for text, ^FB field blocks for wrapping and alignment and ^GB
+boxes for the table grid. A label is well under 1 KB of ZPL.
+
+With stored_format=True the static part (header, grid, captions, footer) is
+downloaded once as a printer-stored format (^DF) and every label only recalls
+it (^XF) and adds its field data.
+"""
+
+from functools import lru_cache
+from itertools import groupby
+from typing import List, NamedTuple, Optional
+
+from .label_generator import calculate_font_size, dedupe_labels
+from .models import LabelData
+from .text_fit import COLUMN_MM, CONTENT_MM
+
+STORED_FORMAT = "R:KONCAR.ZPL"
+
+# Geometry in mm, mirroring LABEL_CSS (100 x 100 mm, 4 mm padding)
+LABEL_MM = 100.0
+PADDING_MM = 4.0
+TABLE_TOP_MM = 19.0
+OUTER_BORDER_MM = 0.5
+INNER_BORDER_MM = 0.3
+
+COLUMN_X_MM = [PADDING_MM + sum(COLUMN_MM[:i]) for i in range(5)]
+
+
+class Row(NamedTuple):
+    height_mm: float
+    caption: str                          # "\n" separates caption lines
+    field: str                            # LabelData attribute
+    fit: tuple                            # (max_chars, base_pt, min_pt), as in generate_label_html
+    small_caption: str = ""               # 4-column rows: caption of the small cell
+    small_field: Optional[str] = None     # 4-column rows: value of the small cell
+    small_fit: tuple = (8, 7.0, 4.5)
+    split: bool = False                   # value spans one column, rest of the row is empty
+
+
+ROWS = [
+    Row(12.0, "Naziv", "naziv", (100, 9.0, 6.0)),
+    Row(10.0, "Novi broj\ndijela", "novi_broj_dijela", (22, 9.0, 5.0),
+        "Stari broj\ndijela", "stari_broj_dijela"),
+    Row(10.0, "Količina", "kolicina", (45, 9.0, 6.0)),
+    Row(10.0, "Narudžba", "narudzba", (22, 9.0, 5.0),
+        "Account\nassign.\nCategory", "account_category"),
+    Row(10.0, "Naziv\nobjekta", "naziv_objekta", (45, 9.0, 5.0)),
+    Row(10.0, "WBS", "wbs", (45, 9.0, 5.0)),
+    Row(10.0, "Datum", "datum", (20, 9.0, 6.0), split=True),
+]
+
+
+class _Canvas:
+    """Converts mm / pt to printer dots and emits ZPL commands."""
+
+    def __init__(self, dpi: int):
+        self.dpi = dpi
+        self.parts: List[str] = []
+
+    def dots(self, mm: float) -> int:
+        return round(mm * self.dpi / 25.4)
+
+    def font(self, pt: float) -> int:
+        return max(round(pt * self.dpi / 72), 8)
+
+    def box(self, x_mm: float, y_mm: float, w_mm: float, h_mm: float, border_mm: float) -> None:
+        w, h, t = self.dots(w_mm), self.dots(h_mm), max(self.dots(border_mm), 1)
+        self.parts.append(f"^FO{self.dots(x_mm)},{self.dots(y_mm)}^GB{max(w, t)},{max(h, t)},{t}^FS")
+
+    def text(
+        self,
+        x_mm: float,
+        y_mm: float,
+        w_mm: float,
+        h_mm: float,
+        value: str,
+        pt: float,
+        lines: int = 1,
+        justify: str = "L",
+    ) -> None:
+        """Text block of `lines` lines, vertically centred in the h_mm high box."""
+        if not value:
+            return
+        size = self.font(pt)
+        used = size * (value.count("\n") + 1 if lines == 1 else lines)
+        y = self.dots(y_mm) + max((self.dots(h_mm) - used) // 2, 0)
+        max_lines = max(lines, value.count("\n") + 1)
+        self.parts.append(
+            f"^FO{self.dots(x_mm)},{y}^A0N,{size},{size}"
+            f"^FB{self.dots(w_mm)},{max_lines},0,{justify}^FH^FD{escape_field(value)}^FS"
+        )
+
+    def zpl(self) -> str:
+        return "".join(self.parts)
+
+
+def escape_field(value: str) -> str:
+    """Escape ^FD data for ^FH (hex indicator "_"); newlines become ^FB line breaks."""
+    value = value.replace("_", "_5F").replace("^", "_5E").replace("~", "_7E")
+    return value.replace("\r", "").replace("\n", "\\&")
+
+
+@lru_cache(maxsize=None)
+def static_layout(dpi: int = 203) -> str:
+    """Header, table grid, captions and footer: everything that is the same on every label (cached)."""
+    c = _Canvas(dpi)
+
+    # Header
+    c.text(PADDING_MM, PADDING_MM, 50, 6.2, "Končar", 16)
+    c.text(PADDING_MM, 10.2, 60, 4.6, "Energetski transformatori d.o.o.", 11)
+    c.text(PADDING_MM + 40, PADDING_MM, CONTENT_MM - 40, 5.0, "QA IDENT KARTA", 12, justify="R")
+    c.text(PADDING_MM + 40, 9.0, CONTENT_MM - 40, 4.0, "- Dobavni dijelovi -", 9, justify="R")
+
+    # Table grid
+    height = sum(row.height_mm for row in ROWS)
+    c.box(PADDING_MM, TABLE_TOP_MM, CONTENT_MM, height, OUTER_BORDER_MM)
+    c.box(COLUMN_X_MM[1], TABLE_TOP_MM, 0, height, INNER_BORDER_MM)
+
+    y = TABLE_TOP_MM
+    for index, row in enumerate(ROWS):
+        if index:
+            c.box(PADDING_MM, y, CONTENT_MM, 0, INNER_BORDER_MM)
+        if row.small_field or row.split:
+            c.box(COLUMN_X_MM[2], y, 0, row.height_mm, INNER_BORDER_MM)
+        if row.small_field:
+            c.box(COLUMN_X_MM[3], y, 0, row.height_mm, INNER_BORDER_MM)
+            c.text(COLUMN_X_MM[2] + 1, y, COLUMN_MM[2] - 2, row.height_mm, row.small_caption, 6.5)
+        c.text(COLUMN_X_MM[0] + 2, y, COLUMN_MM[0] - 4, row.height_mm, row.caption, 8)
+        y += row.height_mm
+
+    # Footer, 3 mm from the bottom edge
+    c.text(0, LABEL_MM - 3 - 4.5, LABEL_MM, 4.5, "KPT-OI-077", 10, justify="C")
+    return c.zpl()
+
+
+def label_fields(label: LabelData, dpi: int = 203) -> str:
+    """The label's values, sized with the same rules as the HTML template."""
+    c = _Canvas(dpi)
+    y = TABLE_TOP_MM
+    for index, row in enumerate(ROWS):
+        value = getattr(label, row.field)
+        if row.small_field or row.split:
+            width = COLUMN_MM[1]
+        else:
+            width = CONTENT_MM - COLUMN_MM[0]
+        pt = calculate_font_size(value, *row.fit)
+        # Naziv wraps (up to 3 lines); everything else is single-line and shrinks to fit
+        lines = 3 if index == 0 else 1
+        c.text(COLUMN_X_MM[1] + 2, y, width - 4, row.height_mm, value.replace("\n", " "), pt, lines)
+        if row.small_field:
+            small = getattr(label, row.small_field)
+            pt = calculate_font_size(small, *row.small_fit)
+            c.text(COLUMN_X_MM[3] + 1, y, COLUMN_MM[3] - 2, row.height_mm, small.replace("\n", " "), pt)
+        y += row.height_mm
+    return c.zpl()
+
+
+def _quantity(copies: int) -> str:
+    return f"^PQ{copies}" if copies > 1 else ""
+
+
+def generate_label_zpl(label: LabelData, copies: int = 1, dpi: int = 203) -> str:
+    """
+    Build one self-contained text ZPL label.
+
+    Args:
+        label: Label data
+        copies: Print quantity (^PQ)
+        dpi: Printer resolution (203 for CL-E321)
+
+    Returns:
+        ZPL string (^XA...^XZ)
+    """
+    return f"^XA^CI28{static_layout(dpi)}{label_fields(label, dpi)}{_quantity(copies)}^XZ"
+
+
+def stored_format_zpl(dpi: int = 203) -> str:
+    """Download the static layout to the printer as STORED_FORMAT (^DF)."""
+    return f"^XA^CI28^DF{STORED_FORMAT}^FS{static_layout(dpi)}^XZ"
+
+
+def recall_label_zpl(label: LabelData, copies: int = 1, dpi: int = 203) -> str:
+    """Recall STORED_FORMAT (^XF) and print it with this label's field data."""
+    return f"^XA^CI28^XF{STORED_FORMAT}^FS{label_fields(label, dpi)}{_quantity(copies)}^XZ"
+
+
+def generate_labels_text_zpl(labels: List[LabelData], stored_format: bool = False, dpi: int = 203) -> List[str]:
+    """
+    Generate native ZPL for all labels.
+
+    Consecutive repeats (copies or adjacent duplicates) become one format
+    with ^PQ.
+
+    Args:
+        labels: List of label data
+        stored_format: Send the static layout once (^DF) and recall it per label (^XF)
+        dpi: Printer resolution (203 for CL-E321)
+
+    Returns:
+        List of ZPL strings, ready for PrintSpooler; with stored_format the
+        first one is the ^DF download
+    """
+    unique, sequence = dedupe_labels(labels)
+    build = recall_label_zpl if stored_format else generate_label_zpl
+
+    formats = [stored_format_zpl(dpi)] if stored_format else []
+    for unique_index, run in groupby(sequence):
+        formats.append(build(unique[unique_index], len(list(run)), dpi))
+    return formats
@@ -0,0 +1 @@
+# Offline benchmarks for the label rendering and printing hot paths
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Wall time of extracting a batch of orders one by one vs. through
+extract_batch_async() (what /extract/batch uses).
+
+The model is a fake async client that sleeps a random 1-3 s per call, so
+the numbers show the overlap of model latency only; text-layer parsing is
+skipped and every document is distinct, so the extraction cache never hits.
+
+Usage (from backend/):
+    python -m benchmarks.bench_batch
+    python -m benchmarks.bench_batch --docs 20 --parallelism 8
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from types import SimpleNamespace
+
+FAKE_RESULT = '{"broj_narudzbe": "9550522163", "artikli": []}'
+
+
+class FakeCompletions:
+    def __init__(self, low: float, high: float, seed: int):
+        self.random = random.Random(seed)
+        self.low, self.high = low, high
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.random.uniform(self.low, self.high))
+        message = SimpleNamespace(content=FAKE_RESULT)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+async def run(args) -> None:
+    from app import extraction
+
+    documents = [b"%PDF-1.4\n%" + os.urandom(16) + b"\n" + b"0" * 20_000 for _ in range(args.docs)]
+    extraction.MAX_CONCURRENT_EXTRACTIONS = max(args.parallelism, 1)
+    extraction._semaphore = asyncio.Semaphore(extraction.MAX_CONCURRENT_EXTRACTIONS)
+
+    def use_client(seed: int) -> None:
+        client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(args.low, args.high, seed)))
+        extraction.get_async_client = lambda: client
+
+    # Both runs see the same sequence of model latencies
+    use_client(args.seed)
+    start = time.perf_counter()
+    for pdf in documents:
+        await extraction.extract_data_from_pdf_async(pdf, use_text_layer=False)
+    sequential = time.perf_counter() - start
+
+    use_client(args.seed)
+    documents = [pdf + b"\n%batch" for pdf in documents]  # not cached by the first run
+    start = time.perf_counter()
+    first = None
+    async for index, data, error in extraction.extract_batch_async(documents, args.parallelism, use_text_layer=False):
+        if error is not None:
+            raise error
+        if first is None:
+            first = time.perf_counter() - start
+    batch = time.perf_counter() - start
+
+    print(f"{args.docs} documents, model {args.low:.0f}-{args.high:.0f} s per call")
+    print(f"  sequential      {sequential:6.1f} s")
+    label = f"batch (x{args.parallelism})"
+    print(f"  {label:<15} {batch:6.1f} s  first result after {first:.1f} s"
+          f"  ({sequential / batch:.1f}x faster)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=12)
+    parser.add_argument("--parallelism", type=int, default=4)
+    parser.add_argument("--low", type=float, default=1.0, help="shortest model call (s)")
+    parser.add_argument("--high", type=float, default=3.0, help="longest model call (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    os.environ["OPENAI_RPM"] = "0"  # measure overlap, not admission control
+    os.environ["EXTRACTION_CACHE_DIR"] = ""  # keep the fake results out of the disk cache
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
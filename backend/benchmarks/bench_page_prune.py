@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Page pruning on a synthetic order with trailing terms-and-conditions pages.
+
+Builds the bench_text_parser order (header, "Poz." table, items over three
+pages), a page holding only the last item's "Proj:" line, pages of general
+terms and a signature page, checks that the "Proj:" page is kept and reports
+which pages prune_pages() keeps, the bytes and estimated tokens saved, and
+the pruning overhead. The model latency is simulated as a fixed part plus
+input prefill (TOKENS_PER_PAGE at MODEL_INPUT_TOKENS_PER_SECOND), so the
+last line is only as good as those estimates.
+
+Usage (from backend/):
+    python -m benchmarks.bench_page_prune
+    python -m benchmarks.bench_page_prune --terms-pages 6
+    python -m benchmarks.bench_page_prune order.pdf
+"""
+
+import argparse
+import io
+import time
+
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+
+from app.page_filter import MODEL_INPUT_TOKENS_PER_SECOND, TOKENS_PER_PAGE, prune_pages, score_pages
+from app.pdf_processor import get_page_count
+from benchmarks.bench_text_parser import _text, expected_items, synthetic_order_pdf
+
+MODEL_FIXED_SECONDS = 6.0  # output generation, independent of the input size
+
+TERMS = (
+    "Isporučitelj se obvezuje isporučiti robu u ugovorenom roku i na ugovoreno mjesto isporuke. "
+    "U slučaju kašnjenja naručitelj ima pravo na ugovornu kaznu u iznosu od 0,5% vrijednosti "
+    "narudžbe za svaki dan zakašnjenja, a najviše do 10% ukupne vrijednosti. Reklamacije na "
+    "količinu i vidljive nedostatke primaju se u roku od 8 dana od primitka robe. "
+)
+
+
+def _paragraphs(document, page, text: str, lines: int) -> None:
+    words = (text * 20).split()
+    y = 800
+    for _ in range(lines):
+        line, words = " ".join(words[:14]), words[14:]
+        _text(document, page, 40, y, line, 8)
+        y -= 12
+
+
+def order_with_terms(terms_pages: int) -> bytes:
+    document = pdfium.PdfDocument(synthetic_order_pdf(expected_items()))
+    # The last item's "Proj:" line spilled over to a page of its own
+    page = document.new_page(595, 842)
+    _text(document, page, 150, 800, "Proj: TR 40 MVA - rekonstrukcija TS 110/20 kV Zagreb istok")
+    _text(document, page, 40, 40, f"Stranica {len(document)}")
+    pdfium_c.FPDFPage_GenerateContent(page)
+    for _ in range(terms_pages):
+        page = document.new_page(595, 842)
+        _paragraphs(document, page, TERMS, 62)
+        pdfium_c.FPDFPage_GenerateContent(page)
+    page = document.new_page(595, 842)
+    _text(document, page, 40, 800, "Odobrio: voditelj nabave, Končar - Energetski transformatori d.o.o.")
+    _text(document, page, 40, 760, "Potpis i pečat: ____________________        Zagreb, 17.10.2026.")
+    pdfium_c.FPDFPage_GenerateContent(page)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def simulated_model_seconds(pages: int) -> float:
+    return MODEL_FIXED_SECONDS + pages * TOKENS_PER_PAGE / MODEL_INPUT_TOKENS_PER_SECOND
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", help="your own order instead of the synthetic one")
+    parser.add_argument("--terms-pages", type=int, default=4)
+    args = parser.parse_args()
+
+    pdf = open(args.pdf, "rb").read() if args.pdf else order_with_terms(args.terms_pages)
+    page_count = get_page_count(pdf)
+    scores = [page.score for page in score_pages(pdf, page_count)]
+    print(f"{page_count} pages, {len(pdf) // 1024} KB; page scores {scores}")
+
+    runs = 10
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = prune_pages(pdf)
+    overhead = (time.perf_counter() - start) / runs
+    if not args.pdf:
+        continuation = len(pdfium.PdfDocument(synthetic_order_pdf(expected_items())))
+        assert continuation in result.kept, f"page {continuation} with the last item's Proj: line was dropped"
+
+    print(f"  kept pages {result.kept}: dropped {result.pages_dropped}, "
+          f"-{result.bytes_saved // 1024} KB ({result.bytes_saved / len(pdf):.0%}), ~{result.tokens_saved} tokens")
+    print(f"  pruning {overhead * 1000:.1f} ms; simulated model call "
+          f"{simulated_model_seconds(page_count):.1f} s -> {simulated_model_seconds(len(result.kept)):.1f} s")
+
+
+if __name__ == "__main__":
+    main()
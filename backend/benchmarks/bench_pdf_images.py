@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Peak memory and time of converting a long PDF to page images.
+
+Compares the old convert_pdf_to_images() structure (render every page,
+then resize and PNG-encode with optimize=True one after another) with
+iter_pdf_images(), which renders a page at a time and encodes on the encode
+pool. Each variant runs in a fresh interpreter with the configured
+rasterizer and reports its peak RSS above the interpreter baseline.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf_images                 # 40 synthetic A4 pages
+    python -m benchmarks.bench_pdf_images --pages 100 --format webp
+    python -m benchmarks.bench_pdf_images --pdf order.pdf
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_upload_memory import peak_rss_mb
+
+
+def synthetic_pdf(pages: int) -> bytes:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+
+    from benchmarks.bench_text_parser import _text
+
+    document = pdfium.PdfDocument.new()
+    for number in range(pages):
+        page = document.new_page(595, 842)
+        for row in range(60):
+            _text(document, page, 40, 800 - row * 12, f"Stranica {number + 1}, redak {row + 1}: TR.BRTVA;A=140;B=140;C=4; NBR 70SH 3TBT000008 100 KOM")
+        pdfium_c.FPDFPage_GenerateContent(page)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def old_variant(pdf_bytes: bytes, dpi: int, fmt: str) -> int:
+    from PIL import Image
+
+    from app.rasterizer import get_rasterizer
+
+    # What convert_pdf_to_images() did: all pages first, then serial resize + encode
+    images = list(get_rasterizer().render(pdf_bytes, dpi))
+    total = 0
+    for img in images:
+        if img.width > 4096 or img.height > 4096:
+            ratio = min(4096 / img.width, 4096 / img.height)
+            img = img.resize((int(img.width * ratio), int(img.height * ratio)), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG", optimize=True)
+        total += buffer.tell()
+    return total
+
+
+def streaming_variant(pdf_bytes: bytes, dpi: int, fmt: str) -> int:
+    from app.pdf_processor import iter_pdf_images
+
+    return sum(len(image) for image in iter_pdf_images(pdf_bytes, dpi, fmt))
+
+
+VARIANTS = {"all pages": old_variant, "streaming": streaming_variant}
+
+
+def run_child(variant: str, path: str, dpi: int, fmt: str) -> None:
+    import app.pdf_processor  # noqa: F401  (import cost is not part of the comparison)
+    import app.rasterizer  # noqa: F401
+
+    pdf_bytes = open(path, "rb").read()
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    size = VARIANTS[variant](pdf_bytes, dpi, fmt)
+    print(json.dumps({"peak_mb": peak_rss_mb() - baseline, "seconds": time.perf_counter() - start, "bytes": size}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--format", default="png", choices=("png", "jpeg", "webp"), help="streaming variant only")
+    parser.add_argument("--pdf", help="your own PDF instead of the synthetic one")
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        variant, path, dpi, fmt = args.child
+        run_child(variant, path, int(dpi), fmt)
+        return
+
+    pdf_bytes = open(args.pdf, "rb").read() if args.pdf else synthetic_pdf(args.pages)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(pdf_bytes)
+        path = f.name
+    try:
+        print(f"{args.pdf or f'{args.pages} synthetic A4 pages'} at {args.dpi} DPI")
+        for variant in VARIANTS:
+            fmt = args.format if variant == "streaming" else "png"
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_pdf_images", "--child", variant, path, str(args.dpi), fmt],
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"  {variant:<10} {fmt:<5} peak +{result['peak_mb']:5.0f} MB  {result['seconds']:5.1f} s"
+                  f"  ({result['bytes'] // 1024} KB of images)")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Benchmark label PDF throughput (labels/second) against render pool size.
+
+Each worker count runs in a fresh interpreter because RENDER_WORKERS is read
+at import time. Pool start-up and warm-up are excluded from the timing.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pool [labels] [max_workers]
+"""
+
+import os
+import subprocess
+import sys
+
+LABELS = 400
+
+
+def run(workers: int, count: int) -> float:
+    code = (
+        "import time\n"
+        "from app.label_generator import generate_labels_pdf, warm_render_pool, warm_up, shutdown_render_pool\n"
+        "from benchmarks.bench_render import make_labels\n"
+        f"labels = make_labels({count})\n"
+        "warm_up(); warm_render_pool()\n"
+        "start = time.perf_counter(); generate_labels_pdf(labels); print(time.perf_counter() - start)\n"
+        "shutdown_render_pool()\n"
+    )
+    env = dict(os.environ, RENDER_WORKERS=str(workers))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else LABELS
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    print(f"{count} labels, {os.cpu_count()} CPUs\n")
+    print(f"{'workers':>8}{'seconds':>10}{'labels/s':>10}{'speedup':>9}")
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        seconds = run(workers, count)
+        baseline = baseline or seconds
+        print(f"{workers:>8}{seconds:>10.2f}{count / seconds:>10.1f}{baseline / seconds:>8.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Label preview latency (p50/p95) as /preview sees it after an edit.
+
+Every request is a label that was never rendered (an edit changes its hash),
+so each one is a cold WeasyPrint render, rasterize and encode in the preview
+threads. Measured once on an idle process and once while /generate-pdf jobs
+render in the request threadpool at the same time.
+
+Usage (from backend/):
+    python -m benchmarks.bench_preview                  # 50 previews, 100-label jobs
+    python -m benchmarks.bench_preview 100 --job-labels 500
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from app.label_generator import generate_label_preview, generate_labels_pdf, get_preview_pool, warm_preview_pool, warm_up
+from benchmarks.data import synthetic_labels
+
+TARGET_P95_MS = 100
+
+
+def preview_latencies(count: int, seed: int) -> list[float]:
+    pool = get_preview_pool()
+    latencies = []
+    for label in synthetic_labels(count, seed=seed):
+        start = time.perf_counter()
+        pool.submit(generate_label_preview, label, 96, "webp").result()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> float:
+    ms = sorted(latency * 1000 for latency in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{name:<28} p50 {statistics.median(ms):6.1f} ms   p95 {p95:6.1f} ms   max {ms[-1]:6.1f} ms")
+    return p95
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("count", type=int, nargs="?", default=50)
+    parser.add_argument("--job-labels", type=int, default=100, help="labels per concurrent /generate-pdf job")
+    args = parser.parse_args()
+
+    warm_up()
+    warm_preview_pool()
+
+    idle = report("idle", preview_latencies(args.count, seed=1))
+
+    stop = threading.Event()
+    jobs = []
+
+    def batch_jobs() -> None:
+        seed = 100
+        while not stop.is_set():
+            start = time.perf_counter()
+            generate_labels_pdf(synthetic_labels(args.job_labels, seed=seed))
+            jobs.append(time.perf_counter() - start)
+            seed += 1
+
+    thread = threading.Thread(target=batch_jobs, daemon=True)
+    thread.start()
+    try:
+        busy = report(f"during {args.job_labels}-label jobs", preview_latencies(args.count, seed=2))
+    finally:
+        stop.set()
+        thread.join()
+    print(f"{len(jobs)} job(s) ran alongside, {statistics.mean(jobs):.2f} s each" if jobs else "no job finished")
+
+    verdict = "ok" if max(idle, busy) <= TARGET_P95_MS else "over"
+    print(f"target p95 {TARGET_P95_MS} ms: {verdict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Print a long label PDF to the local fake printer: the old sequence
+(rasterize every page, then encode and send) vs. the render/encode/send
+pipeline of print_pdf_to_citizen().
+
+Reports the time until the printer receives the first label and the total
+job time.
+
+Usage (from backend/):
+    python -m benchmarks.bench_print_pipeline                     # 100 pages
+    python -m benchmarks.bench_print_pipeline --pages 50 --rate 10 --compression acs
+"""
+
+import argparse
+import io
+import threading
+import time
+
+from app.print_to_citizen import image_to_zpl, print_pages_pipelined
+from app.rasterizer import get_rasterizer
+from app.spooler import PrinterSession, PrintSpooler
+from benchmarks.fake_printer import FakePrinter
+
+DPI = 203
+SIZE = int(100 * DPI / 25.4)
+
+
+def label_pdf(pages: int) -> bytes:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+
+    from benchmarks.bench_text_parser import _text
+
+    side = 100 * 72 / 25.4
+    document = pdfium.PdfDocument.new()
+    for number in range(pages):
+        page = document.new_page(side, side)
+        _text(document, page, 12, side - 30, f"TR.BRTVA;A={140 + number};B=140;C=4; NBR 70SH", 11)
+        for row in range(12):
+            _text(document, page, 12, side - 60 - row * 16, f"3TBT{number:06d}   100 KOM   9550522163   T-123456.01.{row:02d}")
+        pdfium_c.FPDFPage_GenerateContent(page)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class FirstLabel:
+    """Time from start until the fake printer has received its first label."""
+
+    def __init__(self, printer: FakePrinter):
+        self.start = time.perf_counter()
+        self.seconds = None
+        threading.Thread(target=self._watch, args=(printer,), daemon=True).start()
+
+    def _watch(self, printer: FakePrinter) -> None:
+        while printer.received == 0:
+            time.sleep(0.001)
+        self.seconds = time.perf_counter() - self.start
+
+
+def sequential(printer: FakePrinter, pdf_bytes: bytes, pages: int, compression: str) -> None:
+    images = list(get_rasterizer().render(pdf_bytes, DPI, (SIZE, SIZE)))  # like convert_from_path
+    spooler = PrintSpooler(PrinterSession("127.0.0.1", printer.port))
+    spooler.print_labels(image_to_zpl(image, compression=compression) for image in images)
+
+
+def pipelined(printer: FakePrinter, pdf_bytes: bytes, pages: int, compression: str) -> None:
+    spooler = PrintSpooler(PrinterSession("127.0.0.1", printer.port), batch_size=1)
+    images = get_rasterizer().render(pdf_bytes, DPI, (SIZE, SIZE))
+    print_pages_pipelined(spooler, images, pages, compression)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=0.0, help="printer labels per second (0 = instant)")
+    parser.add_argument("--compression", default="none", choices=("none", "acs", "z64"))
+    args = parser.parse_args()
+
+    pdf_bytes = label_pdf(args.pages)
+    assert get_rasterizer().page_count(pdf_bytes) == args.pages
+    print(f"{args.pages} labels, compression={args.compression}, printer "
+          f"{'instant' if not args.rate else f'{args.rate:.0f} labels/s'}")
+    for name, run in (("sequential", sequential), ("pipelined", pipelined)):
+        with FakePrinter(labels_per_second=args.rate) as printer:
+            first = FirstLabel(printer)
+            run(printer, pdf_bytes, args.pages, args.compression)
+            total = time.perf_counter() - first.start
+        print(f"  {name:<10} first label after {first.seconds:5.2f} s, job {total:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
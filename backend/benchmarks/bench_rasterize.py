@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF → PNG rasterization backends (pdf2image/pdftoppm vs. pdfium).
+
+Usage (from backend/):
+    python -m benchmarks.bench_rasterize              # renders 10 synthetic labels first
+    python -m benchmarks.bench_rasterize labels.pdf   # your own PDF
+"""
+
+import io
+import sys
+import time
+
+from app.rasterizer import RASTERIZERS, get_rasterizer
+
+DPI = 300
+SIZE = (int(100 * DPI / 25.4), int(100 * DPI / 25.4))
+
+
+def sample_pdf(count: int = 10) -> bytes:
+    from app.label_generator import generate_labels_pdf
+    from app.models import LabelData
+
+    labels = [
+        LabelData(
+            naziv=f"TR.BRTVA;A={140 + i};B=140;C=4; NBR 70SH",
+            novi_broj_dijela=f"3TBT{i:06d}",
+            kolicina="100 KOM",
+            narudzba="9550522163",
+            naziv_objekta="TR 40 MVA Končar",
+            wbs="T-123456.01.02",
+        )
+        for i in range(count)
+    ]
+    return generate_labels_pdf(labels)
+
+
+def main() -> None:
+    pdf_bytes = open(sys.argv[1], "rb").read() if len(sys.argv) > 1 else sample_pdf()
+
+    print(f"{'backend':<12}{'pages':>7}{'total s':>10}{'ms/page':>10}{'PNG KB/page':>13}")
+    for name in RASTERIZERS:
+        try:
+            rasterizer = get_rasterizer(name)
+            start = time.perf_counter()
+            png_bytes = 0
+            pages = 0
+            for image in rasterizer.render(pdf_bytes, dpi=DPI, size=SIZE):
+                buffer = io.BytesIO()
+                image.save(buffer, format="PNG", optimize=True)
+                png_bytes += buffer.tell()
+                pages += 1
+            seconds = time.perf_counter() - start
+        except Exception as e:  # backend not available on this machine
+            print(f"{name:<12} unavailable: {e}")
+            continue
+        print(f"{name:<12}{pages:>7}{seconds:>10.2f}{seconds / pages * 1000:>10.1f}{png_bytes / pages / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
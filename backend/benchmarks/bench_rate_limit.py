@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Burst of extractions from several workers against a rate-limited fake API.
+
+The fake API accepts OPENAI_RPM requests per minute, enforced per second
+(as OpenAI quantizes its limits), and answers 429 with Retry-After
+otherwise. Each worker is a separate process running request_extraction_async
+with a fake client, like a uvicorn worker; the run is repeated with the
+shared limiter disabled (OPENAI_RPM=0 in the workers) and enabled.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rate_limit
+    python -m benchmarks.bench_rate_limit --workers 4 --callers 60 --rpm 1200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+WINDOW = 1.0
+FAKE_RESULT = '{"broj_narudzbe": "9550522163", "artikli": []}'
+
+
+class FakeApi:
+    """Sliding-window request limit shared by the worker processes through SQLite."""
+
+    def __init__(self, path: str, rpm: int, model_seconds: float):
+        self.path = path
+        self.limit = rpm * WINDOW / 60
+        self.model_seconds = model_seconds
+        with sqlite3.connect(path) as db:
+            db.execute("CREATE TABLE IF NOT EXISTS calls (at REAL NOT NULL)")
+
+    def accept(self) -> bool:
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            recent = db.execute("SELECT COUNT(*) FROM calls WHERE at > ?", (now - WINDOW,)).fetchone()[0]
+            accepted = recent < self.limit
+            if accepted:
+                db.execute("INSERT INTO calls (at) VALUES (?)", (now,))
+            db.execute("COMMIT")
+            return accepted
+        finally:
+            db.close()
+
+    async def create(self, **kwargs):
+        import httpx
+        from openai import RateLimitError
+
+        if not await asyncio.to_thread(self.accept):
+            request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+            response = httpx.Response(429, headers={"retry-after": "2"}, request=request)
+            raise RateLimitError("Rate limit reached", response=response, body=None)
+        await asyncio.sleep(self.model_seconds)
+        message = SimpleNamespace(content=FAKE_RESULT)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(total_tokens=3000))
+
+
+async def run_worker(api: FakeApi, callers: int) -> dict:
+    from app import extraction
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=api))
+    extraction.get_async_client = lambda: client
+    extraction.MAX_CONCURRENT_EXTRACTIONS = callers
+    extraction._semaphore = asyncio.Semaphore(callers)
+
+    rate_limited = 0
+
+    def on_progress(stage, details):
+        nonlocal rate_limited
+        if stage == "retry_after_429":
+            rate_limited += 1
+
+    async def one() -> float | None:
+        start = time.perf_counter()
+        try:
+            await extraction.request_extraction_async(b"%PDF-1.4\n" + b"0" * 50_000, on_progress)
+        except extraction.OpenAIRateLimitError:
+            return None
+        return time.perf_counter() - start
+
+    results = await asyncio.gather(*(one() for _ in range(callers)))
+    return {"latencies": [r for r in results if r is not None], "failed": results.count(None), "rate_limited": rate_limited}
+
+
+def run_child(api_db: str, rpm: int, model_seconds: float, callers: int) -> None:
+    api = FakeApi(api_db, rpm, model_seconds)
+    print(json.dumps(asyncio.run(run_worker(api, callers))))
+
+
+def run_burst(args, limiter: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        api_db = os.path.join(tmp, "api.sqlite3")
+        FakeApi(api_db, args.rpm, args.model_seconds)
+        env = dict(
+            os.environ,
+            OPENAI_API_KEY="test",
+            OPENAI_RPM=str(args.rpm if limiter else 0),
+            OPENAI_TPM="0",
+            RATE_LIMIT_DB=os.path.join(tmp, "limiter.sqlite3"),
+        )
+        procs = [
+            subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.bench_rate_limit", "--child", api_db,
+                 str(args.rpm), str(args.model_seconds), str(args.callers)],
+                stdout=subprocess.PIPE, text=True, env=env,
+            )
+            for _ in range(args.workers)
+        ]
+        outputs = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in procs]
+    latencies = sorted(l for o in outputs for l in o["latencies"])
+    return {
+        "latencies": latencies,
+        "failed": sum(o["failed"] for o in outputs),
+        "rate_limited": sum(o["rate_limited"] for o in outputs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--callers", type=int, default=80, help="concurrent extractions per worker")
+    parser.add_argument("--rpm", type=int, default=1200)
+    parser.add_argument("--model-seconds", type=float, default=0.2)
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        api_db, rpm, model_seconds, callers = args.child
+        run_child(api_db, int(rpm), float(model_seconds), int(callers))
+        return
+
+    total = args.workers * args.callers
+    print(f"{total} extractions from {args.workers} workers, API limit {args.rpm} rpm ({args.rpm * WINDOW / 60:.0f} per {WINDOW:.0f}s)")
+    for limiter in (False, True):
+        result = run_burst(args, limiter)
+        latencies = result["latencies"]
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0.0
+        print(f"  shared limiter {'on ' if limiter else 'off'}: 429s={result['rate_limited']:<4} failed={result['failed']:<4}"
+              f" p50={statistics.median(latencies):5.1f}s p95={p95:5.1f}s max={latencies[-1]:5.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark label PDF rendering: per-call CSS parsing (before) vs. the shared
+pre-parsed stylesheet and font configuration (after), and the first render
+on another thread once the renderer was warmed up (as for a request landing
+on a fresh threadpool thread).
+
+Usage (from backend/):
+    python -m benchmarks.bench_render
+"""
+
+import io
+import subprocess
+import sys
+import threading
+import time
+
+from weasyprint import HTML
+
+from app.label_generator import generate_html_content, render_labels_pdf, warm_up
+from app.models import LabelData
+
+SIZES = (1, 10, 100)
+
+
+def make_labels(count: int) -> list[LabelData]:
+    return [
+        LabelData(
+            naziv=f"TR.BRTVA;A={140 + i};B=140;C=4; NBR 70SH",
+            novi_broj_dijela=f"3TBT{i:06d}",
+            kolicina="100 KOM",
+            narudzba="9550522163",
+            naziv_objekta="TR 40 MVA Končar",
+            wbs="T-123456.01.02",
+        )
+        for i in range(count)
+    ]
+
+
+def render_before(labels: list[LabelData]) -> bytes:
+    """The original path: inline <style>, parsed and font-configured on every call."""
+    buffer = io.BytesIO()
+    HTML(string=generate_html_content(labels)).write_pdf(
+        buffer, pdf_version='1.7', srgb=True, optimize_images=True, jpeg_quality=85,
+    )
+    return buffer.getvalue()
+
+
+def best_of(fn, labels, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(labels)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def cold_first_render(variant: str) -> float:
+    """Time the very first render in a fresh interpreter."""
+    code = (
+        "import time; from benchmarks.bench_render import *; labels = make_labels(1); "
+        f"start = time.perf_counter(); {variant}(labels); print(time.perf_counter() - start)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def first_render_on_new_thread() -> float:
+    """Time one render on a thread that has not rendered before."""
+    elapsed = []
+
+    def run():
+        start = time.perf_counter()
+        render_labels_pdf(make_labels(1))
+        elapsed.append(time.perf_counter() - start)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return elapsed[0]
+
+
+def main() -> None:
+    print(f"cold first render: before {cold_first_render('render_before') * 1000:.0f}ms, "
+          f"after (without warm-up) {cold_first_render('render_labels_pdf') * 1000:.0f}ms")
+
+    warm_up()
+    print(f"first render on a new thread after warm-up: {first_render_on_new_thread() * 1000:.0f}ms")
+
+    # Warm both paths so steady-state numbers are compared
+    render_before(make_labels(1))
+
+    print(f"\n{'labels':>7}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for size in SIZES:
+        labels = make_labels(size)
+        repeat = 5 if size < 100 else 2
+        before = best_of(render_before, labels, repeat)
+        # render_labels_pdf, not generate_labels_pdf: repeats must not come from the render cache
+        after = best_of(render_labels_pdf, labels, repeat)
+        print(f"{size:>7}{before * 1000:>12.1f}{after * 1000:>12.1f}{before / after:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark printing N labels to a local fake printer: one socket per label
+(the old behaviour) vs. the persistent PrintSpooler.
+
+Usage (from backend/):
+    python -m benchmarks.bench_spooler                 # 500 labels
+    python -m benchmarks.bench_spooler 500 --drop 120  # also test resume
+
+Every run also drops the connection in the middle of a batch while the
+printer is still parsing (labels reach ~HS `--parse-delay` s after arrival)
+and checks that no label is confirmed before the printer has it and that
+every label is printed.
+"""
+
+import argparse
+import socket
+import time
+
+from app.spooler import PrinterSession, PrintSpooler
+from app.zpl import encode_graphic_field
+from benchmarks.bench_zpl import synthetic_label
+from benchmarks.fake_printer import FakePrinter
+
+
+def make_labels(count: int) -> list[str]:
+    total_bytes, bytes_per_row, data = encode_graphic_field(synthetic_label(), "acs")
+    zpl = f"^XA^FO0,0^GFA,{total_bytes},{total_bytes},{bytes_per_row},{data}^FS^XZ"
+    return [zpl] * count
+
+
+def per_socket(printer: FakePrinter, labels: list[str]) -> float:
+    start = time.perf_counter()
+    for zpl in labels:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(10)
+            sock.connect(("127.0.0.1", printer.port))
+            sock.sendall(zpl.encode("utf-8"))
+    printer.wait_received(len(labels))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("count", type=int, nargs="?", default=500)
+    parser.add_argument("--connect-delay", type=float, default=0.02,
+                        help="simulated printer accept latency per connection (s)")
+    parser.add_argument("--drop", type=int, default=None,
+                        help="fake printer drops the connection after this many labels")
+    parser.add_argument("--parse-delay", type=float, default=0.05,
+                        help="seconds before a received label shows up in ~HS (mid-batch drop case)")
+    args = parser.parse_args()
+
+    labels = make_labels(args.count)
+
+    with FakePrinter(connect_delay=args.connect_delay) as printer:
+        seconds = per_socket(printer, labels)
+        print(f"per-socket: {args.count} labels in {seconds:.2f}s "
+              f"({args.count / seconds:.1f} labels/s, {printer.connections} connections)")
+
+    with FakePrinter(connect_delay=args.connect_delay, drop_after=args.drop) as printer:
+        spooler = PrintSpooler(PrinterSession("127.0.0.1", printer.port))
+        result = spooler.print_labels(labels)
+        spooler.session.close()
+        print(f"spooler:    {result.labels} labels in {result.seconds:.2f}s "
+              f"({result.labels_per_second:.1f} labels/s, {printer.connections} connection(s), "
+              f"{result.reconnects} reconnect(s), printer received {printer.received})")
+        assert printer.received >= args.count
+
+    # Drop in the middle of a batch, with labels still in the raw receive buffer
+    drop = args.count // 2 + 5
+    with FakePrinter(drop_after=drop, parse_delay=args.parse_delay) as printer:
+        early = []
+
+        def on_progress(confirmed: int) -> None:
+            if confirmed > printer.received:
+                early.append((confirmed, printer.received))
+
+        spooler = PrintSpooler(PrinterSession("127.0.0.1", printer.port))
+        result = spooler.print_labels(labels, on_progress)
+        spooler.session.close()
+        print(f"mid-batch drop after {drop}: {result.labels} labels in {result.seconds:.2f}s, "
+              f"{result.reconnects} reconnect(s), {printer.lost} lost at the drop, "
+              f"printer received {printer.received}")
+        assert not early, f"confirmed before the printer had them (confirmed, received): {early[:3]}"
+        assert result.labels == args.count
+        assert printer.received >= args.count
+
+
+if __name__ == "__main__":
+    main()
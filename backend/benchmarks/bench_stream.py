@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Time to the first item with a streamed extraction vs. waiting for the whole
+response.
+
+A fake model writes the JSON answer for N items at a fixed rate of output
+characters per second (stream=True delivers it in small deltas, otherwise
+it arrives at the end). Both runs go through request_extraction_async; the
+streamed one reports every item through on_item. The parsed results are
+checked to be identical.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stream
+    python -m benchmarks.bench_stream --items 60 --chars-per-second 400
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from benchmarks.bench_text_parser import expected_items
+
+DELTA_CHARS = 12  # roughly one streamed token batch
+
+
+class FakeCompletions:
+    def __init__(self, text: str, chars_per_second: float):
+        self.text = text
+        self.chars_per_second = chars_per_second
+
+    async def create(self, stream: bool = False, **kwargs):
+        if not stream:
+            await asyncio.sleep(len(self.text) / self.chars_per_second)
+            message = SimpleNamespace(content=self.text)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+        return self._deltas()
+
+    async def _deltas(self):
+        for i in range(0, len(self.text), DELTA_CHARS):
+            await asyncio.sleep(DELTA_CHARS / self.chars_per_second)
+            delta = SimpleNamespace(content=self.text[i:i + DELTA_CHARS])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=len(self.text) // 4))
+
+
+async def run(args) -> None:
+    from app import extraction
+
+    items = expected_items(args.items)
+    for item in items:
+        del item["stari_broj_dijela"]  # not part of the model schema
+    text = json.dumps({"broj_narudzbe": "9550522163", "artikli": items}, ensure_ascii=False)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(text, args.chars_per_second)))
+    extraction.get_async_client = lambda: client
+    pdf = b"%PDF-1.4\n" + b"0" * 20_000
+
+    start = time.perf_counter()
+    whole = await extraction.request_extraction_async(pdf, prune=False)
+    whole_seconds = time.perf_counter() - start
+
+    arrivals = []
+    start = time.perf_counter()
+    streamed = await extraction.request_extraction_async(
+        pdf, prune=False, on_item=lambda artikl: arrivals.append(time.perf_counter() - start)
+    )
+    streamed_seconds = time.perf_counter() - start
+
+    assert streamed == whole, "streamed result differs"
+    assert len(arrivals) == args.items
+    print(f"{args.items} items, {len(text)} characters at {args.chars_per_second:.0f}/s")
+    print(f"  whole response  first item after {whole_seconds:5.1f} s, all after {whole_seconds:5.1f} s")
+    print(f"  streamed        first item after {arrivals[0]:5.1f} s, all after {streamed_seconds:5.1f} s"
+          f"  (10th after {arrivals[min(9, len(arrivals) - 1)]:.1f} s, results identical)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=30)
+    parser.add_argument("--chars-per-second", type=float, default=600.0, help="model output rate")
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    os.environ["OPENAI_RPM"] = "0"
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark the text-layer order parser against a synthetic ERP-style order.
+
+Builds a born-digital PDF with pdfium (header, "Poz." table, multi-line
+descriptions, Proj:/WBS : lines, a page break, an all-digit part code),
+checks that the parser reads it back exactly and reports the parse time.
+
+Usage (from backend/):
+    python -m benchmarks.bench_text_parser              # 30 synthetic items
+    python -m benchmarks.bench_text_parser order.pdf    # your own order
+"""
+
+import ctypes
+import io
+import sys
+import time
+
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+
+from app.text_parser import parse_lines, parse_order, read_lines
+
+ITEMS = 30
+ITEMS_PER_PAGE = 12
+
+
+def _text(document, page, x: float, y: float, text: str, size: float = 9) -> None:
+    obj = pdfium_c.FPDFPageObj_NewTextObj(document, b"Helvetica", ctypes.c_float(size))
+    buffer = ctypes.create_string_buffer((text + "\x00").encode("utf-16-le"))
+    pdfium_c.FPDFText_SetText(obj, ctypes.cast(buffer, ctypes.POINTER(pdfium_c.FPDF_WCHAR)))
+    pdfium_c.FPDFPageObj_Transform(obj, 1, 0, 0, 1, x, y)
+    pdfium_c.FPDFPage_InsertObject(page, obj)
+
+
+def _part_code(i: int) -> str:
+    # Some suppliers' codes are digits only (the prompt's own "1234567890")
+    return "1234567890" if i == 4 else f"3TBT{i + 8:06d}"
+
+
+def expected_items(count: int = ITEMS) -> list[dict]:
+    return [
+        {
+            "redni_broj": (i + 1) * 10,
+            "naziv": f"TR.BRTVA;A={140 + i};B=140;C=4; NBR 70SH",
+            "novi_broj_dijela": _part_code(i),
+            "stari_broj_dijela": "",
+            "kolicina": f"{(i + 1) * 10} KOM",
+            "naziv_objekta": "TR 40 MVA" if i % 3 == 0 else "",
+            "wbs": f"T-123456.01.{i:02d}" if i % 3 == 0 else "",
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_order_pdf(items: list[dict]) -> bytes:
+    document = pdfium.PdfDocument.new()
+    for start in range(0, len(items), ITEMS_PER_PAGE):
+        page = document.new_page(595, 842)
+        _text(document, page, 40, 800, "Končar - Energetski transformatori d.o.o.", 11)
+        _text(document, page, 380, 800, "Narudžba Br.: 9550522163")
+        _text(document, page, 380, 785, "Datum: 17.10.2026.")
+        y = 740
+        for x, title in ((40, "Poz."), (70, "Materijal"), (150, "Opis"), (360, "Dat. isporuke"), (450, "Količina/JM")):
+            _text(document, page, x, y, title)
+        for item in items[start:start + ITEMS_PER_PAGE]:
+            y -= 16
+            description, material = item["naziv"].rsplit(" ", 2)[0], " ".join(item["naziv"].split(" ")[-2:])
+            _text(document, page, 40, y, str(item["redni_broj"]))
+            _text(document, page, 70, y, item["novi_broj_dijela"])
+            _text(document, page, 150, y, description)
+            _text(document, page, 360, y, "15.11.2026.")
+            _text(document, page, 450, y, item["kolicina"])
+            y -= 11
+            _text(document, page, 150, y, material)
+            if item["naziv_objekta"]:
+                y -= 11
+                _text(document, page, 150, y, f"Proj: {item['naziv_objekta']}")
+                y -= 11
+                _text(document, page, 150, y, f"WBS : {item['wbs']}")
+        _text(document, page, 40, 40, f"Stranica {start // ITEMS_PER_PAGE + 1}")
+        pdfium_c.FPDFPage_GenerateContent(page)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        pdf_bytes = open(sys.argv[1], "rb").read()
+        expected = None
+    else:
+        expected = expected_items()
+        pdf_bytes = synthetic_order_pdf(expected)
+
+    data, reason = parse_lines(read_lines(pdf_bytes))
+    if data is None:
+        print(f"Not recognised: {reason}")
+        sys.exit(1)
+    if expected is not None:
+        got = [a.model_dump() for a in data.artikli]
+        assert got == expected, f"mismatch:\n{got[:2]}\n{expected[:2]}"
+        print(f"{len(got)} items parsed exactly")
+
+    runs = 20
+    start = time.perf_counter()
+    for _ in range(runs):
+        parse_order(pdf_bytes)
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"order {data.broj_narudzbe}: {len(data.artikli)} items, {elapsed * 1000:.1f} ms per parse")
+
+
+if __name__ == "__main__":
+    main()
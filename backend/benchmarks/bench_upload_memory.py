@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Peak memory of sending one uploaded PDF to the model.
+
+Runs the whole request_extraction() path against a fake OpenAI API: a real
+OpenAI client whose HTTP transport consumes each request body chunk by chunk,
+as a socket would, and answers with a canned response. Compares an upload
+held in memory (sent inline as a base64 data URL inside the JSON body) with
+a spooled upload (copied to disk in chunks, streamed to the Files API and
+referenced by file id). Each variant runs in a fresh interpreter and reports
+its peak RSS above the interpreter baseline.
+
+Usage (from backend/):
+    python -m benchmarks.bench_upload_memory             # 30 MB synthetic upload
+    python -m benchmarks.bench_upload_memory --mb 10
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import httpx
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4.1-mini",
+    "choices": [{
+        "index": 0,
+        "finish_reason": "stop",
+        "message": {"role": "assistant", "content": json.dumps({
+            "broj_narudzbe": "9550522163",
+            "artikli": [{
+                "redni_broj": 10, "naziv": "TR.BRTVA", "novi_broj_dijela": "3TBT000008",
+                "kolicina": "10 KOM", "naziv_objekta": "", "wbs": "",
+            }],
+        })},
+    }],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class FakeOpenAI(httpx.BaseTransport):
+    """Reads request bodies chunk by chunk and answers like the OpenAI API."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for chunk in request.stream:
+            self.sent += len(chunk)
+        if request.url.path.endswith("/files"):
+            body = {"id": "file-bench", "object": "file", "bytes": self.sent, "created_at": 0,
+                    "filename": "narudzba.pdf", "purpose": "user_data"}
+        elif request.method == "DELETE":
+            body = {"id": "file-bench", "object": "file", "deleted": True}
+        else:
+            body = COMPLETION
+        return httpx.Response(200, json=body)
+
+
+def peak_rss_mb() -> float:
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _extract(pdf) -> int:
+    from openai import OpenAI
+
+    from app import extraction
+
+    transport = FakeOpenAI()
+    extraction._client = OpenAI(api_key="bench", http_client=httpx.Client(transport=transport))
+    extraction.request_extraction(pdf)
+    return transport.sent
+
+
+def in_memory(path: str) -> int:
+    # Upload read whole, as small uploads are
+    with open(path, "rb") as f:
+        pdf_bytes = f.read()
+    return _extract(pdf_bytes)
+
+
+def spooled(path: str) -> int:
+    from app.uploads import COPY_CHUNK
+
+    # The upload is copied to the spool file in chunks, then sent from disk
+    with open(path, "rb") as src, tempfile.NamedTemporaryFile(suffix=".pdf") as spool:
+        for block in iter(lambda: src.read(COPY_CHUNK), b""):
+            spool.write(block)
+        spool.flush()
+        return _extract(spool.name)
+
+
+VARIANTS = {"in-memory": in_memory, "spooled": spooled}
+
+
+def run_child(variant: str, path: str) -> None:
+    import openai  # noqa: F401  (import cost is not part of the comparison)
+
+    import app.extraction  # noqa: F401
+    import app.uploads  # noqa: F401
+
+    baseline = peak_rss_mb()
+    sent = VARIANTS[variant](path)
+    print(json.dumps({"peak_mb": peak_rss_mb() - baseline, "sent_bytes": sent}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=30, help="upload size in MB (default 30)")
+    parser.add_argument("--child", nargs=2, metavar=("VARIANT", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    # Random bytes are not a PDF to prune, and the token budget would hold a 30 MB "PDF" back
+    env = dict(os.environ, PAGE_PRUNING="0", OPENAI_RPM="0")
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(os.urandom(args.mb * 1024 * 1024))
+        path = f.name
+    try:
+        print(f"{args.mb} MB upload")
+        for variant in VARIANTS:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_upload_memory", "--child", variant, path],
+                capture_output=True, text=True, check=True, env=env,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"  {variant:<10} peak +{result['peak_mb']:.0f} MB  "
+                  f"({result['peak_mb'] / args.mb:.1f}x the file, {result['sent_bytes'] // 1024} KB sent)")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
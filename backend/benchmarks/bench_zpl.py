@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark ZPL ^GFA encoding: legacy per-pixel loop vs. packed encoder.
+
+Checks that the uncompressed output is byte-for-byte identical to the
+historical implementation, then reports encode time and payload size for
+each compression mode.
+
+Usage (from backend/):
+    python -m benchmarks.bench_zpl              # synthetic 800x800 label
+    python -m benchmarks.bench_zpl label.png    # your own image
+"""
+
+import sys
+import time
+
+from PIL import Image, ImageDraw
+
+from app.zpl import COMPRESSIONS, encode_graphic_field
+
+DPI = 203
+LABEL_PX = int(100 * DPI / 25.4)  # 100mm @ 203 DPI = 800 px
+
+
+def legacy_graphic_data(image: Image.Image) -> str:
+    """The original getpixel() implementation, kept as the reference."""
+    img_bw = image.convert('1')
+    width, height = img_bw.size
+    bytes_per_row = (width + 7) // 8
+
+    graphic_data = []
+    for y in range(height):
+        row_data = []
+        for x_byte in range(bytes_per_row):
+            byte_val = 0
+            for bit in range(8):
+                x = x_byte * 8 + bit
+                if x < width:
+                    pixel = img_bw.getpixel((x, y))
+                    if pixel == 0:
+                        byte_val |= (1 << (7 - bit))
+            row_data.append(f'{byte_val:02X}')
+        graphic_data.append(''.join(row_data))
+    return ''.join(graphic_data)
+
+
+def synthetic_label(size: int = LABEL_PX) -> Image.Image:
+    """Draw something label-like: outer frame, table grid and text blocks."""
+    img = Image.new('L', (size, size), 255)
+    draw = ImageDraw.Draw(img)
+    margin = size // 25
+    draw.rectangle([margin, margin, size - margin, size - margin], outline=0, width=4)
+    table_top = size // 5
+    row_h = (size - table_top - 2 * margin) // 7
+    for i in range(8):
+        y = table_top + i * row_h
+        draw.line([margin, y, size - margin, y], fill=0, width=2)
+    draw.line([size // 5, table_top, size // 5, table_top + 7 * row_h], fill=0, width=2)
+    for i in range(7):
+        y = table_top + i * row_h + row_h // 3
+        draw.text((margin + 8, y), "Naziv", fill=0)
+        draw.text((size // 5 + 8, y), "TR.BRTVA;A=140;B=140;C=4; NBR 70SH " * (i % 2 + 1), fill=0)
+    draw.text((margin + 8, margin + 8), "Končar  QA IDENT KARTA", fill=0)
+    return img
+
+
+def timed(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    image = Image.open(sys.argv[1]) if len(sys.argv) > 1 else synthetic_label()
+    print(f"Image: {image.size[0]}x{image.size[1]} px")
+
+    reference = legacy_graphic_data(image)
+    assert encode_graphic_field(image, "none").data == reference, "encoder output differs from legacy"
+    print("✅ Uncompressed output is byte-for-byte identical to legacy")
+
+    legacy_s = timed(lambda: legacy_graphic_data(image), repeat=1)
+    print(f"\n{'mode':<10}{'encode ms':>12}{'payload KB':>14}")
+    print(f"{'legacy':<10}{legacy_s * 1000:>12.1f}{len(reference) / 1024:>14.1f}")
+    for compression in COMPRESSIONS:
+        seconds = timed(lambda: encode_graphic_field(image, compression), repeat=5)
+        size = len(encode_graphic_field(image, compression).data)
+        print(f"{compression:<10}{seconds * 1000:>12.2f}{size / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Synthetic label data for the benchmarks.
+
+Deterministic for a given count, and mixes the cases that stress layout:
+long wrapping naziv values, Croatian diacritics and empty optional fields.
+"""
+
+import random
+
+from app.models import LabelData
+
+_NAZIVI = [
+    "TR.BRTVA;A={a};B=140;C=4; NBR 70SH",
+    "Izolacijski cilindar od prešpana, unutarnji promjer {a} mm, visina 1250 mm, debljina stijenke 6 mm",
+    "Čahura provodnika ŽŠ-{a} s brtvom, izvedba za uljni transformator, pocinčano",
+    "VIJAK M{a}",
+    "Distantni element đ/ć {a}x30x15 mm, prešpan, lijepljeno, za namot VN i NN strane",
+]
+_OBJEKTI = ["TR 40 MVA Končar", "TR 300 MVA Žerjavinec", "Energetski transformator ĐAKOVO 2", ""]
+
+
+def synthetic_labels(count: int, seed: int = 0) -> list[LabelData]:
+    rng = random.Random(seed)
+    labels = []
+    for i in range(count):
+        empty = i % 4 == 3  # every fourth label leaves the optional fields blank
+        labels.append(LabelData(
+            naziv=_NAZIVI[i % len(_NAZIVI)].format(a=rng.randint(8, 999)),
+            novi_broj_dijela=f"3TBT{rng.randint(0, 999999):06d}",
+            stari_broj_dijela="" if empty else f"{rng.randint(0, 99999999):08d}",
+            kolicina=f"{rng.randint(1, 500)} KOM",
+            narudzba=f"95505{rng.randint(0, 99999):05d}",
+            account_category="" if empty else "P",
+            naziv_objekta=_OBJEKTI[i % len(_OBJEKTI)],
+            wbs="" if empty else f"T-{rng.randint(100000, 999999)}.01.{i % 100:02d}",
+            datum="" if empty else "17.10.2026.",
+        ))
+    return labels
@@ -0,0 +1,126 @@
+"""
+Local fake ZPL printer listening on a TCP port (like a printer on 9100).
+
+Connections are served one at a time, each after `connect_delay` seconds,
+which is where per-label connections lose time on real hardware.
+
+Counts ^XZ-terminated labels, "prints" them at a configurable rate and answers
+~HS with a host status reflecting its receive buffer. A label only shows up in
+~HS once it has been parsed, `parse_delay` seconds after it arrived. It can
+also drop the connection after N labels, in the middle of a batch: the rest of
+that batch and everything not yet parsed are lost, as on a printer reset.
+"""
+
+import socketserver
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional
+
+
+class _Server(socketserver.TCPServer):
+    # Like a real printer: one connection is served at a time, others wait
+    request_queue_size = 128
+    allow_reuse_address = True
+
+
+class FakePrinter:
+    def __init__(
+        self,
+        labels_per_second: float = 0.0,
+        connect_delay: float = 0.0,
+        drop_after: Optional[int] = None,
+        parse_delay: float = 0.0,
+    ):
+        self.labels_per_second = labels_per_second  # 0 = prints instantly
+        self.connect_delay = connect_delay
+        self.drop_after = drop_after
+        self.parse_delay = parse_delay
+        self.connections = 0
+        self.lost = 0
+        self._parsed = 0
+        self._unparsed: Deque[float] = deque()  # arrival times of labels in the raw buffer
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        self.port = self._server.server_address[1]
+
+    @property
+    def received(self) -> int:
+        """Labels parsed from the receive buffer."""
+        with self._lock:
+            self._parse()
+            return self._parsed
+
+    def _parse(self) -> None:
+        now = time.monotonic()
+        while self._unparsed and now - self._unparsed[0] >= self.parse_delay:
+            self._unparsed.popleft()
+            self._parsed += 1
+
+    @property
+    def printed(self) -> int:
+        received = self.received
+        if not self.labels_per_second:
+            return received
+        elapsed = time.monotonic() - self._started
+        return min(received, int(elapsed * self.labels_per_second))
+
+    def host_status(self) -> bytes:
+        received = self.received
+        in_buffer = received - min(received, self.printed)
+        return (
+            f"\x02030,0,0,0800,{in_buffer:03d},0,0,0,000,0,0,0\x03\r\n"
+            f"\x02001,0,0,0,1,2,6,0,00000000,1,000\x03\r\n"
+            f"\x021234,0\x03\r\n"
+        ).encode("ascii")
+
+    def wait_received(self, count: int, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        while self.received < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def _handler(self):
+        printer = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                with printer._lock:
+                    printer.connections += 1
+                time.sleep(printer.connect_delay)
+                tail = b""
+                while True:
+                    chunk = self.request.recv(65536)
+                    if not chunk:
+                        return
+                    data = tail + chunk
+                    labels = data.count(b"^XZ")
+                    with printer._lock:
+                        total = printer._parsed + len(printer._unparsed)
+                        drop = printer.drop_after is not None and total + labels >= printer.drop_after
+                        if drop:
+                            # Keep the labels up to the drop, lose the rest of the batch
+                            printer.lost = total + labels - printer.drop_after
+                            labels = printer.drop_after - total
+                            printer.drop_after = None
+                        printer._unparsed.extend([time.monotonic()] * labels)
+                        if drop:
+                            # The reset also clears whatever was not parsed yet
+                            printer._parse()
+                            printer.lost += len(printer._unparsed)
+                            printer._unparsed.clear()
+                    if drop:
+                        return
+                    for _ in range(data.count(b"~HS")):
+                        self.request.sendall(printer.host_status())
+                    tail = data[-2:]
+
+        return Handler
+
+    def __enter__(self) -> "FakePrinter":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
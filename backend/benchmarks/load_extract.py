@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Load test: /health and /generate-pdf latency while extractions are running.
+
+The OpenAI client is replaced by a fake that takes `--model-seconds` to
+answer, so this runs offline. With the async extraction path the other
+endpoints should answer as fast as on an idle server.
+
+Usage (from backend/):
+    python -m benchmarks.load_extract --extractions 8 --model-seconds 3
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from app import extraction
+from app.main import app
+
+FAKE_RESULT = '{"broj_narudzbe": "9550522163", "artikli": []}'
+LABEL = {
+    "naziv": "TR.BRTVA;A=140;B=140;C=4; NBR 70SH",
+    "novi_broj_dijela": "3TBT000008",
+    "kolicina": "100 KOM",
+    "narudzba": "9550522163",
+    "naziv_objekta": "TR 40 MVA",
+    "wbs": "T-123456.01.02",
+}
+
+
+class FakeCompletions:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.seconds)
+        message = SimpleNamespace(content=FAKE_RESULT)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+async def probe(client: httpx.AsyncClient, method: str, url: str, duration: float, **kwargs) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.05)
+    return latencies
+
+
+def summary(name: str, latencies: list[float]) -> str:
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    return f"{name:<14} n={len(latencies):<4} median={statistics.median(latencies):7.1f}ms  p95={p95:7.1f}ms"
+
+
+async def run(extractions: int, model_seconds: float) -> None:
+    extraction._async_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(model_seconds)))
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=600) as client:
+        async def probes(duration: float) -> tuple[list[float], list[float]]:
+            return await asyncio.gather(
+                probe(client, "GET", "/health", duration),
+                probe(client, "POST", "/generate-pdf", duration, json={"labels": [LABEL]}),
+            )
+
+        idle_health, idle_pdf = await probes(model_seconds)
+        print("Idle:")
+        print("  " + summary("/health", idle_health))
+        print("  " + summary("/generate-pdf", idle_pdf))
+
+        async def extract(i: int) -> None:
+            # Distinct bytes so every call misses the cache
+            pdf = b"%PDF-1.4 load test " + str(i).encode() + b" " + str(time.time()).encode()
+            response = await client.post("/extract", files={"file": (f"{i}.pdf", pdf, "application/pdf")})
+            response.raise_for_status()
+
+        start = time.perf_counter()
+        (busy_health, busy_pdf), _ = await asyncio.gather(
+            probes(model_seconds),
+            asyncio.gather(*(extract(i) for i in range(extractions))),
+        )
+        print(f"\nWith {extractions} extractions in flight "
+              f"(done in {time.perf_counter() - start:.1f}s, "
+              f"max {extraction.MAX_CONCURRENT_EXTRACTIONS} concurrent):")
+        print("  " + summary("/health", busy_health))
+        print("  " + summary("/generate-pdf", busy_pdf))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extractions", type=int, default=8)
+    parser.add_argument("--model-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.extractions, args.model_seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark suite for the label rendering and printing hot paths.
+
+Every case/size runs in a fresh interpreter so peak RSS belongs to that case
+alone (render pool workers included). Results are compared against a JSON
+baseline; the run fails when time, peak RSS or output size grows by more
+than the threshold. Fully offline: no printer, no OpenAI.
+
+Usage (from backend/):
+    python -m benchmarks.suite --save                  # record benchmarks/baseline.json
+    python -m benchmarks.suite                         # compare, exit 1 on regression
+    python -m benchmarks.suite --require-baseline      # CI: also exit 1 without a baseline
+    python -m benchmarks.suite --sizes 1 10 --cases generate_labels_pdf text_zpl
+    python -m benchmarks.suite --threshold 0.1 --baseline other.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+SIZES = (1, 10, 100, 1000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS_DELTA = 0.005
+MIN_RSS_DELTA_MB = 5.0
+
+# Only these cases measure the per-label render cache; every other case runs
+# with it off, or the repeats after the first would time cache hits
+RENDER_CACHE_CASES = {"generate_labels_pdf_regenerate"}
+
+
+# --- cases -----------------------------------------------------------------
+# Each case takes the size and returns a zero-argument callable producing the
+# output (bytes, str or a list of them); imports happen inside so a case only
+# pays for what it uses.
+
+def _font_size(size: int) -> Callable:
+    from app.label_generator import calculate_font_size
+    from benchmarks.data import synthetic_labels
+
+    texts = [label.naziv for label in synthetic_labels(size)]
+    return lambda: [calculate_font_size(text, 45, 9.0, 5.0) for _ in range(100) for text in texts]
+
+
+def _fit_font_size(size: int) -> Callable:
+    from app.text_fit import FIELDS, fit_font_size, get_glyph_advances
+    from benchmarks.data import synthetic_labels
+
+    get_glyph_advances()
+    labels = synthetic_labels(size)
+
+    def run():
+        # Cold memo each run: measures the advance-table lookups, not the cache
+        fit_font_size.cache_clear()
+        return [fit_font_size(getattr(label, field), field) for label in labels for field in FIELDS]
+    return run
+
+
+def _image_to_zpl(compression: str) -> Callable[[int], Callable]:
+    def case(size: int) -> Callable:
+        from app.print_to_citizen import image_to_zpl
+        from benchmarks.bench_zpl import synthetic_label
+
+        image = synthetic_label()
+        return lambda: [image_to_zpl(image, compression=compression) for _ in range(size)]
+    return case
+
+
+def _text_zpl(size: int) -> Callable:
+    from app.zpl_label import generate_labels_text_zpl
+    from benchmarks.data import synthetic_labels
+
+    labels = synthetic_labels(size)
+    return lambda: generate_labels_text_zpl(labels)
+
+
+def _labels_pdf(size: int) -> Callable:
+    from app.label_generator import generate_labels_pdf, warm_render_pool, warm_up
+    from benchmarks.data import synthetic_labels
+
+    warm_up()
+    warm_render_pool()
+    labels = synthetic_labels(size)
+    return lambda: generate_labels_pdf(labels)
+
+
+def _labels_pdf_regenerate(size: int) -> Callable:
+    from app.label_generator import generate_labels_pdf, warm_render_pool, warm_up
+    from benchmarks.data import synthetic_labels
+
+    warm_up()
+    warm_render_pool()
+    labels = synthetic_labels(size)
+    generate_labels_pdf(labels)
+    edits = iter(range(10 ** 6))
+
+    def run():
+        # One edited field per run, as after a change in LabelEditor
+        labels[0] = labels[0].model_copy(update={"kolicina": f"{next(edits)} KOM"})
+        return generate_labels_pdf(labels)
+    return run
+
+
+def _labels_png(size: int) -> Callable:
+    from app.label_generator import generate_labels_png, warm_render_pool, warm_up
+    from benchmarks.data import synthetic_labels
+
+    warm_up()
+    warm_render_pool()
+    labels = synthetic_labels(size)
+    return lambda: generate_labels_png(labels, dpi=300)
+
+
+def _single_label_png(size: int) -> Callable:
+    from app.label_generator import generate_single_label_png, warm_up
+    from benchmarks.data import synthetic_labels
+
+    warm_up()
+    labels = synthetic_labels(size)
+    return lambda: generate_single_label_png(labels, index=size - 1)
+
+
+# name -> (setup, sizes it runs at)
+CASES: Dict[str, Tuple[Callable[[int], Callable], Tuple[int, ...]]] = {
+    "calculate_font_size": (_font_size, SIZES),
+    "fit_font_size": (_fit_font_size, SIZES),
+    "image_to_zpl": (_image_to_zpl("none"), SIZES),
+    "image_to_zpl_acs": (_image_to_zpl("acs"), SIZES),
+    "text_zpl": (_text_zpl, SIZES),
+    "generate_labels_pdf": (_labels_pdf, SIZES),
+    "generate_labels_pdf_regenerate": (_labels_pdf_regenerate, (10, 100)),
+    "generate_labels_png": (_labels_png, SIZES),
+    "generate_single_label_png": (_single_label_png, (1, 10)),
+}
+
+
+# --- measurement -----------------------------------------------------------
+
+def output_bytes(result) -> int:
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    if isinstance(result, (list, tuple)):
+        return sum(output_bytes(item) for item in result)
+    return 0
+
+
+def _worker_peaks_kib() -> Optional[list[int]]:
+    """Peak RSS (VmHWM) of each live child process, or None without /proc."""
+    peaks = []
+    for child in multiprocessing.active_children():
+        try:
+            with open(f"/proc/{child.pid}/status") as f:
+                peaks += [int(line.split()[1]) for line in f if line.startswith("VmHWM:")]
+        except OSError:
+            return None
+    return peaks
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process plus the peaks of its render pool workers."""
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Pool workers are still alive here, and RUSAGE_CHILDREN only counts
+    # children that have exited and been waited for
+    workers = _worker_peaks_kib()
+    if "app.label_generator" in sys.modules:
+        sys.modules["app.label_generator"].shutdown_render_pool()
+    if workers is not None:
+        return (own + sum(workers)) / scale  # /proc means Linux, where both are KiB
+    # No /proc (macOS): the largest exited worker is all getrusage can tell
+    return (own + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / scale
+
+
+def run_child(case: str, size: int, repeat: int) -> None:
+    """Measure one case in this process and print the result as JSON."""
+    fn = CASES[case][0](size)
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(json.dumps({"seconds": best, "peak_rss_mb": peak_rss_mb(), "bytes": output_bytes(result)}))
+
+
+def measure(case: str, size: int) -> dict:
+    repeat = 3 if size <= 100 else 1
+    env = dict(os.environ)
+    if case not in RENDER_CACHE_CASES:
+        env["RENDER_CACHE_MB"] = "0"
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--child", case, str(size), str(repeat)],
+        capture_output=True, text=True, env=env,
+    )
+    if out.returncode != 0:
+        raise RuntimeError(f"{case}/{size} failed:\n{out.stderr.strip()}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# --- comparison ------------------------------------------------------------
+
+def regressions(current: dict, base: dict, threshold: float) -> list[str]:
+    found = []
+    if current["seconds"] > base["seconds"] * (1 + threshold) \
+            and current["seconds"] - base["seconds"] > MIN_SECONDS_DELTA:
+        found.append("time")
+    if current["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold) \
+            and current["peak_rss_mb"] - base["peak_rss_mb"] > MIN_RSS_DELTA_MB:
+        found.append("rss")
+    if current["bytes"] > base["bytes"] * (1 + threshold):
+        found.append("bytes")
+    return found
+
+
+def _delta(current: float, base: float) -> str:
+    return f"{(current / base - 1) * 100:+.0f}%" if base else ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--child", nargs=3, metavar=("CASE", "SIZE", "REPEAT"), help=argparse.SUPPRESS)
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative growth (default 0.2)")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--require-baseline", action="store_true",
+                        help="exit 1 when there is no baseline to compare against")
+    args = parser.parse_args()
+
+    if args.child:
+        case, size, repeat = args.child
+        run_child(case, int(size), int(repeat))
+        return
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    failed = []
+    print(f"{'case':<28}{'size':>6}{'ms':>12}{'peak MB':>10}{'bytes':>14}   vs. baseline")
+    for case in args.cases:
+        for size in sorted(set(args.sizes) & set(CASES[case][1])):
+            key = f"{case}/{size}"
+            current = results[key] = measure(case, size)
+            line = (f"{case:<28}{size:>6}{current['seconds'] * 1000:>12.1f}"
+                    f"{current['peak_rss_mb']:>10.1f}{current['bytes']:>14}")
+            base = baseline.get(key)
+            if base:
+                line += (f"   time {_delta(current['seconds'], base['seconds'])},"
+                         f" rss {_delta(current['peak_rss_mb'], base['peak_rss_mb'])},"
+                         f" bytes {_delta(current['bytes'], base['bytes'])}")
+                worse = regressions(current, base, args.threshold)
+                if worse:
+                    failed.append(f"{key}: {', '.join(worse)}")
+                    line += "   REGRESSION"
+            print(line, flush=True)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpus": os.cpu_count(),
+                    "recorded": time.strftime("%Y-%m-%d %H:%M:%S"),
+                },
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save to record one")
+        if args.require_baseline:
+            sys.exit(1)
+    elif failed:
+        print(f"\n{len(failed)} regression(s) over {args.threshold:.0%}:")
+        for item in failed:
+            print(f"  {item}")
+        sys.exit(1)
+    else:
+        print(f"\nNo regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,55 +4,39 @@ Jednostavan ispis PDF-a na Citizen CL-E321 printer.
 Koristi: python3 print_pdf.py <putanja_do_pdf> [broj_stranice]
 """
 
-import socket
 import sys
 import subprocess
 from pathlib import Path
+from typing import Iterable
+
 from PIL import Image
 
+from app.spooler import PrinterError, PrintSpooler, get_session
+from app.zpl import Compression, encode_graphic_field
+
 
 PRINTER_IP = "192.168.48.67"
 PRINTER_PORT = 9100
 DPI = 203  # Citizen CL-E321 rezolucija
+ZPL_COMPRESSION: Compression = "none"  # "acs" ili "z64" za manji prijenos
 
 
-def image_to_zpl(image: Image.Image) -> str:
+def image_to_zpl(image: Image.Image, compression: Compression = ZPL_COMPRESSION) -> str:
     """Konvertiraj sliku u ZPL format."""
-    img_bw = image.convert('1')
-    width, height = img_bw.size
-    bytes_per_row = (width + 7) // 8
-    
-    graphic_data = []
-    for y in range(height):
-        row_data = []
-        for x_byte in range(bytes_per_row):
-            byte_val = 0
-            for bit in range(8):
-                x = x_byte * 8 + bit
-                if x < width:
-                    pixel = img_bw.getpixel((x, y))
-                    if pixel == 0:  # crna
-                        byte_val |= (1 << (7 - bit))
-            row_data.append(f'{byte_val:02X}')
-        graphic_data.append(''.join(row_data))
-    
-    total_bytes = bytes_per_row * height
-    data_string = ''.join(graphic_data)
-    
+    total_bytes, bytes_per_row, data_string = encode_graphic_field(image, compression)
     return f'^XA^FO0,0^GFA,{total_bytes},{total_bytes},{bytes_per_row},{data_string}^FS^XZ'
 
 
-def send_to_printer(zpl: str) -> bool:
-    """Pošalji ZPL na printer."""
+def send_to_printer(zpl_labels: Iterable[str], on_progress=None) -> int:
+    """Pošalji ZPL naljepnice na printer kroz jednu vezu. Vraća broj isprintanih."""
+    spooler = PrintSpooler(get_session(PRINTER_IP, PRINTER_PORT))
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.settimeout(10)
-            sock.connect((PRINTER_IP, PRINTER_PORT))
-            sock.sendall(zpl.encode('utf-8'))
-        return True
-    except socket.error as e:
-        print(f"❌ Greška: {e}")
-        return False
+        result = spooler.print_labels(zpl_labels, on_progress=on_progress)
+    except PrinterError as e:
+        print(f"❌ Greška nakon {e.confirmed} naljepnica: {e}")
+        return e.confirmed
+    print(f"⏱️  {result.labels} naljepnica za {result.seconds:.1f}s ({result.labels_per_second:.1f}/s)")
+    return result.labels
 
 
 def pdf_to_images(pdf_path: str) -> list:
@@ -106,18 +90,18 @@ def print_pdf(pdf_path: str, page_index: int = None):
     # 100mm @ 203 DPI = 800 px
     target_size = int(100 * DPI / 25.4)
     
-    for i, img in enumerate(images):
-        print(f"🖨️  Printam stranicu {i + 1}/{len(images)}...")
-        
-        # Resize na točnu veličinu
-        img_resized = img.resize((target_size, target_size), Image.Resampling.LANCZOS)
-        
-        # Konvertiraj u ZPL i pošalji
-        zpl = image_to_zpl(img_resized)
-        if send_to_printer(zpl):
-            print(f"   ✅ Stranica {i + 1} poslana")
-        else:
-            print(f"   ❌ Greška kod stranice {i + 1}")
+    def zpl_labels():
+        for img in images:
+            # Resize na točnu veličinu
+            yield image_to_zpl(img.resize((target_size, target_size), Image.Resampling.LANCZOS))
+    
+    def on_progress(printed: int):
+        print(f"🖨️  Isprintano {printed}/{len(images)}...")
+    
+    printed = send_to_printer(zpl_labels(), on_progress)
+    if printed < len(images):
+        print(f"❌ Isprintano {printed}/{len(images)} stranica")
+        sys.exit(1)
     
     print("🎉 Gotovo!")
 
@@ -140,7 +124,7 @@ def print_image(image_path: str):
     print(f"🔌 Šaljem na {PRINTER_IP}:{PRINTER_PORT}...")
     
     zpl = image_to_zpl(img_resized)
-    if send_to_printer(zpl):
+    if send_to_printer([zpl]):
         print("✅ Gotovo!")
     else:
         print("❌ Greška pri slanju")
@@ -3,7 +3,17 @@ import { extractFromPdf, generateLabels, type OutputFormat } from './api';
 import { FileUpload } from './components/FileUpload';
 import { LabelEditor } from './components/LabelEditor';
 import { LabelPreview } from './components/LabelPreview';
-import type { LabelData, NarudzbaData } from './types';
+import type { Artikl, JobStatus, LabelData, NarudzbaData } from './types';
+
+const JOB_STATUS_TEXT: Record<JobStatus, string> = {
+  queued: 'Čekam u redu za obradu...',
+  uploading: 'Šaljem dokument...',
+  model_running: 'Ekstrahiram podatke pomoću AI...',
+  retry_after_429: 'AI servis je zauzet, ponovni pokušaj uskoro...',
+  retrying: 'Ponovni pokušaj...',
+  done: 'Gotovo',
+  failed: 'Greška',
+};
 
 function getLabelKey(label: LabelData, index: number): string {
   return `${label.narudzba}-${index}-${label.naziv.slice(0, 20)}`;
@@ -14,6 +24,8 @@ type Step = 'upload' | 'review' | 'edit';
 function App() {
   const [step, setStep] = useState<Step>('upload');
   const [isLoading, setIsLoading] = useState(false);
+  const [jobStatus, setJobStatus] = useState<JobStatus | null>(null);
+  const [streamedItems, setStreamedItems] = useState<Artikl[]>([]);
   const [isGenerating, setIsGenerating] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [labels, setLabels] = useState<LabelData[]>([]);
@@ -22,10 +34,12 @@ function App() {
 
   const handleFileSelect = async (file: File) => {
     setIsLoading(true);
+    setJobStatus(null);
+    setStreamedItems([]);
     setError(null);
 
     try {
-      const data: NarudzbaData = await extractFromPdf(file);
+      const data: NarudzbaData = await extractFromPdf(file, setJobStatus, setStreamedItems);
       
       // Convert extracted data to labels
       const newLabels: LabelData[] = data.artikli.map(artikl => ({
@@ -38,6 +52,7 @@ function App() {
         naziv_objekta: artikl.naziv_objekta,
         wbs: artikl.wbs,
         datum: '',
+        copies: 1,
       }));
 
       setLabels(newLabels);
@@ -51,7 +66,9 @@ function App() {
 
   const handleLabelChange = useCallback((index: number, field: keyof LabelData, value: string) => {
     setLabels(prev => prev.map((label, i) =>
-      i === index ? { ...label, [field]: value } : label
+      i === index
+        ? { ...label, [field]: field === 'copies' ? Math.max(1, parseInt(value, 10) || 1) : value }
+        : label
     ));
   }, []);
 
@@ -153,13 +170,13 @@ function App() {
                 Učitajte PDF narudžbenicu i automatski ćemo ekstrahirati podatke za naljepnice
               </p>
             </div>
-            <FileUpload onFileSelect={handleFileSelect} isLoading={isLoading} />
+            <FileUpload onFileSelect={handleFileSelect} isLoading={isLoading} items={streamedItems} />
             
             {isLoading && (
               <div className="mt-6 flex flex-col items-center gap-2 text-zinc-600">
                 <div className="flex items-center gap-3">
                   <div className="w-5 h-5 border-2 border-amber-400 border-t-transparent rounded-full animate-spin" />
-                  <span className="text-sm">Ekstrahiram podatke pomoću AI...</span>
+                  <span className="text-sm">{JOB_STATUS_TEXT[jobStatus ?? 'model_running']}</span>
                 </div>
                 <span className="text-xs text-zinc-400">Obrada većih dokumenata može potrajati do nekoliko minuta</span>
               </div>
@@ -189,6 +206,7 @@ function App() {
                   >
                     <option value="pdf">PDF</option>
                     <option value="png">PNG (300 DPI)</option>
+                    <option value="zpl">ZPL (Citizen)</option>
                   </select>
                 </div>
                 
@@ -207,7 +225,7 @@ function App() {
                       <svg className="w-5 h-5" fill="none" viewBox="0 0 24 24" stroke="currentColor">
                         <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M12 10v6m0 0l-3-3m3 3l3-3m2 8H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z" />
                       </svg>
-                      {outputFormat === 'png' ? 'Preuzmi PNG' : 'Preuzmi PDF'}
+                      {outputFormat === 'png' ? 'Preuzmi PNG' : outputFormat === 'zpl' ? 'Preuzmi ZPL' : 'Preuzmi PDF'}
                     </>
                   )}
                 </button>
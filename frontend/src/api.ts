@@ -1,15 +1,17 @@
-import type { LabelData, NarudzbaData } from "./types";
+import type { Artikl, JobEvent, JobInfo, JobStatus, LabelData, NarudzbaData } from "./types";
 
 // Use environment variable for API URL, fallback to localhost for development
 const API_BASE = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
 const API_TIMEOUT = 300_000; // 5 minutes - large PDFs with many pages need more time
 
-export type OutputFormat = 'pdf' | 'png';
+export type OutputFormat = 'pdf' | 'png' | 'zpl';
 
 function fetchWithTimeout(url: string, options: RequestInit, timeoutMs = API_TIMEOUT): Promise<Response> {
   const controller = new AbortController();
   const timer = setTimeout(() => controller.abort(), timeoutMs);
+  // Honour the caller's signal too (e.g. a superseded preview request)
+  options.signal?.addEventListener('abort', () => controller.abort(), { once: true });
 
   return fetch(url, { ...options, signal: controller.signal }).finally(() => {
     clearTimeout(timer);
@@ -26,26 +28,123 @@ function handleFetchError(err: unknown, operation: string): never {
   throw err;
 }
 
-export async function extractFromPdf(file: File): Promise<NarudzbaData> {
+const JOB_POLL_INTERVAL = 1_000;
+const JOB_REQUEST_TIMEOUT = 30_000;
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+/**
+ * Extract order data via a background job.
+ *
+ * The upload returns a job id right away and the result is polled with short
+ * requests, so proxies never see a long-running HTTP request. With `onItems`
+ * the job is followed over SSE instead and receives the items found so far
+ * as the model writes them; the returned data is the complete result.
+ */
+export async function extractFromPdf(
+  file: File,
+  onProgress?: (status: JobStatus) => void,
+  onItems?: (items: Artikl[]) => void
+): Promise<NarudzbaData> {
   const formData = new FormData();
   formData.append('file', file);
 
-  let response: Response;
+  let job: JobInfo;
   try {
-    response = await fetchWithTimeout(`${API_BASE}/extract`, {
+    const query = onItems ? '?stream=true' : '';
+    const response = await fetchWithTimeout(`${API_BASE}/jobs/extract${query}`, {
       method: 'POST',
       body: formData,
     });
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Greška pri ekstrakciji podataka iz PDF-a');
+    }
+    job = await response.json();
   } catch (err) {
     handleFetchError(err, 'Ekstrakcija podataka');
   }
 
-  if (!response.ok) {
-    const error = await response.json();
-    throw new Error(error.detail || 'Greška pri ekstrakciji podataka iz PDF-a');
+  if (onItems && typeof EventSource !== 'undefined') {
+    // null: the event stream broke off, the job keeps running - poll it instead
+    const followed = await followJob(job, onProgress, onItems);
+    if (followed) job = followed;
+  }
+  job = await pollJob(job, onProgress);
+
+  onProgress?.(job.status);
+  if (job.status === 'failed' || !job.result) {
+    throw new Error(job.error || 'Greška pri ekstrakciji podataka iz PDF-a');
   }
+  return job.result;
+}
+
+/** Follow a job's SSE stream until its final result (null if the stream fails first). */
+function followJob(
+  job: JobInfo,
+  onProgress: ((status: JobStatus) => void) | undefined,
+  onItems: (items: Artikl[]) => void
+): Promise<JobInfo | null> {
+  return new Promise(resolve => {
+    const source = new EventSource(`${API_BASE}/jobs/${job.id}/events`);
+    let items: Artikl[] = [];
+    const timer = setTimeout(() => finish(null), API_TIMEOUT);
+
+    const finish = (result: JobInfo | null) => {
+      clearTimeout(timer);
+      source.close();
+      resolve(result);
+    };
+
+    const onStatus = (e: MessageEvent) => {
+      const event: JobEvent = JSON.parse(e.data);
+      // A new model attempt writes the items again from the start
+      if (event.status === 'model_running' && items.length > 0) {
+        items = [];
+        onItems(items);
+      }
+      onProgress?.(event.status);
+    };
+    for (const status of ['queued', 'uploading', 'model_running', 'retry_after_429', 'retrying'] as const) {
+      source.addEventListener(status, onStatus);
+    }
+    source.addEventListener('artikl', (e: MessageEvent) => {
+      const event: JobEvent = JSON.parse(e.data);
+      if (event.artikl) {
+        items = [...items, event.artikl];
+        onItems(items);
+      }
+    });
+    source.addEventListener('result', (e: MessageEvent) => finish(JSON.parse(e.data)));
+    source.onerror = () => finish(null);
+  });
+}
+
+/** Poll a job until it is done or failed. */
+async function pollJob(job: JobInfo, onProgress?: (status: JobStatus) => void): Promise<JobInfo> {
+  const deadline = Date.now() + API_TIMEOUT;
+  while (job.status !== 'done' && job.status !== 'failed') {
+    onProgress?.(job.status);
+    if (Date.now() > deadline) {
+      throw new Error('Zahtjev je istekao (timeout). Ekstrakcija podataka traje predugo — pokušajte s manjim dokumentom.');
+    }
+    await sleep(JOB_POLL_INTERVAL);
 
-  return response.json();
+    let response: Response;
+    try {
+      response = await fetchWithTimeout(`${API_BASE}/jobs/${job.id}`, { method: 'GET' }, JOB_REQUEST_TIMEOUT);
+    } catch (err) {
+      // Transient network error while polling - the job keeps running, try again
+      if (err instanceof TypeError || (err instanceof DOMException && err.name === 'AbortError')) continue;
+      throw err;
+    }
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Greška pri ekstrakciji podataka iz PDF-a');
+    }
+    job = await response.json();
+  }
+  return job;
 }
 
 export interface GenerateLabelsResult {
@@ -84,6 +183,12 @@ export async function generateLabels(
       filename: 'naljepnice.zip',
       mimeType: 'application/zip'
     };
+  } else if (format === 'zpl') {
+    return {
+      blob: new Blob([arrayBuffer], { type: 'application/octet-stream' }),
+      filename: 'naljepnice.zpl',
+      mimeType: 'application/octet-stream'
+    };
   } else {
     return {
       blob: new Blob([arrayBuffer], { type: 'application/pdf' }),
@@ -98,3 +203,103 @@ export async function generatePdf(labels: LabelData[]): Promise<Blob> {
   const result = await generateLabels(labels, 'pdf');
   return result.blob;
 }
+
+export type PreviewFormat = 'png' | 'webp';
+
+const PREVIEW_TIMEOUT = 10_000;
+const PREVIEW_CACHE_SIZE = 50;
+
+// At most this many previews are rendered at once; later requests wait for a slot
+const PREVIEW_CONCURRENCY = 2;
+
+// Request body -> last preview, revalidated with If-None-Match
+const previewCache = new Map<string, { etag: string; url: string }>();
+
+let previewsInFlight = 0;
+const previewQueue: Array<() => void> = [];
+
+function acquirePreviewSlot(signal?: AbortSignal): Promise<void> {
+  if (signal?.aborted) {
+    return Promise.reject(new DOMException('Aborted', 'AbortError'));
+  }
+  if (previewsInFlight < PREVIEW_CONCURRENCY) {
+    previewsInFlight++;
+    return Promise.resolve();
+  }
+  return new Promise((resolve, reject) => {
+    const start = () => {
+      signal?.removeEventListener('abort', cancel);
+      resolve();
+    };
+    // A superseded request leaves the queue without ever reaching the server
+    const cancel = () => {
+      previewQueue.splice(previewQueue.indexOf(start), 1);
+      reject(new DOMException('Aborted', 'AbortError'));
+    };
+    previewQueue.push(start);
+    signal?.addEventListener('abort', cancel, { once: true });
+  });
+}
+
+function releasePreviewSlot(): void {
+  const next = previewQueue.shift();
+  if (next) {
+    next(); // the slot passes straight to the next waiting request
+  } else {
+    previewsInFlight--;
+  }
+}
+
+/**
+ * Server-rendered preview of one label (as printed), as an object URL.
+ *
+ * Previews already seen are revalidated with their ETag; the server answers
+ * 304 without rendering when nothing changed. At most PREVIEW_CONCURRENCY
+ * requests are in flight, so many previews never flood the render threads.
+ */
+export async function previewLabel(
+  label: LabelData,
+  format: PreviewFormat = 'webp',
+  signal?: AbortSignal
+): Promise<string> {
+  const body = JSON.stringify({ label, format });
+
+  await acquirePreviewSlot(signal);
+  // Looked up after the wait: an earlier request may have cached this body meanwhile
+  const cached = previewCache.get(body);
+  let response: Response;
+  try {
+    response = await fetchWithTimeout(`${API_BASE}/preview`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(cached ? { 'If-None-Match': cached.etag } : {}),
+      },
+      body,
+      signal,
+    }, PREVIEW_TIMEOUT);
+  } finally {
+    releasePreviewSlot();
+  }
+
+  if (response.status === 304 && cached) {
+    // Most recently used goes last
+    previewCache.delete(body);
+    previewCache.set(body, cached);
+    return cached.url;
+  }
+  if (!response.ok) {
+    throw new Error('Greška pri izradi pregleda');
+  }
+
+  const url = URL.createObjectURL(await response.blob());
+  if (cached) URL.revokeObjectURL(cached.url);
+  previewCache.delete(body);
+  previewCache.set(body, { etag: response.headers.get('ETag') || '', url });
+  if (previewCache.size > PREVIEW_CACHE_SIZE) {
+    const [oldestBody, oldest] = previewCache.entries().next().value!;
+    URL.revokeObjectURL(oldest.url);
+    previewCache.delete(oldestBody);
+  }
+  return url;
+}
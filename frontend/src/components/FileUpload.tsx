@@ -1,13 +1,15 @@
 import { useCallback, useState } from 'react';
+import type { Artikl } from '../types';
 
 const MAX_FILE_SIZE = 30 * 1024 * 1024; // 30MB
 
 interface FileUploadProps {
   onFileSelect: (file: File) => void;
   isLoading: boolean;
+  items?: Artikl[]; // positions extracted so far (streamed while loading)
 }
 
-export function FileUpload({ onFileSelect, isLoading }: FileUploadProps) {
+export function FileUpload({ onFileSelect, isLoading, items = [] }: FileUploadProps) {
   const [isDragging, setIsDragging] = useState(false);
   const [fileError, setFileError] = useState<string | null>(null);
 
@@ -60,6 +62,7 @@ export function FileUpload({ onFileSelect, isLoading }: FileUploadProps) {
   }, [validateAndSelect]);
 
   return (
+    <>
     <div
       onDragEnter={handleDragIn}
       onDragLeave={handleDragOut}
@@ -125,6 +128,20 @@ export function FileUpload({ onFileSelect, isLoading }: FileUploadProps) {
         )}
       </div>
     </div>
+
+    {isLoading && items.length > 0 && (
+      <div className="mt-4 bg-white border border-zinc-200 rounded-xl divide-y divide-zinc-100 max-h-64 overflow-y-auto">
+        <p className="px-4 py-2 text-xs font-medium text-zinc-500">Pronađeno do sada: {items.length}</p>
+        {items.map((artikl, i) => (
+          <div key={`${artikl.redni_broj}-${i}`} className="px-4 py-2 flex items-center gap-3 text-sm">
+            <span className="w-10 text-zinc-400 tabular-nums">{artikl.redni_broj}</span>
+            <span className="flex-1 truncate text-zinc-800">{artikl.naziv}</span>
+            <span className="text-zinc-500 whitespace-nowrap">{artikl.kolicina}</span>
+          </div>
+        ))}
+      </div>
+    )}
+    </>
   );
 }
 
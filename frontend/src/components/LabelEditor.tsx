@@ -1,5 +1,6 @@
 import { memo } from "react";
 import type { LabelData } from "../types";
+import { PrintPreview } from "./PrintPreview";
 
 interface LabelEditorProps {
   label: LabelData;
@@ -42,6 +43,18 @@ export const LabelEditor = memo(function LabelEditor({ label, index, onChange }:
             />
           </div>
         ))}
+        <div className="grid gap-1">
+          <label className="text-xs font-medium text-zinc-500">Broj kopija</label>
+          <input
+            type="number"
+            min={1}
+            max={1000}
+            value={label.copies ?? 1}
+            onChange={(e) => onChange(index, 'copies', e.target.value)}
+            className="w-24 px-3 py-2 text-sm border border-zinc-200 rounded-lg focus:outline-none focus:ring-2 focus:ring-amber-400/50 focus:border-amber-400 transition-all"
+          />
+        </div>
+        <PrintPreview label={label} />
       </div>
     </div>
   );
@@ -0,0 +1,50 @@
+import { memo, useEffect, useState } from "react";
+import { previewLabel } from "../api";
+import type { LabelData } from "../types";
+
+interface PrintPreviewProps {
+  label: LabelData;
+}
+
+// Wait for a pause in typing before asking the server
+const PREVIEW_DEBOUNCE_MS = 250;
+
+/**
+ * Server-rendered preview of the label being edited, exactly as it will be
+ * printed (same template, fonts and text fitting as the PDF).
+ */
+export const PrintPreview = memo(function PrintPreview({ label }: PrintPreviewProps) {
+  const [url, setUrl] = useState<string | null>(null);
+  const [failed, setFailed] = useState(false);
+
+  useEffect(() => {
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      previewLabel(label, 'webp', controller.signal)
+        .then(previewUrl => {
+          setUrl(previewUrl);
+          setFailed(false);
+        })
+        .catch(() => {
+          if (!controller.signal.aborted) setFailed(true);
+        });
+    }, PREVIEW_DEBOUNCE_MS);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [label]);
+
+  return (
+    <div className="grid gap-1">
+      <span className="text-xs font-medium text-zinc-500">Pregled ispisa</span>
+      <div className="w-full max-w-[280px] aspect-square border border-zinc-200 rounded-lg bg-white flex items-center justify-center overflow-hidden">
+        {url ? (
+          <img src={url} alt="Pregled naljepnice" className={`w-full h-full ${failed ? 'opacity-50' : ''}`} />
+        ) : (
+          <span className="text-xs text-zinc-400">{failed ? 'Pregled nije dostupan' : 'Učitavanje...'}</span>
+        )}
+      </div>
+    </div>
+  );
+});
@@ -23,6 +23,7 @@ export interface LabelData {
   naziv_objekta: string;
   wbs: string;
   datum: string;
+  copies?: number;
 }
 
 
@@ -30,3 +31,31 @@ export interface LabelData {
 
 
 
+
+export type JobStatus =
+  | 'queued'
+  | 'uploading'
+  | 'model_running'
+  | 'retry_after_429'
+  | 'retrying'
+  | 'done'
+  | 'failed';
+
+export interface JobEvent {
+  status: JobStatus;
+  at: number;
+  details: Record<string, unknown>;
+  artikl?: Artikl | null;
+}
+
+export interface JobInfo {
+  id: string;
+  status: JobStatus;
+  created_at: number;
+  updated_at: number;
+  filename: string;
+  result?: NarudzbaData | null;
+  error?: string | null;
+  error_status?: number | null;
+  retry_after?: number | null;
+}